@@ -2,4 +2,26 @@ from django.apps import AppConfig
 
 class AppointmentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "apps.appointments"
\ No newline at end of file
+    name = "apps.appointments"
+
+    def ready(self):
+        # Làm mới cache khoa/bác sĩ khi dữ liệu thay đổi (đăng nhập chỉ cập nhật last_login)
+        from django.contrib.auth import get_user_model
+        from django.db.models import Q
+        from shared.archive import registry as archive
+        from shared.cache import reference
+        from shared.utils import conditional
+        from .models import AppointmentStatusHistory, Department, DoctorProfile
+
+        reference.register('departments', Department, DoctorProfile)
+        reference.register('doctors', DoctorProfile, Department, get_user_model(), ignore_fields=['last_login'])
+        # ETag theo phiên bản các bảng liên quan (shared.utils.conditional)
+        conditional.track(DoctorProfile, Department)
+        conditional.track(get_user_model(), ignore_fields=['last_login'])
+
+        # Lưu trữ lịch sử trạng thái của lịch hẹn đã kết thúc
+        archive.register(
+            'appointment_status_history', AppointmentStatusHistory, 'changed_at', retention_days=365,
+            eligible=Q(appointment__status__in=['COMPLETED', 'NO_SHOW', 'CANCELLED']),
+            filter_fields=['appointment_id', 'changed_by_id', 'new_status'],
+        )
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('departments/', async_views.department_list, name='async-department-list'),
+    path('doctors/', async_views.doctor_list, name='async-doctor-list'),
+    path('appointments/today_appointments/', async_views.today_appointments,
+         name='async-appointment-today-appointments'),
+]
@@ -0,0 +1,35 @@
+"""
+Async (ASGI) versions of the public read endpoints, mounted under /api/async/.
+
+Responses match the sync endpoints of the same name; see shared.utils.async_views.
+"""
+from django.utils import timezone
+
+from shared.utils.async_views import alist, async_api_view, json_response
+
+from .serializers import AppointmentSerializer
+from .views import AppointmentViewSet, DepartmentViewSet, DoctorProfileViewSet
+
+
+@async_api_view()
+async def department_list(request):
+    return await alist(DepartmentViewSet, request)
+
+
+@async_api_view()
+async def doctor_list(request):
+    return await alist(DoctorProfileViewSet, request)
+
+
+@async_api_view(authenticated=True)
+async def today_appointments(request):
+    """Today's appointments, optionally for one doctor (``?doctor=``)."""
+    queryset = AppointmentViewSet.queryset.filter(appointment_date=timezone.localdate())
+
+    doctor_id = request.GET.get('doctor')
+    if doctor_id:
+        queryset = queryset.filter(doctor_id=doctor_id)
+
+    appointments = [appointment async for appointment in queryset]
+    serializer = AppointmentSerializer(appointments, many=True, context={'request': request})
+    return json_response(serializer.data)
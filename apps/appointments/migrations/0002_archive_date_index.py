@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointmentstatushistory",
+            index=models.Index(
+                fields=["changed_at"], name="appointment_changed_76fa1d_idx"
+            ),
+        ),
+    ]
@@ -377,6 +377,9 @@ class AppointmentStatusHistory(models.Model):
         verbose_name = 'Lịch sử trạng thái lịch hẹn'
         verbose_name_plural = 'Lịch sử trạng thái lịch hẹn'
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['changed_at']),
+        ]
     
     def __str__(self):
         return f"{self.appointment.appointment_number}: {self.old_status} → {self.new_status}"
@@ -8,10 +8,12 @@ from .models import (
     Department, DoctorProfile, DoctorSchedule, 
     Appointment, AppointmentStatusHistory, TimeSlot
 )
+from apps.patients.serializers import PatientSummarySerializer
+from shared.utils.sparse_fields import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     doctor_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -22,11 +24,21 @@ class DepartmentSerializer(serializers.ModelSerializer):
             'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        # Added to list/detail querysets by SparseFieldsetViewMixin
+        field_annotations = {
+            'doctor_count': {
+                'active_doctor_count': models.Count('doctors', filter=models.Q(doctors__is_active=True)),
+            },
+        }
     
     def get_doctor_count(self, obj):
+        # Annotated by the viewset to avoid one COUNT per department.
+        count = getattr(obj, 'active_doctor_count', None)
+        if count is not None:
+            return count
         return obj.doctors.filter(is_active=True).count()
 
-class DoctorProfileSerializer(serializers.ModelSerializer):
+class DoctorProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     doctor_name = serializers.CharField(source='user.full_name', read_only=True)
     department_name = serializers.CharField(source='department.name', read_only=True)
     department_code = serializers.CharField(source='department.code', read_only=True)
@@ -61,7 +73,7 @@ class DoctorScheduleSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at']
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     patient_code = serializers.CharField(source='patient.patient_code', read_only=True)
     patient_phone = serializers.CharField(source='patient.phone_number', read_only=True)
@@ -107,6 +119,11 @@ class AppointmentSerializer(serializers.ModelSerializer):
             'confirmed_by', 'confirmed_at', 'checked_in_at', 'actual_start_time', 'actual_end_time',
             'created_at', 'updated_at'
         ]
+        # ?expand=patient,doctor thay khóa chính bằng object
+        expandable_fields = {
+            'patient': PatientSummarySerializer,
+            'doctor': DoctorProfileSerializer,
+        }
 
 class AppointmentCreateSerializer(serializers.ModelSerializer):
     doctor = serializers.CharField(
@@ -6,7 +6,7 @@ from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count
 from django.utils import timezone
-from datetime import date, datetime, timedelta, time
+from datetime import datetime, timedelta, time
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
 from .models import (
@@ -19,8 +19,14 @@ from .serializers import (
     AppointmentStatusHistorySerializer, AvailableSlotSerializer
 )
 from shared.permissions.base_permissions import HasPermission
+from shared.db.routers import use_read_replica
+from shared.cache.mixins import ReferenceCacheMixin
+from shared.utils.conditional import ConditionalGetMixin
+from shared.utils.idempotency import idempotent
+from shared.throttling.throttles import throttle_scope
+from shared.utils.sparse_fields import SparseFieldsetViewMixin
 
-class DepartmentViewSet(ModelViewSet):
+class DepartmentViewSet(ReferenceCacheMixin, ConditionalGetMixin, SparseFieldsetViewMixin, ModelViewSet):
     """
     Department Management ViewSet
     
@@ -34,6 +40,10 @@ class DepartmentViewSet(ModelViewSet):
     filterset_fields = ['is_active']
     ordering_fields = ['name', 'code', 'created_at']
     ordering = ['name']
+    # ETag/Last-Modified (shared.utils.conditional): doctor_count
+    etag_related = ['doctors']
+    # list/retrieve từ cache dữ liệu tham chiếu (shared.cache)
+    reference_cache = 'departments'
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -48,7 +58,7 @@ class DepartmentViewSet(ModelViewSet):
             self.required_permissions = ['SYSTEM:UPDATE']
         return super().get_permissions()
 
-class DoctorProfileViewSet(ModelViewSet):
+class DoctorProfileViewSet(ReferenceCacheMixin, ConditionalGetMixin, SparseFieldsetViewMixin, ModelViewSet):
     """
     Doctor Profile Management ViewSet
     
@@ -62,6 +72,11 @@ class DoctorProfileViewSet(ModelViewSet):
     filterset_fields = ['department', 'degree', 'is_active']
     ordering_fields = ['user__first_name', 'user__last_name', 'experience_years', 'created_at']
     ordering = ['user__first_name', 'user__last_name']
+    # ETag/Last-Modified (shared.utils.conditional): doctor_name/email/phone, department_name
+    etag_related = ['user', 'department']
+    # list/retrieve từ cache dữ liệu tham chiếu (shared.cache)
+    reference_cache = 'doctors'
+    throttle_scopes = {'available_slots': 'search'}
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve', 'available_slots']:
@@ -110,7 +125,7 @@ class DoctorProfileViewSet(ModelViewSet):
             return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        if appointment_date < date.today():
+        if appointment_date < timezone.localdate():
             return Response({'error': 'Cannot get slots for past dates'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
@@ -157,7 +172,7 @@ class DoctorProfileViewSet(ModelViewSet):
         serializer = AvailableSlotSerializer(available_slots, many=True)
         return Response(serializer.data)
 
-class AppointmentViewSet(ModelViewSet):
+class AppointmentViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Appointment Management ViewSet
     
@@ -173,6 +188,8 @@ class AppointmentViewSet(ModelViewSet):
     filterset_fields = ['status', 'priority', 'appointment_type', 'doctor', 'department', 'appointment_date']
     ordering_fields = ['appointment_date', 'appointment_time', 'created_at']
     ordering = ['-appointment_date', '-appointment_time']
+    # Giới hạn tần suất theo nhóm route (shared.throttling): list/create mở công khai cho portal
+    throttle_scopes = {'list': 'search', 'create': 'booking'}
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -194,6 +211,11 @@ class AppointmentViewSet(ModelViewSet):
             return AppointmentCreateSerializer
         return AppointmentSerializer
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        # Portal gửi lại khi timeout: cùng Idempotency-Key trả lại lịch hẹn đã tạo
+        return super().create(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         serializer.save(booked_by=self.request.user)
     
@@ -225,7 +247,7 @@ class AppointmentViewSet(ModelViewSet):
     @action(detail=False, methods=['get'])
     def today_appointments(self, request):
         """Get today's appointments"""
-        today = date.today()
+        today = timezone.localdate()
         queryset = self.get_queryset().filter(appointment_date=today)
         
         doctor_id = request.query_params.get('doctor')
@@ -361,6 +383,8 @@ class AppointmentViewSet(ModelViewSet):
         OpenApiParameter('department', type=str, description='Department ID'),
     ]
 )
+@throttle_scope('reporting')
+@use_read_replica
 @api_view(['GET'])
 def appointment_statistics(request):
     """
@@ -368,7 +392,7 @@ def appointment_statistics(request):
     
     Returns appointment statistics for dashboard.
     """
-    today = date.today()
+    today = timezone.localdate()
     date_param = request.query_params.get('date', today.strftime('%Y-%m-%d'))
     department_id = request.query_params.get('department')
     
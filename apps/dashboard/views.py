@@ -0,0 +1,56 @@
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from shared.db.routers import use_read_replica
+from . import widgets
+
+
+@extend_schema(
+    summary="Dashboard Summary",
+    description=(
+        "All dashboard widgets the current user's permissions allow, computed server-side and "
+        "cached per widget. Supports If-None-Match."
+    ),
+    parameters=[
+        OpenApiParameter('widgets', str, description="Chỉ lấy các widget này (phân tách bằng dấu phẩy)"),
+    ],
+    responses={200: dict},
+)
+@use_read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_summary(request):
+    """
+    Dashboard Summary
+
+    One request per refresh instead of one per widget.
+    """
+    names = widgets.widgets_for(request.user)
+    requested = request.query_params.get('widgets')
+    if requested:
+        requested = {name.strip() for name in requested.split(',')}
+        names = [name for name in names if name in requested]
+
+    today = timezone.localdate()
+    entries = {name: widgets.get(name, today) for name in names}
+
+    role = 'SUPERUSER' if request.user.is_superuser else request.user.user_type
+    key = '|'.join([role, today.isoformat()] + [f"{name}:{entry['etag']}" for name, entry in entries.items()])
+    etag = 'W/"%s"' % hashlib.sha1(key.encode()).hexdigest()
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = Response({
+            'role': role,
+            'widgets': {name: entry['data'] for name, entry in entries.items()},
+            'updated_at': {name: entry['updated_at'] for name, entry in entries.items()},
+        })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,208 @@
+"""
+Dashboard widgets: each one is a function computing one block of the
+dashboard, registered with its own cache TTL and the permission codes
+(``RESOURCE:ACTION``, as ``HasPermission``) a user needs to see it.
+
+Results are cached per widget and day, shared by every user who sees the
+widget, so one refresh of the dashboard costs no queries while the widgets
+are fresh. Widgets can build on each other (``recent_activity`` reuses the
+cached ``recent_patients``). Each cached value carries a hash of its data; the
+summary ETag combines those hashes.
+
+    @widget('low_stock', ttl=120, permissions=['PRESCRIPTION:APPROVE'])
+    def low_stock(today):
+        ...
+"""
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, Count, F, Sum, When
+from django.utils import timezone
+
+from apps.appointments.models import Appointment
+from apps.patients.models import Patient
+from apps.payments.models import Payment
+from apps.prescriptions.models import Drug, Prescription
+from shared.permissions.base_permissions import HasPermission
+
+WIDGETS = {}
+
+CACHE_PREFIX = 'dashboard:widget'
+
+
+def widget(name, ttl, permissions):
+    def decorator(func):
+        WIDGETS[name] = (func, ttl, frozenset(permissions))
+        return func
+    return decorator
+
+
+def widgets_for(user):
+    """Names of the widgets ``user`` may see, in registry order."""
+    if user.is_superuser:
+        return list(WIDGETS)
+    if user.user_type == 'PATIENT':
+        # PATIENT:READ của tài khoản bệnh nhân chỉ áp dụng cho hồ sơ của chính họ
+        return []
+    granted = HasPermission().get_user_permissions(user)
+    return [name for name, (_, _, required) in WIDGETS.items() if required <= granted]
+
+
+def get(name, today=None):
+    """``{'data', 'etag', 'updated_at'}`` for widget ``name``, from cache when fresh."""
+    today = today or timezone.localdate()
+    key = f'{CACHE_PREFIX}:{name}:{today.isoformat()}'
+    entry = cache.get(key)
+    if entry is None:
+        func, ttl, _ = WIDGETS[name]
+        data = func(today)
+        encoded = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {
+            'data': data,
+            'etag': hashlib.sha1(encoded.encode()).hexdigest(),
+            'updated_at': timezone.now(),
+        }
+        cache.set(key, entry, ttl)
+    return entry
+
+
+def _month_start(today):
+    start = datetime.datetime.combine(today.replace(day=1), datetime.time.min)
+    return timezone.make_aware(start)
+
+
+@widget('patients', ttl=300, permissions=['PATIENT:READ'])
+def patients(today):
+    return Patient.objects.aggregate(
+        total_patients=Count('id'),
+        new_patients_this_month=Count(Case(When(created_at__gte=_month_start(today), then='id'))),
+        patients_with_insurance=Count(Case(When(has_insurance=True, then='id'))),
+        active_patients=Count(Case(When(is_active=True, then='id'))),
+    )
+
+
+@widget('today_appointments', ttl=30, permissions=['APPOINTMENT:READ'])
+def today_appointments(today):
+    labels = dict(Appointment.STATUS_CHOICES)
+    by_status = {}
+    counts = (
+        Appointment.objects.filter(appointment_date=today)
+        .values('status').annotate(count=Count('id')).order_by('status')
+    )
+    for item in counts:
+        by_status[labels.get(item['status'], item['status'])] = item['count']
+    return {'total_appointments': sum(by_status.values()), 'by_status': by_status}
+
+
+@widget('monthly_appointments', ttl=300, permissions=['APPOINTMENT:READ'])
+def monthly_appointments(today):
+    first = today.replace(day=1)
+    next_month = (first + datetime.timedelta(days=32)).replace(day=1)
+    counts = dict(
+        Appointment.objects.filter(appointment_date__gte=first, appointment_date__lt=next_month)
+        .values_list('appointment_date').annotate(count=Count('id')).order_by()
+    )
+    days = (next_month - first).days
+    return {
+        'labels': list(range(1, days + 1)),
+        'data': [counts.get(first + datetime.timedelta(days=offset), 0) for offset in range(days)],
+    }
+
+
+@widget('prescriptions', ttl=60, permissions=['PRESCRIPTION:READ'])
+def prescriptions(today):
+    stats = Prescription.objects.aggregate(
+        total_prescriptions=Count('id'),
+        active_prescriptions=Count(Case(When(status='ACTIVE', then='id'))),
+        expired_prescriptions=Count(Case(When(status='EXPIRED', then='id'))),
+        dispensed_prescriptions=Count(
+            Case(When(status__in=['PARTIALLY_DISPENSED', 'FULLY_DISPENSED'], then='id'))
+        ),
+    )
+    stats['pending_prescriptions'] = max(0, stats['active_prescriptions'] - stats['dispensed_prescriptions'])
+    return stats
+
+
+@widget('recent_patients', ttl=30, permissions=['PATIENT:READ'])
+def recent_patients(today):
+    return list(
+        Patient.objects.order_by('-created_at')
+        .values('id', 'patient_code', 'full_name', 'phone_number', 'created_at', 'is_active')[:5]
+    )
+
+
+# Tên bệnh nhân, lịch hẹn và đơn thuốc mới nhất
+@widget('recent_activity', ttl=30, permissions=['PATIENT:READ', 'APPOINTMENT:READ', 'PRESCRIPTION:READ'])
+def recent_activity(today):
+    activities = [
+        {
+            'type': 'patient',
+            'description': f"Bệnh nhân mới: {patient['full_name']} ({patient['patient_code']})",
+            'created_at': patient['created_at'],
+        }
+        for patient in get('recent_patients', today)['data'][:2]
+    ]
+    appointments = (
+        Appointment.objects.filter(appointment_date=today).order_by('-created_at')
+        .values('patient__full_name', 'doctor__user__first_name', 'doctor__user__last_name',
+                'doctor__user__username', 'created_at')[:2]
+    )
+    for appointment in appointments:
+        doctor_name = (
+            f"{appointment['doctor__user__first_name']} {appointment['doctor__user__last_name']}".strip()
+            or appointment['doctor__user__username']
+        )
+        activities.append({
+            'type': 'appointment',
+            'description': f"Lịch hẹn mới: {appointment['patient__full_name']} - {doctor_name}",
+            'created_at': appointment['created_at'],
+        })
+    for prescription in (
+        Prescription.objects.order_by('-created_at')
+        .values('patient__full_name', 'prescription_number', 'created_at')[:2]
+    ):
+        activities.append({
+            'type': 'prescription',
+            'description': (
+                f"Đơn thuốc mới: {prescription['patient__full_name']} ({prescription['prescription_number']})"
+            ),
+            'created_at': prescription['created_at'],
+        })
+    activities.sort(key=lambda activity: activity['created_at'], reverse=True)
+    return activities[:4]
+
+
+@widget('low_stock', ttl=120, permissions=['PRESCRIPTION:APPROVE'])
+def low_stock(today):
+    queryset = Drug.objects.filter(is_active=True, current_stock__lte=F('minimum_stock'))
+    items = [
+        {
+            'drug_id': row['id'],
+            'drug_name': row['name'],
+            'current_stock': row['current_stock'],
+            'minimum_stock': row['minimum_stock'],
+            'status': Drug.stock_status_for(row['current_stock'], row['minimum_stock'], row['maximum_stock']),
+        }
+        for row in queryset.order_by('current_stock', 'name').values(
+            'id', 'name', 'current_stock', 'minimum_stock', 'maximum_stock'
+        )[:10]
+    ]
+    return {'count': queryset.count(), 'items': items}
+
+
+@widget('payments', ttl=30, permissions=['PAYMENT:READ'])
+def payments(today):
+    day_start = timezone.make_aware(datetime.datetime.combine(today, datetime.time.min))
+    stats = Payment.objects.aggregate(
+        pending_count=Count(Case(When(status='PENDING', then='id'))),
+        pending_amount=Sum(Case(When(status='PENDING', then='amount'))),
+        paid_today_count=Count(Case(When(status='PAID', updated_at__gte=day_start, then='id'))),
+        paid_today_amount=Sum(Case(When(status='PAID', updated_at__gte=day_start, then='amount'))),
+    )
+    # VNĐ không có phần lẻ
+    stats['pending_amount'] = int(stats['pending_amount'] or 0)
+    stats['paid_today_amount'] = int(stats['paid_today_amount'] or 0)
+    return stats
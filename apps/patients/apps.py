@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class PatientsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.patients"
+
+    def ready(self):
+        # Xóa cache tổng quan bệnh nhân khi dữ liệu liên quan thay đổi
+        from . import overview  # noqa: F401
+
+        # ETag danh sách bệnh nhân theo phiên bản người tạo/cập nhật (shared.utils.conditional)
+        from django.contrib.auth import get_user_model
+        from shared.utils import conditional
+
+        conditional.track(get_user_model(), ignore_fields=['last_login'])
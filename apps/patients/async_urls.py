@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('geo/provinces/', async_views.geo_provinces, name='async-geo-provinces'),
+    path('geo/provinces/<int:province_code>/', async_views.geo_province_detail,
+         name='async-geo-province-detail'),
+]
@@ -0,0 +1,48 @@
+"""
+Async (ASGI) versions of the public geo lookups, mounted under /api/async/.
+
+Responses match ``geo_provinces`` / ``geo_province_detail`` in views.py.
+"""
+from asgiref.sync import sync_to_async
+
+from shared.utils.async_views import async_api_view, json_response
+
+from .views import _load_nested_divisions
+
+# File read + JSON parse on first use only; keep it off the event loop and out
+# of the thread-sensitive executor the async ORM uses.
+_aload_nested_divisions = sync_to_async(_load_nested_divisions, thread_sensitive=False)
+
+
+@async_api_view()
+async def geo_provinces(request):
+    try:
+        data = await _aload_nested_divisions()
+    except Exception as exc:
+        return json_response({'detail': str(exc)}, status=500)
+    return json_response([
+        {
+            'code': p['code'],
+            'name': p['name'],
+            'division_type': p.get('division_type'),
+        } for p in data
+    ])
+
+
+@async_api_view()
+async def geo_province_detail(request, province_code):
+    try:
+        data = await _aload_nested_divisions()
+    except Exception as exc:
+        return json_response({'detail': str(exc)}, status=500)
+    for p in data:
+        if int(p['code']) == int(province_code):
+            wards = p.get('wards', []) or p.get('districts', [])
+            return json_response({
+                'code': p['code'],
+                'name': p['name'],
+                'wards': [
+                    {'code': w['code'], 'name': w['name']} for w in wards
+                ]
+            })
+    return json_response({'detail': 'Province not found'}, status=404)
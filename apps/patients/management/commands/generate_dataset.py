@@ -0,0 +1,693 @@
+"""
+Management command sinh bộ dữ liệu bệnh viện tổng hợp ở quy mô production.
+
+Khác với ``generate_sample_patients`` / ``create_sample_drugs`` (tạo từng dòng
+bằng Faker), lệnh này sinh dữ liệu theo lô bằng ``bulk_create`` và có thể chạy
+song song nhiều process. Mọi bản ghi được suy ra tất định từ ``--seed`` và chỉ
+số của lô, nên cùng một seed luôn cho cùng một bộ dữ liệu bất kể số worker.
+
+    python manage.py generate_dataset --preset production --workers 8
+    python manage.py generate_dataset --patients 20000 --appointments 100000
+"""
+import multiprocessing
+import random
+import time as _time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+User = get_user_model()
+
+# Namespace cố định: id của một bản ghi chỉ phụ thuộc vào loại và chỉ số,
+# nên chạy lại lệnh sẽ bỏ qua (ignore_conflicts) các dòng đã có.
+DATASET_NAMESPACE = uuid.UUID('6f1c2f3e-9a0b-4d4c-8e21-5b7a3c9d1e42')
+
+PRESETS = {
+    'small': {
+        'patients': 10_000, 'doctors': 50, 'pharmacists': 5, 'drugs': 300,
+        'appointments': 50_000, 'prescriptions': 25_000,
+    },
+    'medium': {
+        'patients': 100_000, 'doctors': 150, 'pharmacists': 10, 'drugs': 1_000,
+        'appointments': 1_000_000, 'prescriptions': 500_000,
+    },
+    'production': {
+        'patients': 1_000_000, 'doctors': 500, 'pharmacists': 40, 'drugs': 3_000,
+        'appointments': 10_000_000, 'prescriptions': 5_000_000,
+    },
+}
+
+DEPARTMENTS = [
+    ('TIM', 'Khoa Tim mạch', 'Tầng 3', 200000),
+    ('NOI', 'Khoa Nội tổng hợp', 'Tầng 2', 150000),
+    ('NGOAI', 'Khoa Ngoại tổng hợp', 'Tầng 4', 180000),
+    ('SAN', 'Khoa Sản phụ khoa', 'Tầng 5', 180000),
+    ('NHI', 'Khoa Nhi', 'Tầng 6', 150000),
+    ('DALIEU', 'Khoa Da liễu', 'Tầng 2', 150000),
+    ('TMH', 'Khoa Tai Mũi Họng', 'Tầng 3', 150000),
+    ('MAT', 'Khoa Mắt', 'Tầng 3', 150000),
+    ('RHM', 'Khoa Răng Hàm Mặt', 'Tầng 4', 170000),
+    ('TIEUHOA', 'Khoa Tiêu hóa', 'Tầng 5', 170000),
+    ('HOHAP', 'Khoa Hô hấp', 'Tầng 6', 170000),
+    ('THANKINH', 'Khoa Thần kinh', 'Tầng 7', 200000),
+]
+
+DRUG_CATEGORIES = [
+    ('ANTIBIOTICS', 'Kháng sinh'),
+    ('ANALGESICS', 'Giảm đau'),
+    ('CARDIOVASCULAR', 'Tim mạch'),
+    ('DIGESTIVE', 'Tiêu hóa'),
+    ('RESPIRATORY', 'Hô hấp'),
+    ('ENDOCRINE', 'Nội tiết'),
+    ('DERMATOLOGY', 'Da liễu'),
+    ('VITAMINS', 'Vitamin và khoáng chất'),
+]
+
+# (hoạt chất, nhóm, dạng bào chế, đơn vị, các hàm lượng, giá cơ bản)
+ACTIVE_INGREDIENTS = [
+    ('Amoxicillin', 'ANTIBIOTICS', 'CAPSULE', 'CAPSULE', ['250mg', '500mg'], 3000),
+    ('Cefuroxime', 'ANTIBIOTICS', 'TABLET', 'TABLET', ['250mg', '500mg'], 9000),
+    ('Azithromycin', 'ANTIBIOTICS', 'TABLET', 'TABLET', ['250mg', '500mg'], 12000),
+    ('Ciprofloxacin', 'ANTIBIOTICS', 'TABLET', 'TABLET', ['500mg'], 4000),
+    ('Paracetamol', 'ANALGESICS', 'TABLET', 'TABLET', ['325mg', '500mg', '650mg'], 800),
+    ('Ibuprofen', 'ANALGESICS', 'TABLET', 'TABLET', ['200mg', '400mg'], 1500),
+    ('Meloxicam', 'ANALGESICS', 'TABLET', 'TABLET', ['7.5mg', '15mg'], 2500),
+    ('Amlodipine', 'CARDIOVASCULAR', 'TABLET', 'TABLET', ['5mg', '10mg'], 2000),
+    ('Losartan', 'CARDIOVASCULAR', 'TABLET', 'TABLET', ['25mg', '50mg'], 3500),
+    ('Atorvastatin', 'CARDIOVASCULAR', 'TABLET', 'TABLET', ['10mg', '20mg', '40mg'], 4500),
+    ('Bisoprolol', 'CARDIOVASCULAR', 'TABLET', 'TABLET', ['2.5mg', '5mg'], 3000),
+    ('Omeprazole', 'DIGESTIVE', 'CAPSULE', 'CAPSULE', ['20mg', '40mg'], 2500),
+    ('Domperidone', 'DIGESTIVE', 'TABLET', 'TABLET', ['10mg'], 1200),
+    ('Smecta', 'DIGESTIVE', 'POWDER', 'SACHET', ['3g'], 4000),
+    ('Salbutamol', 'RESPIRATORY', 'SPRAY', 'BOTTLE', ['100mcg'], 85000),
+    ('Ambroxol', 'RESPIRATORY', 'SYRUP', 'BOTTLE', ['15mg/5ml', '30mg/5ml'], 45000),
+    ('Montelukast', 'RESPIRATORY', 'TABLET', 'TABLET', ['4mg', '10mg'], 9000),
+    ('Metformin', 'ENDOCRINE', 'TABLET', 'TABLET', ['500mg', '850mg'], 1500),
+    ('Gliclazide', 'ENDOCRINE', 'TABLET', 'TABLET', ['30mg', '80mg'], 2800),
+    ('Levothyroxine', 'ENDOCRINE', 'TABLET', 'TABLET', ['50mcg', '100mcg'], 2200),
+    ('Clotrimazole', 'DERMATOLOGY', 'CREAM', 'TUBE', ['1%'], 25000),
+    ('Betamethasone', 'DERMATOLOGY', 'OINTMENT', 'TUBE', ['0.05%'], 32000),
+    ('Vitamin C', 'VITAMINS', 'TABLET', 'TABLET', ['500mg', '1000mg'], 1000),
+    ('Calcium carbonate', 'VITAMINS', 'TABLET', 'TABLET', ['500mg'], 1800),
+]
+BRAND_SUFFIXES = ['', ' Stada', ' DHG', ' Imexpharm', ' Pymepharco', ' Sanofi', ' Domesco', ' Traphaco']
+MANUFACTURERS = [
+    ('Dược Hậu Giang', 'Việt Nam'), ('Imexpharm', 'Việt Nam'), ('Stada Việt Nam', 'Việt Nam'),
+    ('Sanofi', 'Pháp'), ('Pfizer', 'Mỹ'), ('GSK', 'Anh'), ('Servier', 'Pháp'), ('Teva', 'Israel'),
+]
+
+LAST_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng',
+              'Bùi', 'Đỗ', 'Hồ', 'Ngô', 'Dương', 'Lý']
+LAST_NAME_WEIGHTS = [38, 11, 9, 7, 5, 5, 4, 4, 4, 3, 3, 2, 2, 1, 1, 1]
+MIDDLE_NAMES = {'M': ['Văn', 'Hữu', 'Đức', 'Minh', 'Quốc', 'Thanh', 'Gia'],
+                'F': ['Thị', 'Ngọc', 'Thu', 'Thanh', 'Minh', 'Bảo', 'Kim']}
+GIVEN_NAMES = {'M': ['An', 'Bình', 'Dũng', 'Hải', 'Hiếu', 'Hùng', 'Huy', 'Khánh', 'Long', 'Minh',
+                     'Nam', 'Phong', 'Phúc', 'Quân', 'Quang', 'Trung', 'Tuấn', 'Sơn', 'Tài', 'Vinh'],
+               'F': ['Anh', 'Châu', 'Hà', 'Hạnh', 'Hoa', 'Lan', 'Linh', 'Mai', 'Ngân', 'Nhung',
+                     'Oanh', 'Phương', 'Tâm', 'Thảo', 'Thu', 'Trang', 'Vy', 'Yến', 'Hương', 'Xuân']}
+PROVINCES = ['Hồ Chí Minh', 'Bình Dương', 'Đồng Nai', 'Long An', 'Tây Ninh', 'Bà Rịa - Vũng Tàu',
+             'Tiền Giang', 'Cần Thơ', 'Hà Nội', 'Đà Nẵng']
+PROVINCE_WEIGHTS = [55, 10, 9, 6, 4, 4, 4, 4, 2, 2]
+WARDS = ['Phường Bến Nghé', 'Phường Tân Định', 'Phường 7', 'Phường Linh Trung', 'Phường An Phú',
+         'Xã Bình Hưng', 'Phường Tân Phong', 'Phường 12', 'Xã Tân Thông Hội', 'Phường Hiệp Phú']
+STREETS = ['Nguyễn Trãi', 'Lê Lợi', 'Trần Hưng Đạo', 'Cách Mạng Tháng 8', 'Nguyễn Văn Cừ',
+           'Lý Thường Kiệt', 'Hai Bà Trưng', 'Điện Biên Phủ', 'Võ Văn Tần', 'Phạm Văn Đồng']
+BLOOD_TYPES = ['O+', 'A+', 'B+', 'AB+', 'O-', 'A-', 'B-', 'AB-', None]
+BLOOD_TYPE_WEIGHTS = [30, 20, 22, 5, 1, 1, 1, 1, 19]
+# Nhóm tuổi (min, max) và tỉ trọng lượt khám
+AGE_BUCKETS = [(0, 5), (6, 17), (18, 39), (40, 59), (60, 79), (80, 95)]
+AGE_WEIGHTS = [10, 12, 28, 27, 19, 4]
+COMPLAINTS = ['Sốt, ho kéo dài', 'Đau đầu, chóng mặt', 'Đau bụng vùng thượng vị', 'Khám sức khỏe định kỳ',
+              'Tăng huyết áp tái khám', 'Đau ngực khi gắng sức', 'Ngứa, nổi mẩn đỏ', 'Đau họng, sổ mũi',
+              'Đau khớp gối', 'Mệt mỏi, sụt cân', 'Tái khám tiểu đường', 'Khó thở về đêm']
+DIAGNOSES = ['Viêm họng cấp', 'Tăng huyết áp vô căn', 'Đái tháo đường type 2', 'Viêm dạ dày',
+             'Viêm phế quản cấp', 'Rối loạn lipid máu', 'Viêm da cơ địa', 'Thoái hóa khớp gối',
+             'Cảm cúm', 'Trào ngược dạ dày thực quản']
+FREQUENCIES = ['1X_DAILY', '2X_DAILY', '3X_DAILY', 'AFTER_MEALS', 'BEDTIME', 'AS_NEEDED']
+
+SLOT_START = time(8, 0)
+SLOT_END = time(17, 0)
+ACTIVE_APPOINTMENT_STATUSES = ['SCHEDULED', 'CONFIRMED', 'CHECKED_IN', 'IN_PROGRESS']
+
+
+def dataset_uuid(kind, index):
+    """Id tất định cho bản ghi thứ ``index`` của loại ``kind``."""
+    return uuid.uuid5(DATASET_NAMESPACE, f'{kind}:{index}')
+
+
+def patient_has_insurance(index, seed):
+    """Tỉ lệ ~85% có BHYT; suy ra từ chỉ số để các bảng khác không cần đọc lại Patient."""
+    return (index * 2654435761 + seed) % 100 < 85
+
+
+def _skewed_index(rng, count, skew=1.6):
+    """Chọn chỉ số trong [0, count) nghiêng về đầu dải (bệnh nhân tái khám nhiều lần)."""
+    return min(count - 1, int(count * (rng.random() ** skew)))
+
+
+def _weighted_day_offset(rng, days_back, days_forward):
+    """Ngày khám theo phân bố thực tế: Chủ nhật vắng, dữ liệu gần đây dày hơn."""
+    span = days_back + days_forward
+    while True:
+        # Lưu lượng tăng dần theo thời gian: nghiêng về các ngày gần hiện tại
+        offset = int(span * (rng.random() ** 0.75)) - days_back
+        weekday = (offset + _weighted_day_offset.today_weekday) % 7
+        if weekday == 6 and rng.random() < 0.8:
+            continue
+        if weekday == 5 and rng.random() < 0.3:
+            continue
+        return offset
+
+
+_weighted_day_offset.today_weekday = 0
+
+
+@contextmanager
+def preserve_timestamps(*model_classes):
+    """Tạm tắt auto_now/auto_now_add để ghi được created_at/updated_at trong quá khứ."""
+    patched = []
+    for model in model_classes:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                patched.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = False
+                field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in patched:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def _init_worker():
+    # Với start method "spawn" process con chưa có Django; với "fork" đây là no-op
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _run_batch(task):
+    kind, start, stop, ctx = task
+    _weighted_day_offset.today_weekday = ctx['today'].weekday()
+    builder = {
+        'patients': _build_patients,
+        'appointments': _build_appointments,
+        'prescriptions': _build_prescriptions,
+    }[kind]
+    rng = random.Random(f"{ctx['seed']}:{kind}:{start}")
+    rows = builder(rng, start, stop, ctx)
+    with preserve_timestamps(*[model for model, _ in rows]):
+        with transaction.atomic():
+            for model, objs in rows:
+                if objs:
+                    model.objects.bulk_create(objs, batch_size=ctx['insert_batch'], ignore_conflicts=True)
+    return kind, stop - start
+
+
+def _aware(day, clock, tz):
+    return datetime.combine(day, clock, tzinfo=tz)
+
+
+def _build_patients(rng, start, stop, ctx):
+    from apps.patients.models import Patient
+
+    tz = timezone.get_current_timezone()
+    today = ctx['today']
+    history_start = today - timedelta(days=ctx['days'] * 3)
+    history_span = (today - history_start).days
+    patients = []
+    for i in range(start, stop):
+        gender = 'M' if rng.random() < 0.48 else 'F'
+        full_name = ' '.join([
+            rng.choices(LAST_NAMES, LAST_NAME_WEIGHTS)[0],
+            rng.choice(MIDDLE_NAMES[gender]),
+            rng.choice(GIVEN_NAMES[gender]),
+        ])
+        age_min, age_max = rng.choices(AGE_BUCKETS, AGE_WEIGHTS)[0]
+        date_of_birth = today - timedelta(days=rng.randint(age_min * 365, age_max * 365 + 364))
+        has_insurance = patient_has_insurance(i, ctx['seed'])
+        created = _aware(
+            history_start + timedelta(days=int(history_span * (rng.random() ** 0.6))),
+            time(rng.randint(7, 16), rng.randint(0, 59)), tz,
+        )
+        patients.append(Patient(
+            id=dataset_uuid('patient', i),
+            patient_code=f'BG{i:010d}',
+            full_name=full_name,
+            date_of_birth=date_of_birth,
+            gender=gender,
+            phone_number=f'03{i:08d}',
+            email=f'bn{i}@example.com' if rng.random() < 0.25 else None,
+            address=f'{rng.randint(1, 999)} {rng.choice(STREETS)}',
+            ward=rng.choice(WARDS),
+            province=rng.choices(PROVINCES, PROVINCE_WEIGHTS)[0],
+            citizen_id=f'9{i:011d}',
+            blood_type=rng.choices(BLOOD_TYPES, BLOOD_TYPE_WEIGHTS)[0],
+            allergies='Dị ứng penicillin' if rng.random() < 0.05 else '',
+            chronic_diseases=rng.choice(['Tăng huyết áp', 'Đái tháo đường', 'Hen phế quản']) if rng.random() < 0.15 else '',
+            emergency_contact_name=full_name.split()[0] + ' ' + rng.choice(GIVEN_NAMES['F' if gender == 'M' else 'M']),
+            emergency_contact_phone=f'05{i:08d}',
+            emergency_contact_relationship=rng.choice(['Vợ/Chồng', 'Con', 'Cha/Mẹ', 'Anh/Chị em']),
+            has_insurance=has_insurance,
+            insurance_number=f'HS4{i:010d}' if has_insurance else None,
+            insurance_valid_from=(today - timedelta(days=rng.randint(30, 330))) if has_insurance else None,
+            insurance_valid_to=(today + timedelta(days=rng.randint(-30, 335))) if has_insurance else None,
+            insurance_hospital_code='79024' if has_insurance else None,
+            created_by_id=ctx['admin_id'],
+            updated_by_id=ctx['admin_id'],
+            is_active=rng.random() > 0.02,
+            created_at=created,
+            updated_at=created,
+        ))
+    return [(Patient, patients)]
+
+
+def _appointment_status(rng, offset):
+    if offset < 0:
+        return rng.choices(['COMPLETED', 'NO_SHOW', 'CANCELLED', 'RESCHEDULED'], [78, 8, 10, 4])[0]
+    if offset == 0:
+        return rng.choices(
+            ['SCHEDULED', 'CONFIRMED', 'CHECKED_IN', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED'],
+            [15, 25, 20, 10, 25, 5],
+        )[0]
+    return rng.choices(['SCHEDULED', 'CONFIRMED', 'CANCELLED'], [60, 35, 5])[0]
+
+
+def _build_appointments(rng, start, stop, ctx):
+    from apps.appointments.models import Appointment
+
+    tz = timezone.get_current_timezone()
+    today = ctx['today']
+    now = ctx['now']
+    doctors = ctx['doctors']
+    appointments = []
+    for j in range(start, stop):
+        doctor_id, department_id, duration = rng.choice(doctors)
+        offset = _weighted_day_offset(rng, ctx['days'], ctx['days_forward'])
+        day = today + timedelta(days=offset)
+        slots_per_day = (SLOT_END.hour - SLOT_START.hour) * 60 // duration
+        slot = rng.randrange(slots_per_day)
+        minutes = SLOT_START.hour * 60 + slot * duration
+        clock = time(minutes // 60, minutes % 60)
+        status = _appointment_status(rng, offset)
+        scheduled_at = _aware(day, clock, tz)
+        created = min(now, scheduled_at - timedelta(days=rng.randint(0, 14), minutes=rng.randint(0, 600)))
+        confirmed = status not in ('SCHEDULED', 'CANCELLED')
+        checked_in = status in ('CHECKED_IN', 'IN_PROGRESS', 'COMPLETED')
+        started = status in ('IN_PROGRESS', 'COMPLETED')
+        appointments.append(Appointment(
+            id=dataset_uuid('appointment', j),
+            appointment_number=f'LG{j:010d}',
+            patient_id=dataset_uuid('patient', _skewed_index(rng, ctx['patients'])),
+            doctor_id=doctor_id,
+            department_id=department_id,
+            appointment_date=day,
+            appointment_time=clock,
+            estimated_duration=duration,
+            appointment_type=rng.choices(['NEW', 'FOLLOW_UP', 'CONSULTATION', 'CHECKUP', 'EMERGENCY'],
+                                         [45, 35, 8, 10, 2])[0],
+            priority=rng.choices(['LOW', 'NORMAL', 'HIGH', 'URGENT'], [10, 75, 12, 3])[0],
+            status=status,
+            queue_number=slot + 1,
+            chief_complaint=rng.choice(COMPLAINTS),
+            symptoms='',
+            notes='',
+            booked_by_id=rng.choice(ctx['receptionists']) if rng.random() < 0.6 else None,
+            confirmed_by_id=doctor_user if confirmed and (doctor_user := ctx['doctor_users'].get(doctor_id)) else None,
+            confirmed_at=created + timedelta(hours=rng.randint(1, 24)) if confirmed else None,
+            created_at=created,
+            updated_at=scheduled_at if offset <= 0 else created,
+            checked_in_at=scheduled_at - timedelta(minutes=rng.randint(5, 40)) if checked_in else None,
+            actual_start_time=scheduled_at + timedelta(minutes=rng.randint(0, 45)) if started else None,
+            actual_end_time=scheduled_at + timedelta(minutes=duration + rng.randint(0, 45)) if status == 'COMPLETED' else None,
+        ))
+    return [(Appointment, appointments)]
+
+
+def _build_prescriptions(rng, start, stop, ctx):
+    from apps.payments.models import Payment, PaymentReceipt, VNPayTransaction
+    from apps.prescriptions.models import Prescription, PrescriptionDispensing, PrescriptionItem
+
+    tz = timezone.get_current_timezone()
+    today = ctx['today']
+    now = ctx['now']
+    doctors = ctx['doctors']
+    drugs = ctx['drugs']
+    prescriptions, items, dispensing, payments, transactions, receipts = [], [], [], [], [], []
+
+    for k in range(start, stop):
+        prescription_id = dataset_uuid('prescription', k)
+        patient_index = _skewed_index(rng, ctx['patients'])
+        doctor_id, _department_id, _duration = rng.choice(doctors)
+        age_days = int(ctx['days'] * (rng.random() ** 0.75))
+        issued = _aware(today - timedelta(days=age_days), time(rng.randint(7, 16), rng.randint(0, 59)), tz)
+        issued = min(issued, now)
+        valid_until = issued + timedelta(days=30)
+
+        cancelled = rng.random() < 0.04
+        paid = not cancelled and rng.random() < (0.9 if age_days > 2 else 0.55)
+        if cancelled:
+            status, dispense_status = 'CANCELLED', 'CANCELLED'
+        elif paid:
+            dispense_status = rng.choices(['DISPENSED', 'PREPARED', 'PENDING'],
+                                          [92, 3, 5] if age_days > 1 else [40, 25, 35])[0]
+            status = 'FULLY_DISPENSED' if dispense_status == 'DISPENSED' else 'ACTIVE'
+        else:
+            dispense_status = 'UNPAID'
+            status = 'ACTIVE' if valid_until > now else 'EXPIRED'
+
+        has_insurance = patient_has_insurance(patient_index, ctx['seed'])
+        total = Decimal(0)
+        covered = Decimal(0)
+        item_count = rng.choices([1, 2, 3, 4, 5], [15, 30, 30, 17, 8])[0]
+        for n, (drug_id, unit_price, insurance_price) in enumerate(rng.sample(drugs, min(item_count, len(drugs)))):
+            item_id = dataset_uuid('prescription_item', f'{k}:{n}')
+            quantity = rng.choice([5, 7, 10, 14, 20, 28, 30, 60])
+            line_total = unit_price * quantity
+            total += line_total
+            if has_insurance and insurance_price:
+                covered += min(line_total, insurance_price * quantity)
+            items.append(PrescriptionItem(
+                id=item_id,
+                prescription_id=prescription_id,
+                drug_id=drug_id,
+                quantity=quantity,
+                dosage_per_time='1 viên',
+                frequency=rng.choice(FREQUENCIES),
+                route='ORAL',
+                duration_days=max(1, quantity // 2),
+                instructions='Uống sau ăn',
+                unit_price=unit_price,
+                total_price=line_total,
+                quantity_dispensed=quantity if dispense_status == 'DISPENSED' else 0,
+                created_at=issued,
+            ))
+            dispensing.append(PrescriptionDispensing(
+                id=dataset_uuid('dispensing', f'{k}:{n}'),
+                prescription_id=prescription_id,
+                prescription_item_id=item_id,
+                quantity_dispensed=quantity,
+                batch_number=f'LO{issued:%y%m}{n:02d}',
+                expiry_date=(issued + timedelta(days=rng.randint(365, 900))).date(),
+                pharmacist_id=rng.choice(ctx['pharmacists']),
+                status=dispense_status,
+                dispensed_at=issued + timedelta(hours=rng.randint(0, 6) if paid else 0, minutes=rng.randint(5, 59)),
+                notes='',
+            ))
+
+        patient_amount = total - covered
+        prescriptions.append(Prescription(
+            id=prescription_id,
+            prescription_number=f'DG{k:010d}',
+            patient_id=dataset_uuid('patient', patient_index),
+            doctor_id=doctor_id,
+            prescription_date=issued,
+            prescription_type=rng.choices(['OUTPATIENT', 'INPATIENT', 'EMERGENCY', 'DISCHARGE'], [85, 6, 4, 5])[0],
+            status=status,
+            diagnosis=rng.choice(DIAGNOSES),
+            notes='',
+            special_instructions='',
+            valid_from=issued,
+            valid_until=valid_until,
+            total_amount=total,
+            insurance_covered_amount=covered,
+            patient_payment_amount=patient_amount,
+            created_by_id=ctx['doctor_users'].get(doctor_id),
+            created_at=issued,
+            updated_at=issued,
+        ))
+
+        # Thanh toán: đã trả -> 1 bản ghi PAID (có thể kèm 1 lần VNPAY thất bại trước đó),
+        # chưa trả -> đôi khi còn 1 giao dịch VNPAY đang chờ.
+        attempts = []
+        if paid:
+            if rng.random() < 0.05:
+                attempts.append(('VNPAY', 'FAILED'))
+            attempts.append(('CASH' if rng.random() < 0.45 else 'VNPAY', 'PAID'))
+        elif not cancelled and rng.random() < 0.2:
+            attempts.append(('VNPAY', 'PENDING'))
+
+        for n, (method, payment_status) in enumerate(attempts):
+            payment_id = dataset_uuid('payment', f'{k}:{n}')
+            paid_at = issued + timedelta(minutes=rng.randint(5, 120) + n * 10)
+            payment = Payment(
+                id=payment_id,
+                prescription_id=prescription_id,
+                method=method,
+                amount=patient_amount,
+                status=payment_status,
+                created_by_id=rng.choice(ctx['cashiers']) if method == 'CASH' else None,
+                created_at=paid_at,
+                updated_at=paid_at,
+            )
+            if method == 'VNPAY':
+                txn_ref = f'DT{paid_at:%Y%m%d%H%M%S}{payment_id}'
+                response_code = {'PAID': '00', 'FAILED': '24', 'PENDING': ''}[payment_status]
+                transaction_no = f'{14000000 + k * 2 + n}' if payment_status == 'PAID' else ''
+                pay_date = f'{paid_at:%Y%m%d%H%M%S}' if payment_status == 'PAID' else ''
+                bank_code = rng.choice(['NCB', 'VCB', 'TCB', 'ACB', 'VNPAYQR']) if payment_status != 'PENDING' else ''
+                payment.vnp_TxnRef = txn_ref
+                payment.vnp_Amount = int(patient_amount * 100)
+                payment.vnp_OrderInfo = f'Thanh toan don thuoc DG{k:010d}'
+                payment.vnp_ResponseCode = response_code
+                payment.vnp_TransactionNo = transaction_no
+                payment.vnp_BankCode = bank_code
+                payment.vnp_PayDate = pay_date
+                transactions.append(VNPayTransaction(
+                    id=dataset_uuid('vnpay_transaction', f'{k}:{n}'),
+                    payment_id=payment_id,
+                    vnp_TxnRef=txn_ref,
+                    vnp_Amount=int(patient_amount * 100),
+                    vnp_OrderInfo=payment.vnp_OrderInfo,
+                    vnp_CreateDate=f'{paid_at:%Y%m%d%H%M%S}',
+                    vnp_IpAddr='127.0.0.1',
+                    vnp_ResponseCode=response_code,
+                    vnp_TransactionNo=transaction_no,
+                    vnp_BankCode=bank_code,
+                    vnp_PayDate=pay_date,
+                    status=payment_status,
+                    created_at=paid_at,
+                    updated_at=paid_at,
+                ))
+            elif payment_status == 'PAID':
+                receipts.append(PaymentReceipt(
+                    id=dataset_uuid('receipt', f'{k}:{n}'),
+                    payment_id=payment_id,
+                    receipt_number=f'PG{k:010d}',
+                    cashier_id=payment.created_by_id,
+                    created_at=paid_at,
+                ))
+            payments.append(payment)
+
+    return [
+        (Prescription, prescriptions),
+        (PrescriptionItem, items),
+        (PrescriptionDispensing, dispensing),
+        (Payment, payments),
+        (VNPayTransaction, transactions),
+        (PaymentReceipt, receipts),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Generate a seeded, production-scale synthetic hospital dataset using bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small',
+                            help='Dataset scale preset (individual counts override it)')
+        for name in ('patients', 'doctors', 'pharmacists', 'drugs', 'appointments', 'prescriptions'):
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name} to generate')
+        parser.add_argument('--days', type=int, default=365, help='Days of history to spread records over')
+        parser.add_argument('--days-forward', type=int, default=30, help='Days of future appointments')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows generated per worker task')
+        parser.add_argument('--insert-batch', type=int, default=1000, help='Rows per INSERT statement')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Parallel worker processes (keep 1 on SQLite: it serialises writers)')
+
+    def handle(self, *args, **options):
+        counts = dict(PRESETS[options['preset']])
+        for name in counts:
+            if options.get(name) is not None:
+                counts[name] = options[name]
+        if counts['patients'] <= 0 or counts['doctors'] <= 0 or counts['drugs'] <= 0:
+            raise CommandError('patients, doctors and drugs must be positive')
+        if counts['patients'] > 10 ** 8:
+            raise CommandError('At most 100,000,000 patients are supported (phone number space)')
+
+        seed = options['seed']
+        now = timezone.now()
+        self.stdout.write(
+            'Generating dataset (seed=%s): %s' % (seed, ', '.join(f'{k}={v:,}' for k, v in counts.items()))
+        )
+
+        started = _time.monotonic()
+        ctx = self.create_reference_data(counts, seed)
+        ctx.update({
+            'seed': seed,
+            'now': now,
+            'today': timezone.localtime(now).date(),
+            'days': options['days'],
+            'days_forward': options['days_forward'],
+            'patients': counts['patients'],
+            'insert_batch': options['insert_batch'],
+        })
+
+        # Mỗi process con phải mở kết nối DB riêng
+        connections.close_all()
+        for kind in ('patients', 'appointments', 'prescriptions'):
+            self.run_phase(kind, counts[kind], options['batch_size'], options['workers'], ctx)
+
+        # bulk_create không phát signal: dựng lại bảng tổng hợp đơn thuốc theo ngày
+        from apps.prescriptions import rollup
+        self.stdout.write(f'→ prescription rollup: {rollup.rebuild():,} rows')
+        # ... và nhật ký phiên bản danh mục thuốc
+        from apps.prescriptions import catalog
+        self.stdout.write(f'→ drug catalog log: {catalog.rebuild():,} rows')
+
+        self.stdout.write(self.style.SUCCESS(f'Dataset generated in {_time.monotonic() - started:.1f}s'))
+
+    def run_phase(self, kind, total, batch_size, workers, ctx):
+        if total <= 0:
+            return
+        tasks = [(kind, start, min(start + batch_size, total), ctx) for start in range(0, total, batch_size)]
+        self.stdout.write(f'→ {kind}: {total:,} rows in {len(tasks)} batches')
+        phase_started = _time.monotonic()
+        done = 0
+        report_every = max(1, len(tasks) // 20)
+
+        def progress(n, finished):
+            if finished % report_every == 0 or finished == len(tasks):
+                rate = n / max(_time.monotonic() - phase_started, 1e-6)
+                self.stdout.write(f'  {kind}: {n:,}/{total:,} ({rate:,.0f} rows/s)')
+
+        if workers <= 1:
+            for finished, task in enumerate(tasks, 1):
+                done += _run_batch(task)[1]
+                progress(done, finished)
+            return
+
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_worker) as pool:
+            for finished, (_kind, n) in enumerate(pool.map(_run_batch, tasks), 1):
+                done += n
+                progress(done, finished)
+
+    def create_reference_data(self, counts, seed):
+        """Khoa, bác sĩ, nhân viên và danh mục thuốc: nhỏ, tạo trong process chính."""
+        from apps.appointments.models import Department, DoctorProfile
+        from apps.prescriptions.models import Drug, DrugCategory
+
+        rng = random.Random(f'{seed}:reference')
+        admin = User.objects.filter(is_superuser=True).first()
+        password = make_password('hospital123')
+
+        departments = []
+        for code, name, location, fee in DEPARTMENTS:
+            department, _ = Department.objects.get_or_create(
+                code=code,
+                defaults={'name': name, 'location': location, 'consultation_fee': fee},
+            )
+            departments.append(department)
+
+        def staff(prefix, user_type, count):
+            users = []
+            for i in range(count):
+                gender = 'M' if rng.random() < 0.5 else 'F'
+                users.append(User(
+                    username=f'gen_{prefix}_{i:05d}',
+                    password=password,
+                    first_name=f"{rng.choices(LAST_NAMES, LAST_NAME_WEIGHTS)[0]} {rng.choice(MIDDLE_NAMES[gender])}",
+                    last_name=rng.choice(GIVEN_NAMES[gender]),
+                    email=f'{prefix}{i}@hospital.example.com',
+                    user_type=user_type,
+                    employee_id=f'G{prefix[:2].upper()}{i:05d}',
+                    gender=gender,
+                ))
+            User.objects.bulk_create(users, batch_size=1000, ignore_conflicts=True)
+            return dict(User.objects.filter(username__startswith=f'gen_{prefix}_').values_list('username', 'id'))
+
+        doctor_users = staff('doctor', 'DOCTOR', counts['doctors'])
+        pharmacists = list(staff('pharmacist', 'PHARMACIST', max(1, counts['pharmacists'])).values())
+        receptionists = list(staff('reception', 'RECEPTION', max(1, counts['doctors'] // 25)).values())
+        cashiers = list(staff('cashier', 'CASHIER', max(1, counts['doctors'] // 50)).values())
+
+        profiles = []
+        for i, username in enumerate(sorted(doctor_users)):
+            department = departments[i % len(departments)]
+            profiles.append(DoctorProfile(
+                user_id=doctor_users[username],
+                department=department,
+                license_number=f'GCCHN{i:06d}',
+                degree=rng.choices(['BACHELOR', 'MASTER', 'DOCTOR', 'PROFESSOR'], [55, 30, 12, 3])[0],
+                specialization=department.name.replace('Khoa ', ''),
+                experience_years=rng.randint(1, 35),
+                max_patients_per_day=rng.choice([30, 40, 50]),
+                consultation_duration=rng.choice([10, 15, 15, 20]),
+            ))
+        DoctorProfile.objects.bulk_create(profiles, batch_size=1000, ignore_conflicts=True)
+        doctors = list(
+            DoctorProfile.objects.filter(user__username__startswith='gen_doctor_')
+            .values_list('id', 'department_id', 'consultation_duration', 'user_id')
+        )
+
+        categories = {}
+        for code, name in DRUG_CATEGORIES:
+            categories[code], _ = DrugCategory.objects.get_or_create(code=code, defaults={'name': name})
+
+        drugs = []
+        for i in range(counts['drugs']):
+            generic, category, form, unit, strengths, base_price = ACTIVE_INGREDIENTS[i % len(ACTIVE_INGREDIENTS)]
+            strength = strengths[(i // len(ACTIVE_INGREDIENTS)) % len(strengths)]
+            brand = BRAND_SUFFIXES[(i // len(ACTIVE_INGREDIENTS)) % len(BRAND_SUFFIXES)]
+            manufacturer, country = rng.choice(MANUFACTURERS)
+            unit_price = Decimal(int(base_price * rng.uniform(0.7, 1.8)) // 100 * 100 + 100)
+            drugs.append(Drug(
+                code=f'GD{i:06d}',
+                name=f'{generic}{brand} {strength}',
+                generic_name=generic,
+                brand_name=(generic + brand).strip(),
+                category=categories[category],
+                dosage_form=form,
+                strength=strength,
+                unit=unit,
+                indication='Theo chỉ định của bác sĩ',
+                unit_price=unit_price,
+                insurance_price=(unit_price * Decimal('0.8')).quantize(Decimal(1)) if rng.random() < 0.7 else None,
+                current_stock=rng.randint(0, 5000),
+                minimum_stock=rng.choice([20, 50, 100]),
+                maximum_stock=rng.choice([5000, 10000]),
+                manufacturer=manufacturer,
+                country_of_origin=country,
+                created_by=admin,
+            ))
+        Drug.objects.bulk_create(drugs, batch_size=1000, ignore_conflicts=True)
+        drug_rows = list(
+            Drug.objects.filter(code__startswith='GD', is_active=True)
+            .values_list('id', 'unit_price', 'insurance_price')
+        )
+
+        self.stdout.write(
+            f'Reference data: {len(departments)} departments, {len(doctors)} doctors, '
+            f'{len(pharmacists)} pharmacists, {len(drug_rows)} drugs'
+        )
+        return {
+            'admin_id': admin.id if admin else None,
+            'doctors': [(d[0], d[1], d[2]) for d in doctors],
+            'doctor_users': {d[0]: d[3] for d in doctors},
+            'pharmacists': pharmacists,
+            'receptionists': receptionists,
+            'cashiers': cashiers,
+            'drugs': drug_rows,
+        }
@@ -0,0 +1,210 @@
+"""
+Patient overview (``GET /api/patients/{id}/overview/``): profile, latest
+vitals, recent visits, upcoming appointments, active prescriptions with
+dispensing state and outstanding payments in one response.
+
+Each list section returns at most its limit (``?visits=&appointments=
+&prescriptions=&payments=``, capped at ``MAX_LIMIT``) plus ``has_more``, and
+is rendered through the sparse-fieldset serializers (``shared.utils.sparse_fields``)
+so only the rendered relations are joined. The query count does not grow with
+the data: at most 9 queries.
+
+With ``PATIENT_OVERVIEW_CACHE_SECONDS`` > 0 the payload is cached per patient
+and limits. Saves and deletes of the patient, its medical records,
+appointments, prescriptions, dispensing records and payments drop the cached
+copies on commit. Invalidation runs in the writing process, so multi-worker
+deployments need a shared cache backend.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from apps.appointments.models import Appointment
+from apps.appointments.serializers import AppointmentSerializer
+from apps.payments.events import status_changed as payment_status_changed
+from apps.payments.models import Payment
+from apps.payments.serializers import PaymentSerializer
+from apps.prescriptions.models import Prescription, PrescriptionDispensing, PrescriptionItem
+from apps.prescriptions.serializers import PrescriptionSerializer
+from shared.utils.sparse_fields import parse_fields
+
+from .models import MedicalRecord, Patient
+from .serializers import MedicalRecordSerializer, PatientSerializer
+
+DEFAULT_LIMITS = {'visits': 5, 'appointments': 5, 'prescriptions': 5, 'payments': 5}
+MAX_LIMIT = 20
+
+VITAL_FIELDS = [
+    'temperature', 'blood_pressure_systolic', 'blood_pressure_diastolic',
+    'heart_rate', 'respiratory_rate', 'weight', 'height',
+]
+UPCOMING_STATUSES = ['SCHEDULED', 'CONFIRMED', 'CHECKED_IN']
+ACTIVE_PRESCRIPTION_STATUSES = ['ACTIVE', 'PARTIALLY_DISPENSED']
+OUTSTANDING_PAYMENT_STATUSES = ['PENDING']
+
+# Fields rendered per section (same names as the full endpoints).
+VISIT_FIELDS = parse_fields(
+    'id,medical_record_number,visit_date,visit_type,department,status,doctor,doctor_name,'
+    'chief_complaint,preliminary_diagnosis,final_diagnosis,next_appointment'
+)
+APPOINTMENT_FIELDS = parse_fields(
+    'id,appointment_number,appointment_date,appointment_time,appointment_type,status,'
+    'status_display,queue_number,doctor,doctor_name,department,department_name,department_location'
+)
+PRESCRIPTION_FIELDS = parse_fields(
+    'id,prescription_number,prescription_date,status,status_display,dispensing_status,'
+    'dispensing_status_display,doctor_name,diagnosis,valid_until,is_valid,patient_payment_amount,'
+    'items_count,items.id,items.drug,items.drug_name,items.quantity,items.quantity_dispensed,'
+    'items.dosage_per_time,items.frequency_display,items.duration_days'
+)
+PAYMENT_FIELDS = parse_fields(
+    'id,prescription,prescription_number,method,amount,currency,status,created_at'
+)
+
+
+def parse_limits(query_params):
+    limits = {}
+    for section, default in DEFAULT_LIMITS.items():
+        try:
+            value = int(query_params.get(section, default))
+        except (TypeError, ValueError):
+            value = default
+        limits[section] = max(0, min(value, MAX_LIMIT))
+    return limits
+
+
+def _section(serializer_class, queryset, fields, limit):
+    """``{'results': [...], 'has_more': bool}`` for the first ``limit`` rows, in one fetch."""
+    if not limit:
+        return {'results': [], 'has_more': False}
+    queryset = serializer_class.optimize_queryset(queryset, fields)
+    rows = list(queryset[:limit + 1])
+    return {
+        'results': serializer_class(rows[:limit], many=True, fields=fields).data,
+        'has_more': len(rows) > limit,
+    }
+
+
+def _latest_vitals(patient):
+    has_vitals = Q()
+    for field in VITAL_FIELDS:
+        has_vitals |= Q(**{f'{field}__isnull': False})
+    record = (
+        patient.medical_records.filter(has_vitals)
+        .order_by('-visit_date')
+        .values('id', 'medical_record_number', 'visit_date', *VITAL_FIELDS)
+        .first()
+    )
+    if record is None:
+        return None
+    weight, height = record['weight'], record['height']
+    record['blood_pressure'] = (
+        f"{record['blood_pressure_systolic']}/{record['blood_pressure_diastolic']}"
+        if record['blood_pressure_systolic'] and record['blood_pressure_diastolic'] else None
+    )
+    record['bmi'] = round(weight / ((height / 100) ** 2), 1) if weight and height else None
+    return record
+
+
+def build_overview(patient, limits, context=None):
+    context = context or {}
+    today = timezone.localdate()
+
+    visits = patient.medical_records.order_by('-visit_date')
+    appointments = Appointment.objects.filter(
+        patient=patient, appointment_date__gte=today, status__in=UPCOMING_STATUSES,
+    ).order_by('appointment_date', 'appointment_time')
+    prescriptions = Prescription.objects.filter(
+        patient=patient, status__in=ACTIVE_PRESCRIPTION_STATUSES,
+    ).order_by('-prescription_date')
+    payments = Payment.objects.filter(
+        prescription__patient=patient, status__in=OUTSTANDING_PAYMENT_STATUSES,
+    ).order_by('-created_at')
+
+    return {
+        'profile': PatientSerializer(patient, context=context).data,
+        'latest_vitals': _latest_vitals(patient),
+        'recent_visits': _section(MedicalRecordSerializer, visits, VISIT_FIELDS, limits['visits']),
+        'upcoming_appointments': _section(
+            AppointmentSerializer, appointments, APPOINTMENT_FIELDS, limits['appointments']
+        ),
+        'active_prescriptions': _section(
+            PrescriptionSerializer, prescriptions, PRESCRIPTION_FIELDS, limits['prescriptions']
+        ),
+        'outstanding_payments': _section(PaymentSerializer, payments, PAYMENT_FIELDS, limits['payments']),
+    }
+
+
+# Per-patient cache
+
+def _cache_seconds():
+    return getattr(settings, 'PATIENT_OVERVIEW_CACHE_SECONDS', 0)
+
+
+def _generation_key(patient_id):
+    return f'patient-overview:{patient_id}:generation'
+
+
+def _cache_key(patient_id, limits):
+    generation = cache.get(_generation_key(patient_id))
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(_generation_key(patient_id), generation, None)
+    parts = ':'.join(str(limits[section]) for section in DEFAULT_LIMITS)
+    return f'patient-overview:{patient_id}:{generation}:{parts}'
+
+
+def get_overview(patient, limits, context=None):
+    timeout = _cache_seconds()
+    if timeout <= 0:
+        return build_overview(patient, limits, context)
+    key = _cache_key(patient.pk, limits)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_overview(patient, limits, context)
+        cache.set(key, payload, timeout)
+    return payload
+
+
+def invalidate(patient_id):
+    """Drop every cached overview of ``patient_id`` (all limit combinations)."""
+    cache.delete(_generation_key(patient_id))
+
+
+def _patient_id(instance):
+    """Patient of ``instance``; ``None`` when its prescription is already deleted."""
+    if isinstance(instance, Patient):
+        return instance.pk
+    if isinstance(instance, (MedicalRecord, Appointment, Prescription)):
+        return instance.patient_id
+    # PrescriptionItem, PrescriptionDispensing, Payment: the prescription already
+    # loaded with the instance, else only its patient_id
+    if type(instance).prescription.is_cached(instance):
+        return instance.prescription.patient_id
+    return (
+        Prescription.objects.filter(pk=instance.prescription_id)
+        .values_list('patient_id', flat=True).first()
+    )
+
+
+def _on_change(sender, instance, **kwargs):
+    if _cache_seconds() <= 0:
+        return
+    patient_id = _patient_id(instance)
+    if patient_id is None:
+        return
+    transaction.on_commit(lambda: invalidate(patient_id))
+
+
+for _model in (Patient, MedicalRecord, Appointment, Prescription,
+               PrescriptionItem, PrescriptionDispensing, Payment):
+    post_save.connect(_on_change, sender=_model, dispatch_uid=f'patient-overview:save:{_model._meta.label}')
+    post_delete.connect(_on_change, sender=_model, dispatch_uid=f'patient-overview:delete:{_model._meta.label}')
+
+# Luồng thanh toán đổi trạng thái bằng UPDATE (apps.payments.transitions), không qua save()
+payment_status_changed.connect(_on_change, sender=Payment, dispatch_uid='patient-overview:payment-status')
@@ -4,10 +4,11 @@ from .models import Patient, MedicalRecord, PatientDocument
 from datetime import date
 import re
 from rest_framework.validators import UniqueValidator
+from shared.utils.sparse_fields import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     age = serializers.ReadOnlyField(help_text="Tuổi tính từ ngày sinh")
     full_address = serializers.ReadOnlyField(help_text="Địa chỉ đầy đủ")
     insurance_status = serializers.ReadOnlyField(help_text="Trạng thái BHYT")
@@ -134,7 +135,7 @@ class PatientSearchSerializer(serializers.Serializer):
     has_insurance = serializers.BooleanField(required=False)
     is_active = serializers.BooleanField(required=False, default=True)
 
-class MedicalRecordSerializer(serializers.ModelSerializer):
+class MedicalRecordSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     patient_code = serializers.CharField(source='patient.patient_code', read_only=True)
     doctor_name = serializers.CharField(source='doctor.full_name', read_only=True)
@@ -176,7 +177,7 @@ class PatientDocumentSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.file.url)
         return None
 
-class PatientSummarySerializer(serializers.ModelSerializer):
+class PatientSummarySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Simplified patient serializer for lists and references"""
     age = serializers.ReadOnlyField()
     
@@ -14,12 +14,16 @@ try:
 except Exception:
     VN_PROVINCES_PATH = None
 
+from . import overview
 from .models import Patient, MedicalRecord, PatientDocument
 from .serializers import (
     PatientSerializer, PatientCreateSerializer, PatientSearchSerializer,
     MedicalRecordSerializer, PatientDocumentSerializer, PatientSummarySerializer
 )
 from shared.permissions.base_permissions import HasPermission
+from shared.db.instrumentation import QueryBudget
+from shared.utils.conditional import ConditionalGetMixin
+from shared.utils.sparse_fields import SparseFieldsetViewMixin
 
 # Import User for auto account creation
 from django.contrib.auth import get_user_model
@@ -27,7 +31,7 @@ from apps.users.serializers import UserCreateSerializer
 
 User = get_user_model()
 
-class PatientViewSet(ModelViewSet):
+class PatientViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, ModelViewSet):
     """
     Patient Management ViewSet
     
@@ -42,6 +46,19 @@ class PatientViewSet(ModelViewSet):
     search_fields = ['full_name', 'patient_code', 'phone_number', 'citizen_id']
     ordering_fields = ['full_name', 'created_at', 'date_of_birth']
     ordering = ['-created_at']
+    # Báo cáo nặng: đọc từ replica (shared.db.routers)
+    read_replica_actions = ['statistics']
+    # Giới hạn tần suất theo nhóm route (shared.throttling)
+    throttle_scopes = {'list': 'search', 'search': 'search', 'statistics': 'reporting'}
+    # patient + vitals + visits + appointments + prescriptions (+ dispensing, items, drugs)
+    # + payments; the user row is read twice (JWTAuthMiddleware and DRF authentication)
+    query_budgets = {
+        'overview': QueryBudget(max_queries=11, max_duplicates=2),
+    }
+    # ETag/Last-Modified (shared.utils.conditional): created_by_name, updated_by_name;
+    # age và insurance_status đổi theo ngày
+    etag_related = ['created_by', 'updated_by']
+    etag_vary_by_date = True
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -67,6 +84,13 @@ class PatientViewSet(ModelViewSet):
         
         return super().get_permissions()
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'overview':
+            # created_by_name / updated_by_name trong phần hồ sơ
+            queryset = queryset.select_related('created_by', 'updated_by')
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return PatientCreateSerializer
@@ -208,6 +232,31 @@ class PatientViewSet(ModelViewSet):
         serializer = MedicalRecordSerializer(records, many=True)
         return Response(serializer.data)
     
+    @extend_schema(
+        summary="Patient Overview",
+        description=(
+            "Profile, latest vitals, recent visits, upcoming appointments, active prescriptions "
+            "with dispensing state and outstanding payments in one response"
+        ),
+        parameters=[
+            OpenApiParameter('visits', int, description="Số lần khám gần đây (mặc định 5, tối đa 20)"),
+            OpenApiParameter('appointments', int, description="Số lịch hẹn sắp tới"),
+            OpenApiParameter('prescriptions', int, description="Số đơn thuốc đang hiệu lực"),
+            OpenApiParameter('payments', int, description="Số thanh toán chưa hoàn tất"),
+        ],
+        responses={200: dict}
+    )
+    @action(detail=True, methods=['get'])
+    def overview(self, request, pk=None):
+        """
+        Patient Overview
+        
+        Everything the patient detail page needs, with a fixed number of queries.
+        """
+        patient = self.get_object()
+        limits = overview.parse_limits(request.query_params)
+        return Response(overview.get_overview(patient, limits, {'request': request}))
+    
     @extend_schema(
         summary="Get Documents",
         description="Returns all uploaded documents for the specified patient",
@@ -6,4 +6,19 @@ class PaymentsConfig(AppConfig):
     name = 'apps.payments'
     verbose_name = 'Payments'
 
+    def ready(self):
+        # Tác động khi trạng thái thanh toán đổi (mở cấp thuốc, báo client đang chờ)
+        from . import events  # noqa: F401
+
+        # Lưu trữ giao dịch VNPAY đã có kết quả (giao dịch PENDING còn nhận IPN)
+        from django.db.models import Q
+        from shared.archive import registry as archive
+        from .models import VNPayTransaction
+
+        archive.register(
+            'vnpay_transactions', VNPayTransaction, 'created_at', retention_days=365,
+            exclude=Q(status='PENDING'),
+            filter_fields=['payment_id', 'vnp_TxnRef', 'status'],
+        )
+
 
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('payments/check_vnpay_status/', async_views.check_vnpay_status,
+         name='async-payment-check-vnpay-status'),
+    path('payments/status_stream/', async_views.payment_status_stream,
+         name='async-payment-status-stream'),
+]
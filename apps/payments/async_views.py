@@ -0,0 +1,187 @@
+"""
+Async (ASGI) payment status endpoints, mounted under /api/async/.
+
+The portal waits on a payment while the patient pays. Instead of
+re-requesting ``check_vnpay_status`` / ``by_prescription`` every second it can
+
+- long-poll: ``check_vnpay_status/?vnp_TxnRef=...&since=PENDING&wait=25``
+  returns as soon as the status differs from ``since`` (or after ``wait``
+  seconds, capped at ``PAYMENT_STATUS_MAX_WAIT``), or
+- stream: ``status_stream/?vnp_TxnRef=...`` is a Server-Sent Events stream
+  with a ``status`` event per change, closed once the status is final.
+
+Both take ``payment_id=`` instead of ``vnp_TxnRef`` (cash payments).
+
+Waiters subscribe to the payment's channel (``apps.payments.events``) and
+sleep until ``Payment.save()`` publishes a status change: a waiting client
+costs no queries and holds no worker thread, only the initial lookup and the
+re-read after a change touch the database. ``PAYMENT_STATUS_RECHECK_SECONDS``
+(0 = never) adds a periodic status query: on the ``local`` pub/sub backend,
+changes made by another worker are not delivered and are only seen through
+it, so it defaults to 3 there when ``WEB_CONCURRENCY`` > 1 and to 0 otherwise.
+"""
+import asyncio
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+
+from shared.pubsub.broker import get_broker
+from shared.utils.async_views import async_api_view, dumps, json_response
+
+from .events import channel
+from .models import Payment
+from .serializers import PaymentSerializer
+
+TERMINAL_STATUSES = {'PAID', 'FAILED', 'REFUNDED', 'CANCELLED'}
+
+
+def _lookup(request):
+    """Filter kwargs for the requested payment, ``None`` if neither parameter is given."""
+    txn_ref = request.GET.get('vnp_TxnRef')
+    if txn_ref:
+        return {'vnp_TxnRef': txn_ref, 'method': 'VNPAY'}
+    payment_id = request.GET.get('payment_id')
+    if payment_id:
+        return {'pk': payment_id}
+    return None
+
+
+async def _get_payment(lookup):
+    try:
+        return await Payment.objects.filter(**lookup).select_related('prescription', 'created_by').afirst()
+    except ValidationError:
+        # payment_id không phải UUID
+        return None
+
+
+async def _get_status(payment_id):
+    return await Payment.objects.filter(pk=payment_id).values_list('status', flat=True).afirst()
+
+
+def _missing_lookup():
+    return json_response({'error': 'vnp_TxnRef hoặc payment_id là bắt buộc'}, status=400)
+
+
+def _not_found():
+    return json_response({'error': 'Không tìm thấy giao dịch VNPAY'}, status=404)
+
+
+def _parse_wait(value):
+    try:
+        wait = float(value or 0)
+    except ValueError:
+        return 0.0
+    return max(0.0, min(wait, getattr(settings, 'PAYMENT_STATUS_MAX_WAIT', 30)))
+
+
+async def _next_status(subscription, payment_id, timeout):
+    """
+    The status announced on ``subscription`` within ``timeout`` seconds, else ``None``.
+
+    With ``PAYMENT_STATUS_RECHECK_SECONDS`` set, the stored status is read
+    at that interval as well.
+    """
+    recheck = getattr(settings, 'PAYMENT_STATUS_RECHECK_SECONDS', 0)
+    if not recheck:
+        message = await subscription.get(timeout)
+        return message and message.get('status')
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        message = await subscription.get(min(recheck, remaining))
+        if message is not None:
+            return message.get('status')
+        if remaining > recheck:
+            stored = await _get_status(payment_id)
+            if stored is not None:
+                return stored
+
+
+@async_api_view(authenticated=True)
+async def check_vnpay_status(request):
+    """``PaymentViewSet.check_vnpay_status`` with optional long-polling."""
+    lookup = _lookup(request)
+    if lookup is None:
+        return _missing_lookup()
+
+    payment = await _get_payment(lookup)
+    if payment is None:
+        return _not_found()
+
+    since = request.GET.get('since')
+    wait = _parse_wait(request.GET.get('wait'))
+    if since and wait and payment.status == since:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        async with get_broker().subscribe(channel(payment.pk)) as subscription:
+            # Subscribed first, then re-read: a change committed in between is not lost.
+            current = await _get_status(payment.pk)
+            while current == since:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                current = await _next_status(subscription, payment.pk, remaining) or since
+        if current != since:
+            payment = await _get_payment({'pk': payment.pk})
+            if payment is None:
+                return _not_found()
+
+    return json_response(PaymentSerializer(payment, context={'request': request}).data)
+
+
+def _event(name, data):
+    return f'event: {name}\ndata: {dumps(data)}\n\n'
+
+
+async def _status_events(payment, request):
+    loop = asyncio.get_running_loop()
+    heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15)
+    deadline = loop.time() + getattr(settings, 'PAYMENT_STATUS_STREAM_SECONDS', 300)
+
+    async with get_broker().subscribe(channel(payment.pk)) as subscription:
+        # Read after subscribing so no change slips between the two.
+        payment = await _get_payment({'pk': payment.pk})
+        if payment is None:
+            return
+        yield _event('status', PaymentSerializer(payment, context={'request': request}).data)
+        status = payment.status
+        last_sent = loop.time()
+        while status not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            wait = min(heartbeat - (loop.time() - last_sent), remaining)
+            current = await _next_status(subscription, payment.pk, max(wait, 0))
+            if current is not None and current != status:
+                payment = await _get_payment({'pk': payment.pk})
+                if payment is None:
+                    return
+                status = payment.status
+                yield _event('status', PaymentSerializer(payment, context={'request': request}).data)
+                last_sent = loop.time()
+            elif loop.time() - last_sent >= heartbeat:
+                # Comment line: keeps proxies from closing an idle connection.
+                yield ': keep-alive\n\n'
+                last_sent = loop.time()
+
+
+@async_api_view(authenticated=True)
+async def payment_status_stream(request):
+    """Server-Sent Events stream of a payment's status until it is final."""
+    lookup = _lookup(request)
+    if lookup is None:
+        return _missing_lookup()
+
+    payment = await _get_payment(lookup)
+    if payment is None:
+        return _not_found()
+
+    response = StreamingHttpResponse(_status_events(payment, request), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,40 @@
+"""
+Payment status change notifications.
+
+``status_changed`` is sent (``sender=Payment, instance=payment,
+status=...``) inside the transaction that changed a payment's status, once
+per change: by ``apps.payments.transitions`` and by ``Payment.save()`` when
+the status differs from the one loaded. The receivers below release the
+prescription for dispensing on PAID and publish ``{'status': ...}`` on
+``payment:<id>`` (``shared.pubsub``) after commit, which wakes the portal's
+long-poll and SSE waiters in ``apps.payments.async_views``.
+"""
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from shared.pubsub.broker import get_broker
+
+status_changed = Signal()
+
+
+def channel(payment_id):
+    return f'payment:{payment_id}'
+
+
+def publish_status(payment):
+    """Announce ``payment``'s new status after the current transaction commits."""
+    message = {'status': payment.status}
+    name = channel(payment.pk)
+    transaction.on_commit(lambda: get_broker().publish(name, message))
+
+
+@receiver(status_changed, dispatch_uid='payments:release-dispensing')
+def release_dispensing(sender, instance, status, **kwargs):
+    # Thanh toán thành công: chuyển dispensing status từ UNPAID sang PENDING
+    if status == 'PAID':
+        instance.prescription.mark_as_paid()
+
+
+@receiver(status_changed, dispatch_uid='payments:publish-status')
+def announce_status(sender, instance, **kwargs):
+    publish_status(instance)
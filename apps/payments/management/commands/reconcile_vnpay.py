@@ -0,0 +1,57 @@
+"""
+Management command đối soát giao dịch VNPAY với file quyết toán CSV
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.reconciliation import SettlementFormatError, SettlementReconciler, new_report_path
+
+
+def _day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Ngày không hợp lệ: {value} (YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Đối soát thanh toán VNPAY với file quyết toán (CSV) và ghi báo cáo chênh lệch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('settlement_file', help='File CSV quyết toán của VNPAY')
+        parser.add_argument('--from', dest='date_from', type=_day, required=True, help='Ngày bắt đầu kỳ YYYY-MM-DD')
+        parser.add_argument('--to', dest='date_to', type=_day, help='Ngày kết thúc kỳ YYYY-MM-DD (mặc định = --from)')
+        parser.add_argument('--lookback-days', type=int, default=7,
+                            help='Số ngày trước kỳ vẫn được khớp (giao dịch quyết toán trễ)')
+        parser.add_argument('--amount-divisor', type=int, default=1,
+                            help='Chia số tiền trong file cho giá trị này (100 nếu file dùng đơn vị vnp_Amount)')
+        parser.add_argument('--include-matched', action='store_true', help='Ghi cả dòng khớp vào báo cáo')
+        parser.add_argument('--report', help='Đường dẫn file báo cáo (mặc định trong RECONCILIATION_REPORT_DIR)')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Bảng mã của file quyết toán')
+
+    def handle(self, *args, **options):
+        date_from = options['date_from']
+        date_to = options['date_to'] or date_from
+        if date_to < date_from:
+            raise CommandError('--to phải sau --from')
+
+        reconciler = SettlementReconciler(
+            date_from, date_to,
+            lookback_days=options['lookback_days'],
+            amount_divisor=options['amount_divisor'],
+            include_matched=options['include_matched'],
+        )
+        report = options['report'] or new_report_path(date_from, date_to)
+        try:
+            with open(options['settlement_file'], encoding=options['encoding'], newline='') as lines, \
+                    open(report, 'w', encoding='utf-8', newline='') as report_file:
+                counts = reconciler.run(lines, report_file)
+        except FileNotFoundError as exc:
+            raise CommandError(str(exc))
+        except SettlementFormatError as exc:
+            raise CommandError(str(exc))
+
+        for category, count in counts.items():
+            self.stdout.write(f'{category}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Báo cáo: {report}'))
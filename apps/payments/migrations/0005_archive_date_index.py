@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_remove_payment_qr_code_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="vnpaytransaction",
+            index=models.Index(
+                fields=["created_at"], name="vnpay_trans_created_381599_idx"
+            ),
+        ),
+    ]
@@ -68,23 +68,24 @@ class Payment(models.Model):
     def is_success(self) -> bool:
         return self.status == 'PAID'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Trạng thái lúc đọc, để save() nhận ra thay đổi mà không SELECT lại
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def save(self, *args, **kwargs):
-        # Kiểm tra nếu trạng thái chuyển sang PAID
-        is_new = self.pk is None
-        old_status = None
-        
-        if not is_new:
-            try:
-                old_payment = Payment.objects.get(pk=self.pk)
-                old_status = old_payment.status
-            except Payment.DoesNotExist:
-                old_status = None
-        
+        # Luồng thanh toán (VNPAY, tiền mặt, hủy) dùng transitions.transition()
+        # để an toàn khi chạy đồng thời; save() phục vụ tạo mới và sửa trực tiếp.
+        old_status = getattr(self, '_loaded_status', None)
         super().save(*args, **kwargs)
-        
-        # Nếu thanh toán thành công, cập nhật dispensing status từ UNPAID sang PENDING
-        if self.status == 'PAID' and old_status != 'PAID':
-            self.prescription.mark_as_paid()
+        self._loaded_status = self.status
+
+        # Mở cấp thuốc khi PAID, báo cho client đang chờ (apps.payments.events)
+        if self.status != old_status:
+            from .events import status_changed
+            status_changed.send(sender=Payment, instance=self, status=self.status)
 
     @staticmethod
     def calculate_due_amount(prescription) -> Decimal:
@@ -132,6 +133,9 @@ class VNPayTransaction(models.Model):
         verbose_name = 'Giao dịch VNPAY'
         verbose_name_plural = 'Giao dịch VNPAY'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
     
     def __str__(self) -> str:
         return f"{self.vnp_TxnRef} - {self.payment.prescription.prescription_number}"
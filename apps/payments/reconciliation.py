@@ -0,0 +1,202 @@
+"""
+Đối soát thanh toán VNPAY với file quyết toán (settlement) của cổng thanh toán.
+
+    reconciler = SettlementReconciler(date_from, date_to)
+    summary = reconciler.run(settlement_lines, report_file)
+
+Các giao dịch VNPAY của hệ thống trong khoảng ngày (cộng ``lookback_days``
+trước đó cho giao dịch quyết toán trễ) được nạp vào một chỉ mục băm bằng một
+truy vấn duy nhất, khóa theo ``vnp_TxnRef`` và ``vnp_TransactionNo``. File
+quyết toán được đọc từng dòng (``csv.reader``), nên bộ nhớ chỉ phụ thuộc vào số
+giao dịch của kỳ đối soát, không phụ thuộc số dòng của file.
+
+Phân loại mỗi dòng của file:
+
+- ``matched``: có giao dịch PAID cùng số tiền;
+- ``amount_mismatch``: có giao dịch nhưng số tiền khác;
+- ``status_mismatch``: cổng đã quyết toán nhưng hệ thống chưa ghi PAID;
+- ``duplicate``: giao dịch đã xuất hiện ở dòng trước;
+- ``orphan``: không tìm thấy giao dịch trong hệ thống.
+
+Sau khi đọc hết file, giao dịch PAID tạo trong kỳ mà file không có là
+``missing``. Báo cáo CSV ghi mọi dòng không khớp (và dòng khớp nếu
+``include_matched``) theo luồng.
+"""
+import csv
+import os
+import re
+from array import array
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.utils import timezone
+
+from shared.utils.dates import local_day_range
+
+from .models import Payment
+
+# Tên cột chấp nhận trong file quyết toán (so sánh không phân biệt hoa thường)
+COLUMN_ALIASES = {
+    'txn_ref': ('vnp_txnref', 'txnref', 'txn_ref', 'ma_giao_dich_merchant', 'merchant_txn_ref'),
+    'transaction_no': ('vnp_transactionno', 'transactionno', 'transaction_no', 'ma_giao_dich_vnpay'),
+    'amount': ('vnp_amount', 'amount', 'so_tien'),
+}
+
+CATEGORIES = ('matched', 'amount_mismatch', 'status_mismatch', 'duplicate', 'orphan', 'missing')
+REPORT_HEADER = [
+    'category', 'line', 'vnp_TxnRef', 'vnp_TransactionNo', 'payment_id',
+    'settlement_amount', 'system_amount', 'system_status',
+]
+REPORT_NAME_RE = re.compile(r'^vnpay-\d{8}-\d{8}-\d{14}\.csv$')
+
+
+class SettlementFormatError(ValueError):
+    """File quyết toán thiếu cột bắt buộc hoặc có số tiền không hợp lệ."""
+
+
+def report_dir():
+    return str(getattr(settings, 'RECONCILIATION_REPORT_DIR', os.path.join(settings.BASE_DIR, 'reports')))
+
+
+def new_report_path(date_from, date_to):
+    """Đường dẫn file báo cáo mới trong ``RECONCILIATION_REPORT_DIR``."""
+    os.makedirs(report_dir(), exist_ok=True)
+    stamp = timezone.localtime().strftime('%Y%m%d%H%M%S')
+    name = f'vnpay-{date_from:%Y%m%d}-{date_to:%Y%m%d}-{stamp}.csv'
+    return os.path.join(report_dir(), name)
+
+
+def report_path(name):
+    """Đường dẫn của báo cáo ``name`` (``None`` nếu tên không hợp lệ)."""
+    if not REPORT_NAME_RE.match(name or ''):
+        return None
+    return os.path.join(report_dir(), name)
+
+
+def _parse_amount(value, divisor):
+    try:
+        amount = Decimal(value.replace(',', '').replace(' ', '') or 'x')
+    except InvalidOperation:
+        return None
+    return int(amount / divisor)
+
+
+class SettlementReconciler:
+    def __init__(self, date_from, date_to, lookback_days=7, amount_divisor=1, include_matched=False):
+        self.start, self.end = local_day_range(date_from, date_to)
+        self.lookback_days = lookback_days
+        self.amount_divisor = amount_divisor
+        self.include_matched = include_matched
+
+    def build_index(self):
+        """Nạp giao dịch VNPAY của kỳ (một truy vấn) vào các mảng song song."""
+        self.by_ref = {}
+        self.by_transaction_no = {}
+        self.payment_ids = []
+        self.refs = []
+        self.transaction_nos = []
+        self.statuses = []
+        self.amounts = array('q')
+        self.in_period = bytearray()
+
+        rows = Payment.objects.filter(
+            method='VNPAY',
+            created_at__gte=self.start - timedelta(days=self.lookback_days),
+            created_at__lt=self.end,
+        ).exclude(vnp_TxnRef='').order_by().values_list(
+            'id', 'vnp_TxnRef', 'vnp_TransactionNo', 'amount', 'status', 'created_at'
+        )
+        for payment_id, ref, transaction_no, amount, status, created_at in rows.iterator(chunk_size=5000):
+            position = len(self.payment_ids)
+            # Một mã tham chiếu dùng lại cho nhiều lần thử: ưu tiên lần đã PAID
+            previous = self.by_ref.get(ref)
+            if previous is None or status == 'PAID' or self.statuses[previous] != 'PAID':
+                self.by_ref[ref] = position
+            if transaction_no:
+                self.by_transaction_no[transaction_no] = position
+            self.payment_ids.append(str(payment_id))
+            self.refs.append(ref)
+            self.transaction_nos.append(transaction_no)
+            self.statuses.append(status)
+            self.amounts.append(int(amount))
+            self.in_period.append(created_at >= self.start)
+        self.seen = bytearray(len(self.payment_ids))
+
+    def _columns(self, header):
+        normalized = [name.strip().lower().replace(' ', '_') for name in header]
+        columns = {}
+        for key, aliases in COLUMN_ALIASES.items():
+            for index, name in enumerate(normalized):
+                if name in aliases:
+                    columns[key] = index
+                    break
+        if 'amount' not in columns or not ({'txn_ref', 'transaction_no'} & set(columns)):
+            raise SettlementFormatError(
+                'File quyết toán cần cột số tiền và vnp_TxnRef hoặc vnp_TransactionNo'
+            )
+        return columns
+
+    def classify(self, position, amount):
+        if self.seen[position]:
+            return 'duplicate'
+        self.seen[position] = 1
+        if self.amounts[position] != amount:
+            return 'amount_mismatch'
+        if self.statuses[position] != 'PAID':
+            return 'status_mismatch'
+        return 'matched'
+
+    def run(self, lines, report_file):
+        """
+        Đối soát ``lines`` (iterable các dòng text của file CSV, có dòng tiêu đề)
+        và ghi báo cáo vào ``report_file``. Trả về số dòng theo từng loại.
+        """
+        self.build_index()
+        counts = dict.fromkeys(CATEGORIES, 0)
+        writer = csv.writer(report_file)
+        writer.writerow(REPORT_HEADER)
+
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            raise SettlementFormatError('File quyết toán rỗng')
+        columns = self._columns(header)
+
+        def cell(row, key):
+            index = columns.get(key)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        for row in reader:
+            if not any(row):
+                continue
+            line_number = reader.line_num
+            ref, transaction_no = cell(row, 'txn_ref'), cell(row, 'transaction_no')
+            amount = _parse_amount(cell(row, 'amount'), self.amount_divisor)
+            if amount is None:
+                raise SettlementFormatError(f'Số tiền không hợp lệ ở dòng {line_number}')
+
+            position = self.by_ref.get(ref) if ref else None
+            if position is None and transaction_no:
+                position = self.by_transaction_no.get(transaction_no)
+
+            if position is None:
+                category = 'orphan'
+                writer.writerow([category, line_number, ref, transaction_no, '', amount, '', ''])
+            else:
+                category = self.classify(position, amount)
+                if category != 'matched' or self.include_matched:
+                    writer.writerow([
+                        category, line_number, ref, transaction_no, self.payment_ids[position],
+                        amount, self.amounts[position], self.statuses[position],
+                    ])
+            counts[category] += 1
+
+        for position, seen in enumerate(self.seen):
+            if not seen and self.in_period[position] and self.statuses[position] == 'PAID':
+                counts['missing'] += 1
+                writer.writerow([
+                    'missing', '', self.refs[position], self.transaction_nos[position],
+                    self.payment_ids[position], '', self.amounts[position], self.statuses[position],
+                ])
+        return counts
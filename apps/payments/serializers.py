@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Payment, PaymentReceipt, VNPayTransaction
+from shared.utils.sparse_fields import SparseFieldsetSerializerMixin
 import uuid
 
 User = get_user_model()
@@ -34,7 +35,7 @@ class PrescriptionField(serializers.Field):
         return str(value.id) if value else None
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     prescription_number = serializers.CharField(source='prescription.prescription_number', read_only=True)
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     vnpay_payment_url = serializers.SerializerMethodField()
@@ -120,8 +120,8 @@ class VNPayService:
             # Sort parameters
             vnp_Params = sorted(response_data.items())
             
-            # Create hash string
-            hash_data = "&".join([f"{k}={v}" for k, v in vnp_Params])
+            # Create hash string (URL-encoded values, as VNPAY signs them and as create_payment_url does)
+            hash_data = "&".join([f"{k}={urllib.parse.quote_plus(str(v))}" for k, v in vnp_Params])
             
             # Generate hash for verification
             check_sum = hmac.new(
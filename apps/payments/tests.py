@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import urllib.parse
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.appointments.models import Department, DoctorProfile
+from apps.patients.models import Patient
+from apps.prescriptions.models import Prescription
+from apps.users.models import User
+
+from .models import Payment
+from .services import VNPayService
+
+
+def gateway_signed(params):
+    """``params`` plus ``vnp_SecureHash`` computed the way the VNPAY gateway does."""
+    hash_data = '&'.join(f'{k}={urllib.parse.quote_plus(str(v))}' for k, v in sorted(params.items()))
+    secure_hash = hmac.new(
+        VNPayService().vnp_HashSecret.encode('utf-8'), hash_data.encode('utf-8'), hashlib.sha512
+    ).hexdigest()
+    return {**params, 'vnp_SecureHash': secure_hash}
+
+
+class VNPayCallbackTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(
+            username='bs.an', password='x', first_name='An', last_name='Nguyễn', user_type='DOCTOR',
+        )
+        department = Department.objects.create(code='NOI', name='Nội khoa')
+        doctor = DoctorProfile.objects.create(
+            user=user, department=department, license_number='CCHN-001', degree='MD',
+            specialization='INTERNAL_MEDICINE', experience_years=5,
+        )
+        patient = Patient.objects.create(
+            full_name='Trần Thị Bình', date_of_birth=date(1990, 1, 1), gender='F',
+            phone_number='0901234567', address='1 Lê Lợi', ward='Bến Nghé', province='Hồ Chí Minh',
+        )
+        now = timezone.now()
+        prescription = Prescription.objects.create(
+            patient=patient, doctor=doctor, diagnosis='Viêm họng',
+            valid_from=now, valid_until=now + timedelta(days=7),
+        )
+        cls.payment = Payment.objects.create(
+            prescription=prescription, method='VNPAY', amount=150000, vnp_TxnRef='DT20261019000000TEST',
+        )
+
+    def result(self, **extra):
+        return gateway_signed({
+            'vnp_Amount': '15000000',
+            'vnp_BankCode': 'NCB',
+            'vnp_OrderInfo': 'Thanh toan don thuoc DT20261019000000TEST',
+            'vnp_ResponseCode': '00',
+            'vnp_TmnCode': VNPayService().vnp_TmnCode,
+            'vnp_TransactionNo': '14123456',
+            'vnp_TransactionStatus': '00',
+            'vnp_TxnRef': self.payment.vnp_TxnRef,
+            **extra,
+        })
+
+    def test_return_signed_by_gateway_marks_payment_paid(self):
+        response = self.client.get('/api/vnpay_return/', self.result())
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'PAID')
+        self.assertIn('payment=success', response['Location'])
+
+    def test_return_with_altered_order_info_is_rejected(self):
+        params = self.result()
+        params['vnp_OrderInfo'] += ' x'
+        response = self.client.get('/api/vnpay_return/', params)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'PENDING')
+        self.assertIn('error=97', response['Location'])
+
+    def test_ipn_is_accepted_over_get(self):
+        response = self.client.get('/api/vnpay_ipn/', self.result())
+
+        self.assertEqual(response.json()['RspCode'], '00')
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, 'PAID')
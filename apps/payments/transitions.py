@@ -0,0 +1,71 @@
+"""
+Chuyển trạng thái thanh toán an toàn khi có nhiều yêu cầu đồng thời.
+
+    if transitions.transition(payment, 'PAID', vnp_TransactionNo=...):
+        ...  # yêu cầu này đã chuyển trạng thái
+
+Mỗi lần chuyển là một câu ``UPDATE payments SET status = ... WHERE id = ...
+AND status IN (...)``, không đọc lại trạng thái trước. Khi IPN lặp lại, người
+dùng quay về từ VNPAY cùng lúc với IPN hay thu ngân bấm xác nhận hai lần, chỉ
+một yêu cầu cập nhật được hàng; các yêu cầu còn lại nhận ``False`` và không
+làm gì thêm. Yêu cầu thắng cập nhật ``VNPayTransaction`` và gửi
+``events.status_changed`` (mở cấp thuốc cho đơn, báo cho client đang chờ)
+trong cùng transaction, nên các tác động này chạy đúng một lần.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .events import status_changed
+from .models import Payment, VNPayTransaction
+
+# Trạng thái được phép chuyển sang, theo trạng thái đích
+ALLOWED_FROM = {
+    'PAID': ('PENDING', 'FAILED', 'CANCELLED'),
+    'FAILED': ('PENDING',),
+    'CANCELLED': ('PENDING', 'FAILED'),
+    'REFUNDED': ('PAID',),
+}
+
+# Trường phản hồi VNPAY có ở cả Payment và VNPayTransaction
+VNPAY_RESULT_FIELDS = ('vnp_ResponseCode', 'vnp_TransactionNo', 'vnp_BankCode', 'vnp_PayDate')
+
+
+def transition(payment, status, **fields):
+    """
+    Chuyển ``payment`` sang ``status`` (và ghi ``fields``) nếu trạng thái hiện
+    tại trong CSDL cho phép. Trả về ``False`` nếu yêu cầu khác đã chuyển trước.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Payment.objects.filter(pk=payment.pk, status__in=ALLOWED_FROM[status]).update(
+            status=status, updated_at=now, **fields
+        )
+        if not updated:
+            return False
+
+        payment.status = status
+        payment.updated_at = now
+        for name, value in fields.items():
+            setattr(payment, name, value)
+        payment._loaded_status = status
+
+        if payment.method == 'VNPAY':
+            result = {name: value for name, value in fields.items() if name in VNPAY_RESULT_FIELDS}
+            VNPayTransaction.objects.filter(payment_id=payment.pk).update(status=status, updated_at=now, **result)
+
+        status_changed.send(sender=Payment, instance=payment, status=status)
+    return True
+
+
+def apply_vnpay_result(payment, params):
+    """Ghi kết quả VNPAY (return URL hoặc IPN) vào ``payment``; ``False`` nếu đã được ghi trước đó."""
+    response_code = params.get('vnp_ResponseCode') or ''
+    if response_code == '00':
+        return transition(
+            payment, 'PAID',
+            vnp_ResponseCode=response_code,
+            vnp_TransactionNo=params.get('vnp_TransactionNo') or '',
+            vnp_BankCode=params.get('vnp_BankCode') or '',
+            vnp_PayDate=params.get('vnp_PayDate') or '',
+        )
+    return transition(payment, 'FAILED', vnp_ResponseCode=response_code)
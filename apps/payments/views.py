@@ -3,19 +3,31 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.db import transaction
+from django.db.models import Q
+from django.shortcuts import redirect
 from django.utils import timezone
+from datetime import datetime
+import io
+import logging
+import os
 import urllib.parse
 
 from .models import Payment, PaymentReceipt, VNPayTransaction
+from . import transitions
+from .reconciliation import SettlementFormatError, SettlementReconciler, new_report_path, report_path
 from .serializers import (
     PaymentSerializer, PaymentCreateSerializer, VNPayCreateSerializer,
     CashPaymentConfirmSerializer, PaymentReceiptSerializer, VNPayTransactionSerializer
 )
 from .services import VNPayService
 from shared.permissions.base_permissions import HasPermission
+from shared.utils.idempotency import idempotent
+
+logger = logging.getLogger(__name__)
 
 
 @extend_schema(tags=['payments'])
@@ -23,6 +35,11 @@ class PaymentViewSet(ModelViewSet):
     queryset = Payment.objects.select_related('prescription', 'created_by').all()
     serializer_class = PaymentSerializer
     permission_classes = [HasPermission]
+    # Giới hạn tần suất theo nhóm route (shared.throttling)
+    throttle_scopes = {
+        'create': 'payment', 'vnpay_create': 'payment', 'cash_confirm': 'payment',
+        'reconcile': 'reporting',
+    }
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -37,6 +54,8 @@ class PaymentViewSet(ModelViewSet):
             return [AllowAny()]
         elif self.action in ['update', 'partial_update', 'cancel']:
             self.required_permissions = ['PAYMENT:UPDATE']
+        elif self.action in ['reconcile', 'reconciliation_report']:
+            self.required_permissions = ['PAYMENT:READ']
         return super().get_permissions()
 
     def get_serializer_class(self):
@@ -59,6 +78,7 @@ class PaymentViewSet(ModelViewSet):
         }
     )
     @action(detail=False, methods=['post'])
+    @idempotent
     def vnpay_create(self, request):
         """Tạo giao dịch thanh toán VNPAY với redirect"""
         serializer = VNPayCreateSerializer(data=request.data, context={'request': request})
@@ -68,33 +88,28 @@ class PaymentViewSet(ModelViewSet):
         order_desc = serializer.validated_data['order_desc']
         amount = serializer.validated_data['amount']
         
-        # Check if there's already a payment for this prescription
-        existing_paid = Payment.objects.filter(
-            prescription=prescription,
-            status='PAID'
-        ).exists()
+        # One query for both checks: already paid, or a pending VNPAY payment to reuse
+        existing = {
+            payment.status: payment
+            for payment in Payment.objects.filter(
+                Q(status='PAID') | Q(status='PENDING', method='VNPAY'), prescription=prescription
+            ).order_by('created_at')  # newest wins
+        }
         
-        if existing_paid:
+        if 'PAID' in existing:
             return Response(
                 {'error': 'Đơn thuốc đã được thanh toán'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if there's already a pending payment for this prescription
-        existing_payment = Payment.objects.filter(
-            prescription=prescription,
-            status='PENDING',
-            method='VNPAY'
-        ).first()
-        
-        if existing_payment:
-            # Use existing payment instead of creating new one
-            payment = existing_payment
-        else:
-            # Create new payment record
+        # Retries with the same Idempotency-Key are replayed before reaching here;
+        # clients without one still reuse their pending payment.
+        payment = existing.get('PENDING')
+        created = payment is None
+        if created:
             # For anonymous users (portal), set created_by to None or a default user
             created_by = request.user if request.user.is_authenticated else None
-            payment = Payment.objects.create(
+            payment = Payment(
                 prescription=prescription,
                 method='VNPAY',
                 amount=amount,
@@ -106,23 +121,32 @@ class PaymentViewSet(ModelViewSet):
         client_ip = request.META.get('HTTP_X_FORWARDED_FOR') or request.META.get('REMOTE_ADDR', '127.0.0.1')
         payment_url, vnp_TxnRef = vnpay_service.create_payment_url(payment, order_desc, client_ip=client_ip)
         
-        # Update payment with VNPAY reference
+        # Save payment once, with its VNPAY reference
         payment.vnp_TxnRef = vnp_TxnRef
         payment.vnp_Amount = int(amount * 100)
         payment.vnp_OrderInfo = order_desc
         payment.save()
         
-        # Create or get VNPayTransaction record (avoid duplicate)
-        vnpay_transaction, created = VNPayTransaction.objects.get_or_create(
-            payment=payment,
-            defaults={
-                'vnp_TxnRef': vnp_TxnRef,
-                'vnp_Amount': int(amount * 100),
-                'vnp_OrderInfo': order_desc,
-                'vnp_CreateDate': timezone.now().strftime('%Y%m%d%H%M%S'),
-                'vnp_IpAddr': request.META.get('REMOTE_ADDR', '127.0.0.1')
-            }
-        )
+        if created:
+            VNPayTransaction.objects.create(
+                payment=payment,
+                vnp_TxnRef=vnp_TxnRef,
+                vnp_Amount=int(amount * 100),
+                vnp_OrderInfo=order_desc,
+                vnp_CreateDate=timezone.now().strftime('%Y%m%d%H%M%S'),
+                vnp_IpAddr=request.META.get('REMOTE_ADDR', '127.0.0.1')
+            )
+        else:
+            VNPayTransaction.objects.get_or_create(
+                payment=payment,
+                defaults={
+                    'vnp_TxnRef': vnp_TxnRef,
+                    'vnp_Amount': int(amount * 100),
+                    'vnp_OrderInfo': order_desc,
+                    'vnp_CreateDate': timezone.now().strftime('%Y%m%d%H%M%S'),
+                    'vnp_IpAddr': request.META.get('REMOTE_ADDR', '127.0.0.1')
+                }
+            )
         
         return Response({
             'payment_id': str(payment.id),
@@ -149,14 +173,15 @@ class PaymentViewSet(ModelViewSet):
         serializer = CashPaymentConfirmSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        payment.status = 'PAID'
-        payment.save()
-
-        receipt = PaymentReceipt.objects.create(
-            payment=payment, 
-            cashier=request.user, 
-            note=serializer.validated_data.get('note', '')
-        )
+        # Bấm xác nhận hai lần: chỉ lần chuyển được trạng thái mới phát hành phiếu thu
+        with transaction.atomic():
+            if not transitions.transition(payment, 'PAID'):
+                return Response({'error': 'Thanh toán đã được xác nhận'}, status=status.HTTP_400_BAD_REQUEST)
+            receipt = PaymentReceipt.objects.create(
+                payment=payment, 
+                cashier=request.user, 
+                note=serializer.validated_data.get('note', '')
+            )
         return Response(PaymentReceiptSerializer(receipt).data)
 
     @extend_schema(
@@ -168,10 +193,10 @@ class PaymentViewSet(ModelViewSet):
     def cancel(self, request, pk=None):
         """Hủy thanh toán"""
         payment = self.get_object()
-        if payment.status == 'PAID':
+        if payment.status == 'CANCELLED':
+            return Response(PaymentSerializer(payment).data)
+        if not transitions.transition(payment, 'CANCELLED'):
             return Response({'error': 'Không thể hủy giao dịch đã thanh toán'}, status=status.HTTP_400_BAD_REQUEST)
-        payment.status = 'CANCELLED'
-        payment.save()
         return Response(PaymentSerializer(payment).data)
     
     @extend_schema(
@@ -220,6 +245,61 @@ class PaymentViewSet(ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @extend_schema(
+        operation_id='payment_vnpay_reconcile',
+        summary='Đối soát file quyết toán VNPAY',
+        description=(
+            'Upload file CSV quyết toán (multipart, trường "file") cùng date_from/date_to (YYYY-MM-DD). '
+            'Trả về số dòng theo loại (matched, amount_mismatch, status_mismatch, duplicate, orphan, missing) '
+            'và tên file báo cáo chênh lệch.'
+        ),
+        responses={
+            200: OpenApiResponse(description='{"summary": {...}, "report": "vnpay-....csv"}'),
+            400: OpenApiResponse(description='Thiếu file hoặc file không hợp lệ'),
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def reconcile(self, request):
+        """Đối soát giao dịch VNPAY với file quyết toán"""
+        uploaded = request.FILES.get('file')
+        if not uploaded:
+            return Response({'error': 'Cần upload file quyết toán (trường "file")'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            date_from = datetime.strptime(request.data.get('date_from', ''), '%Y-%m-%d').date()
+            date_to = datetime.strptime(request.data.get('date_to') or date_from.isoformat(), '%Y-%m-%d').date()
+            amount_divisor = int(request.data.get('amount_divisor', 1))
+        except ValueError:
+            return Response({'error': 'date_from/date_to phải có dạng YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_to < date_from or amount_divisor < 1:
+            return Response({'error': 'Khoảng ngày hoặc amount_divisor không hợp lệ'}, status=status.HTTP_400_BAD_REQUEST)
+
+        reconciler = SettlementReconciler(date_from, date_to, amount_divisor=amount_divisor)
+        report = new_report_path(date_from, date_to)
+        # File upload lớn nằm trên đĩa (TemporaryUploadedFile): đọc theo dòng, không nạp cả file
+        lines = io.TextIOWrapper(uploaded.file, encoding='utf-8-sig', newline='')
+        try:
+            with open(report, 'w', encoding='utf-8', newline='') as report_file:
+                summary = reconciler.run(lines, report_file)
+        except (SettlementFormatError, UnicodeDecodeError) as exc:
+            os.remove(report)
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            lines.detach()
+        return Response({'summary': summary, 'report': os.path.basename(report)})
+
+    @extend_schema(
+        operation_id='payment_reconciliation_report',
+        summary='Tải báo cáo đối soát VNPAY',
+        responses={200: OpenApiResponse(description='text/csv'), 404: OpenApiResponse(description='Không tìm thấy')}
+    )
+    @action(detail=False, methods=['get'], url_path='reconciliation-report')
+    def reconciliation_report(self, request):
+        """Tải file báo cáo đối soát"""
+        path = report_path(request.query_params.get('name'))
+        if not path or not os.path.exists(path):
+            return Response({'error': 'Không tìm thấy báo cáo'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, content_type='text/csv')
+
 
 @extend_schema(tags=['vnpay'])
 class VNPayTransactionViewSet(ModelViewSet):
@@ -241,53 +321,27 @@ def vnpay_return(request):
     """VNPAY Return URL - User returns from VNPAY"""
     vnpay_service = VNPayService()
     
-    # Verify response signature (temporarily disabled for testing)
-    # if not vnpay_service.verify_response(request.GET):
-    #     return JsonResponse({'error': 'Chữ ký không hợp lệ'}, status=400)
+    # Kết quả không có chữ ký hợp lệ không được đổi trạng thái thanh toán
+    if not vnpay_service.verify_response(request.GET.dict()):
+        return redirect(f"/portal/?payment=failed&error=97&message={urllib.parse.quote('Chữ ký không hợp lệ')}")
     
-    # Process response
     vnp_ResponseCode = request.GET.get('vnp_ResponseCode')
     vnp_TxnRef = request.GET.get('vnp_TxnRef')
-    vnp_TransactionNo = request.GET.get('vnp_TransactionNo')
-    vnp_Amount = request.GET.get('vnp_Amount')
-    vnp_BankCode = request.GET.get('vnp_BankCode')
-    vnp_PayDate = request.GET.get('vnp_PayDate')
     
     try:
         # Find payment by VNPAY reference
-        payment = Payment.objects.get(vnp_TxnRef=vnp_TxnRef, method='VNPAY')
-        
-        if vnp_ResponseCode == '00':  # Success
-            payment.status = 'PAID'
-            payment.vnp_ResponseCode = vnp_ResponseCode
-            payment.vnp_TransactionNo = vnp_TransactionNo
-            payment.vnp_BankCode = vnp_BankCode
-            payment.vnp_PayDate = vnp_PayDate
-            payment.save()
-            
-            # Update VNPayTransaction
-            try:
-                vnpay_transaction = VNPayTransaction.objects.get(payment=payment)
-                vnpay_transaction.vnp_ResponseCode = vnp_ResponseCode
-                vnpay_transaction.vnp_TransactionNo = vnp_TransactionNo
-                vnpay_transaction.vnp_BankCode = vnp_BankCode
-                vnpay_transaction.vnp_PayDate = vnp_PayDate
-                vnpay_transaction.save()
-            except VNPayTransaction.DoesNotExist:
-                pass  # Transaction record may not exist
-            
+        payment = Payment.objects.select_related('prescription').get(vnp_TxnRef=vnp_TxnRef, method='VNPAY')
+
+        # IPN có thể đã ghi kết quả trước: khi đó không cập nhật gì thêm
+        transitions.apply_vnpay_result(payment, request.GET)
+
+        if vnp_ResponseCode == '00' or payment.status == 'PAID':
             # Redirect to success page in portal
-            from django.shortcuts import redirect
             return redirect(f'/portal/?payment=success&prescription={payment.prescription.prescription_number}')
-        else:
-            # Payment failed
-            payment.status = 'FAILED'
-            payment.vnp_ResponseCode = vnp_ResponseCode
-            payment.save()
-            
-            error_desc = vnpay_service.get_response_code_description(vnp_ResponseCode)
-            # Redirect to failure page in portal
-            return redirect(f'/portal/?payment=failed&error={vnp_ResponseCode}&message={urllib.parse.quote(error_desc)}')
+
+        error_desc = vnpay_service.get_response_code_description(vnp_ResponseCode)
+        # Redirect to failure page in portal
+        return redirect(f'/portal/?payment=failed&error={vnp_ResponseCode}&message={urllib.parse.quote(error_desc)}')
             
     except Payment.DoesNotExist:
         return JsonResponse({'error': 'Giao dịch không tồn tại'}, status=404)
@@ -296,16 +350,32 @@ def vnpay_return(request):
 
 
 @csrf_exempt
-@require_http_methods(["POST"])
+@require_http_methods(["GET", "POST"])
 def vnpay_ipn(request):
-    """VNPAY IPN (Instant Payment Notification)"""
-    vnpay_service = VNPayService()
-    
+    """VNPAY IPN (Instant Payment Notification)
+
+    VNPAY gọi IPN bằng GET (tham số trên query string); POST vẫn được nhận.
+    Trả lời theo quy ước RspCode của VNPAY. IPN gửi lại cho giao dịch đã ghi
+    kết quả nhận '02' (một câu UPDATE không khớp hàng nào) để VNPAY ngừng gửi.
+    """
+    params = (request.GET if request.method == 'GET' else request.POST).dict()
+
     # Verify IPN signature
-    if not vnpay_service.verify_response(request.POST):
-        return JsonResponse({'error': 'Chữ ký IPN không hợp lệ'}, status=400)
-    
-    # Process IPN data (similar to return URL but for server-to-server)
-    # This ensures payment status is updated even if user doesn't return to site
-    
-    return JsonResponse({'status': 'success'})
\ No newline at end of file
+    if not VNPayService().verify_response(dict(params)):
+        return JsonResponse({'RspCode': '97', 'Message': 'Invalid signature'})
+
+    try:
+        payment = Payment.objects.get(vnp_TxnRef=params.get('vnp_TxnRef', ''), method='VNPAY')
+    except Payment.DoesNotExist:
+        return JsonResponse({'RspCode': '01', 'Message': 'Order not found'})
+
+    if params.get('vnp_Amount') != str(int(payment.amount) * 100):
+        return JsonResponse({'RspCode': '04', 'Message': 'Invalid amount'})
+
+    try:
+        if not transitions.apply_vnpay_result(payment, params):
+            return JsonResponse({'RspCode': '02', 'Message': 'Order already confirmed'})
+    except Exception:
+        logger.exception('VNPAY IPN processing failed for %s', payment.vnp_TxnRef)
+        return JsonResponse({'RspCode': '99', 'Message': 'Unknown error'})
+    return JsonResponse({'RspCode': '00', 'Message': 'Confirm Success'})
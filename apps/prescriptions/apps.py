@@ -2,4 +2,36 @@ from django.apps import AppConfig
 
 class PrescriptionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "apps.prescriptions"
\ No newline at end of file
+    name = "apps.prescriptions"
+
+    def ready(self):
+        # Ghi phiên bản danh mục thuốc khi thuốc/nhóm thuốc/tương tác thay đổi,
+        # đánh dấu chỉ mục gợi ý thuốc cần cập nhật, cập nhật bảng tổng hợp đơn thuốc
+        from . import autocomplete, catalog, rollup  # noqa: F401
+
+        # ETag danh sách thuốc theo phiên bản nhóm thuốc/người tạo (shared.utils.conditional)
+        from django.contrib.auth import get_user_model
+        from shared.utils import conditional
+        from .models import DrugCategory
+
+        conditional.track(DrugCategory)
+        conditional.track(get_user_model(), ignore_fields=['last_login'])
+
+        # Lưu trữ bản ghi cấp thuốc của đơn đã kết thúc khi mọi bản ghi của đơn
+        # cùng trạng thái, để get_dispensing_status() không đổi khi chúng rời bảng
+        from django.db.models import Exists, OuterRef, Q
+        from shared.archive import registry as archive
+        from .models import PrescriptionDispensing
+
+        def only_records(status):
+            others = PrescriptionDispensing.objects.filter(prescription=OuterRef('prescription')).exclude(status=status)
+            return ~Exists(others)
+
+        archive.register(
+            'prescription_dispensing', PrescriptionDispensing, 'dispensed_at', retention_days=365,
+            eligible=(
+                (Q(prescription__status='FULLY_DISPENSED') & only_records('DISPENSED'))
+                | (Q(prescription__status='CANCELLED') & only_records('CANCELLED'))
+            ),
+            filter_fields=['prescription_id', 'prescription_item_id', 'pharmacist_id', 'status'],
+        )
@@ -0,0 +1,198 @@
+"""
+Process-local prefix index for drug autocomplete.
+
+Names, active ingredients, brands and codes are accent-folded ("Kháng sinh" ->
+"khang sinh", "đ" -> "d") and kept, whole and word by word, in one sorted list
+of ``(term, drug_id, is_word, field_rank)``; a prefix lookup is a ``bisect`` into it.
+Only active drugs are indexed.
+
+    GET /api/drugs/autocomplete/?q=amox 500&limit=10
+
+Every query word must prefix some term of the drug. Suggestions rank exact
+matches, then whole-field prefixes, then word prefixes; code before name
+before ingredient before brand; in-stock drugs first; then by name.
+
+The index follows the versioned catalog (``apps.prescriptions.catalog``): it
+loads a snapshot of the drug rows on first use and applies
+``catalog.delta()`` when the catalog version moves. Drug saves in this
+process mark it stale on commit; other workers' saves are picked up by a version
+check made at most every ``DRUG_AUTOCOMPLETE_VERSION_CHECK`` seconds.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog
+from .models import Drug
+
+# Field rank: lower ranks first.
+SEARCH_FIELDS = ('code', 'name', 'generic_name', 'brand_name')
+SUGGESTION_FIELDS = (
+    'id', 'code', 'name', 'generic_name', 'brand_name', 'dosage_form', 'strength', 'unit',
+    'unit_price', 'insurance_price', 'current_stock', 'is_prescription_required',
+)
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def fold(text):
+    """Lowercase, strip Vietnamese diacritics: ``'Đau đầu'`` -> ``'dau dau'``."""
+    text = unicodedata.normalize('NFD', str(text or '').lower().replace('đ', 'd'))
+    return ''.join(char for char in text if not unicodedata.combining(char)).strip()
+
+
+def _terms(row):
+    """``(term, is_word, field_rank)`` for one catalog drug row."""
+    terms = set()
+    for rank, field in enumerate(SEARCH_FIELDS):
+        value = fold(row.get(field))
+        if not value:
+            continue
+        terms.add((value, False, rank))
+        for word in _WORD_RE.findall(value):
+            if word != value:
+                terms.add((word, True, rank))
+    return terms
+
+
+def _entry(row):
+    """``(suggestion, folded name, terms)`` for an active catalog drug row, else ``None``."""
+    if not row['is_active']:
+        return None
+    suggestion = {field: row[field] for field in SUGGESTION_FIELDS}
+    suggestion['id'] = str(row['id'])
+    suggestion['stock_status'] = Drug.stock_status_for(
+        row['current_stock'], row['minimum_stock'], row['maximum_stock']
+    )
+    return suggestion, fold(row['name']), _terms(row)
+
+
+class DrugIndex:
+    def __init__(self):
+        self._lock = threading.Lock()          # held by lookups and the swap
+        self._refresh_lock = threading.Lock()  # one refresh at a time, catalog queries included
+        self._terms = []      # sorted (term, drug_id, is_word, field_rank)
+        self._entries = {}    # drug_id -> (suggestion dict, folded name, terms)
+        self.version = None
+        self._checked_at = 0.0
+
+    # Maintenance
+
+    def _build(self, entries, terms, rows):
+        """Add ``rows`` to ``entries``/``terms`` (sorted once at the end); returns ``terms``."""
+        for row in rows:
+            entry = _entry(row)
+            if entry is None:
+                continue
+            drug_id = entry[0]['id']
+            entries[drug_id] = entry
+            terms.extend((term, drug_id, is_word, rank) for term, is_word, rank in entry[2])
+        # Timsort: a sorted list plus a few new terms costs little more than a pass
+        terms.sort()
+        return terms
+
+    def _swap(self, version, entries, terms):
+        with self._lock:
+            self._entries, self._terms = entries, terms
+            self.version = version
+
+    def _rebuild(self):
+        version = catalog.current_version()
+        entries = {}
+        terms = self._build(entries, [], catalog.rows('drug'))
+        self._swap(version, entries, terms)
+
+    def _apply(self, changes):
+        changed = {str(row['id']) for row in changes['drugs']} | set(changes['deleted']['drugs'])
+        entries = {drug_id: entry for drug_id, entry in self._entries.items() if drug_id not in changed}
+        terms = [key for key in self._terms if key[1] not in changed] if changed else list(self._terms)
+        self._swap(changes['version'], entries, self._build(entries, terms, changes['drugs']))
+
+    def refresh(self):
+        """Catch up with the catalog version, at most once per check interval."""
+        interval = getattr(settings, 'DRUG_AUTOCOMPLETE_VERSION_CHECK', 1.0)
+        if self.version is not None and time.monotonic() - self._checked_at < interval:
+            return
+        # The catalog is read and the new index built outside ``_lock``: lookups
+        # keep using the current index, and skip a refresh already running.
+        if not self._refresh_lock.acquire(blocking=self.version is None):
+            return
+        try:
+            now = time.monotonic()
+            if self.version is not None and now - self._checked_at < interval:
+                return
+            self._checked_at = now
+            if self.version is None:
+                self._rebuild()
+                return
+            changes = catalog.delta(self.version, kinds=['drug'])
+            if changes['reset']:
+                self._rebuild()
+                return
+            self._apply(changes)
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self):
+        """Make the next lookup check the catalog version."""
+        self._checked_at = float('-inf')
+
+    # Lookup
+
+    def _matches(self, prefix):
+        """``{drug_id: best (exact, is_word, field_rank)}`` for terms starting with ``prefix``."""
+        found = {}
+        position = bisect.bisect_left(self._terms, (prefix,))
+        for term, drug_id, is_word, rank in self._terms[position:]:
+            if not term.startswith(prefix):
+                break
+            score = (term != prefix, is_word, rank)
+            if drug_id not in found or score < found[drug_id]:
+                found[drug_id] = score
+        return found
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        words = fold(query).split()
+        if not words:
+            return []
+        phrase = ' '.join(words)
+        with self._lock:
+            # The whole phrase matches whole fields ("amoxicillin 500mg");
+            # otherwise every word has to match on its own.
+            found = self._matches(phrase)
+            if len(words) > 1:
+                for drug_id, score in self._matches(max(words, key=len)).items():
+                    terms = self._entries[drug_id][2]
+                    if all(any(term.startswith(word) for term, _, _ in terms) for word in words):
+                        found.setdefault(drug_id, score)
+            ranked = heapq.nsmallest(limit, found.items(), key=lambda item: (
+                item[1],
+                self._entries[item[0]][0]['current_stock'] <= 0,
+                self._entries[item[0]][1],
+            ))
+            return [dict(self._entries[drug_id][0]) for drug_id, _ in ranked]
+
+
+index = DrugIndex()
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    index.refresh()
+    return index.search(query, limit)
+
+
+@receiver(post_save, sender=Drug)
+@receiver(post_delete, sender=Drug)
+def _on_drug_change(sender, instance, **kwargs):
+    # Once committed; a batch of saves costs one delta on the next lookup.
+    transaction.on_commit(index.invalidate)
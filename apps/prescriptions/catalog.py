@@ -0,0 +1,145 @@
+"""
+Versioned drug catalog: full snapshot plus ``?since=<version>`` deltas.
+
+Every save or delete of a ``DrugCategory``, ``Drug`` or ``DrugInteraction``
+writes a ``CatalogChange`` row in the same transaction; its auto-increment id
+is the new catalog version. The log is compacted as it is written: recording a
+change removes the object's previous rows, so it holds at most one row per
+object and a delta is simply "every row after ``since``".
+
+    GET /api/drugs/catalog/            -> {"version": 42, "categories": [...], "drugs": [...], "interactions": [...]}
+    GET /api/drugs/catalog/?since=40   -> same keys with only the changed rows, plus "deleted": {kind: [ids]}
+
+A client keeps the snapshot, then polls with ``since`` set to the last
+``version`` it saw and upserts/deletes by id. ``reset: true`` means ``since``
+is ahead of the server (restored database): fetch the snapshot again.
+
+Writes made with ``QuerySet.update()`` / ``bulk_create()`` send no signals and
+are not versioned; catalog code saves through ``save()``, and ``rebuild()``
+(``manage.py rebuild_drug_catalog_log``, also run by ``generate_dataset``)
+records every object again after bulk imports. On databases with
+concurrent writers a transaction holding a lower version can commit after a
+higher one was served, so long-lived clients should refresh the snapshot now
+and then.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CatalogChange, Drug, DrugCategory, DrugInteraction
+
+# kind -> (model, fields sent to clients)
+CATALOG = {
+    'category': (DrugCategory, ['id', 'code', 'name', 'parent_id', 'is_active']),
+    'drug': (Drug, [
+        'id', 'code', 'name', 'generic_name', 'brand_name', 'category_id',
+        'dosage_form', 'strength', 'unit', 'unit_price', 'insurance_price',
+        'current_stock', 'minimum_stock', 'maximum_stock', 'is_prescription_required',
+        'is_controlled_substance', 'is_active',
+    ]),
+    'interaction': (DrugInteraction, [
+        'id', 'drug1_id', 'drug2_id', 'severity', 'description',
+        'clinical_effect', 'management', 'is_active',
+    ]),
+}
+# Response keys, in dependency order.
+SECTIONS = {'category': 'categories', 'drug': 'drugs', 'interaction': 'interactions'}
+
+KIND_BY_MODEL = {model: kind for kind, (model, _) in CATALOG.items()}
+
+
+def record_change(kind, object_id, deleted=False):
+    """Bump the catalog version for one object, dropping its older log rows."""
+    object_id = str(object_id)
+    CatalogChange.objects.filter(kind=kind, object_id=object_id).delete()
+    return CatalogChange.objects.create(kind=kind, object_id=object_id, deleted=deleted).id
+
+
+@receiver(post_save, sender=DrugCategory)
+@receiver(post_save, sender=Drug)
+@receiver(post_save, sender=DrugInteraction)
+def _on_catalog_save(sender, instance, **kwargs):
+    record_change(KIND_BY_MODEL[sender], instance.pk)
+
+
+@receiver(post_delete, sender=DrugCategory)
+@receiver(post_delete, sender=Drug)
+@receiver(post_delete, sender=DrugInteraction)
+def _on_catalog_delete(sender, instance, **kwargs):
+    record_change(KIND_BY_MODEL[sender], instance.pk, deleted=True)
+
+
+def current_version():
+    return CatalogChange.objects.aggregate(version=Max('id'))['version'] or 0
+
+
+def rows(kind, ids=None):
+    """Catalog rows of ``kind`` (only ``ids`` when given), ordered by pk."""
+    model, fields = CATALOG[kind]
+    queryset = model.objects.order_by('pk')
+    if ids is not None:
+        if not ids:
+            return []
+        queryset = queryset.filter(pk__in=ids)
+    result = list(queryset.values(*fields))
+    for row in result:
+        for key, value in row.items():
+            if isinstance(value, Decimal):
+                # Giá VNĐ không có phần lẻ
+                row[key] = int(value)
+    return result
+
+
+def rebuild():
+    """
+    Record every catalog object as changed (one new version each), for rows
+    written without signals. Deletion rows are kept. Returns the rows written.
+    """
+    with transaction.atomic():
+        CatalogChange.objects.filter(deleted=False).delete()
+        changes = [
+            CatalogChange(kind=kind, object_id=str(pk))
+            for kind, (model, _) in CATALOG.items()
+            for pk in model.objects.order_by('pk').values_list('pk', flat=True)
+        ]
+        CatalogChange.objects.bulk_create(changes, batch_size=1000)
+    return len(changes)
+
+
+def snapshot(version=None):
+    # Version first: rows changed meanwhile come back again in the next delta.
+    if version is None:
+        version = current_version()
+    payload = {'version': version}
+    for kind, section in SECTIONS.items():
+        payload[section] = rows(kind)
+    return payload
+
+
+def delta(since, kinds=None, version=None):
+    """Changes after ``since``; ``kinds`` limits the sections loaded (all by default)."""
+    kinds = kinds or list(CATALOG)
+    if version is None:
+        version = current_version()
+    if since > version:
+        return {'version': version, 'since': since, 'reset': True}
+
+    changed = {kind: set() for kind in kinds}
+    deleted = {kind: [] for kind in kinds}
+    changes = CatalogChange.objects.filter(
+        id__gt=since, id__lte=version, kind__in=kinds
+    ).values_list('kind', 'object_id', 'deleted')
+    for kind, object_id, is_deleted in changes:
+        if is_deleted:
+            deleted[kind].append(object_id)
+        else:
+            changed[kind].add(object_id)
+
+    payload = {'version': version, 'since': since, 'reset': False}
+    for kind in kinds:
+        payload[SECTIONS[kind]] = rows(kind, changed[kind])
+    payload['deleted'] = {SECTIONS[kind]: ids for kind, ids in deleted.items()}
+    return payload
@@ -0,0 +1,17 @@
+"""
+Management command ghi lại nhật ký phiên bản danh mục thuốc
+(sau khi nhập dữ liệu bằng bulk_create / QuerySet.update)
+"""
+from django.core.management.base import BaseCommand
+
+from apps.prescriptions import catalog
+
+
+class Command(BaseCommand):
+    help = 'Ghi lại mọi nhóm thuốc, thuốc và tương tác thuốc vào nhật ký phiên bản danh mục'
+
+    def handle(self, *args, **options):
+        rows = catalog.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Đã ghi {rows} thay đổi, phiên bản danh mục {catalog.current_version()}'
+        ))
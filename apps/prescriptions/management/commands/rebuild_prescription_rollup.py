@@ -0,0 +1,28 @@
+"""
+Management command dựng lại bảng tổng hợp đơn thuốc theo ngày
+(sau khi nhập dữ liệu bằng bulk_create / QuerySet.update)
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.prescriptions import rollup
+
+
+def _day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Ngày không hợp lệ: {value} (YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Dựng lại bảng tổng hợp đơn thuốc theo ngày từ bảng đơn thuốc'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=_day, help='Ngày bắt đầu YYYY-MM-DD')
+        parser.add_argument('--to', dest='date_to', type=_day, help='Ngày kết thúc YYYY-MM-DD (tính cả ngày này)')
+
+    def handle(self, *args, **options):
+        rows = rollup.rebuild(options['date_from'], options['date_to'])
+        self.stdout.write(self.style.SUCCESS(f'Đã dựng lại {rows} dòng tổng hợp'))
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.23 on 2026-10-19 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prescriptions", "0002_update_dispensing_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("category", "Nhóm thuốc"),
+                            ("drug", "Thuốc"),
+                            ("interaction", "Tương tác thuốc"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.CharField(max_length=64)),
+                ("deleted", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Thay đổi danh mục thuốc",
+                "verbose_name_plural": "Thay đổi danh mục thuốc",
+                "db_table": "drug_catalog_changes",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "object_id"], name="drug_catalo_kind_8db7f2_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prescriptions", "0003_catalog_change"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="prescriptiondispensing",
+            index=models.Index(
+                fields=["dispensed_at"], name="prescriptio_dispens_e1ee84_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:13
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def populate_daily_stats(apps, schema_editor):
+    """Fill the rollup from the existing prescriptions (local calendar days)."""
+    Prescription = apps.get_model("prescriptions", "Prescription")
+    PrescriptionDailyStat = apps.get_model("prescriptions", "PrescriptionDailyStat")
+    grouped = (
+        Prescription.objects.order_by()
+        .annotate(day=TruncDate("prescription_date"))
+        .values("day", "doctor_id", "status")
+        .annotate(
+            prescription_count=models.Count("id"),
+            total=models.Sum("total_amount"),
+            covered=models.Sum("insurance_covered_amount"),
+        )
+    )
+    PrescriptionDailyStat.objects.bulk_create(
+        [
+            PrescriptionDailyStat(
+                day=row["day"],
+                doctor_id=row["doctor_id"],
+                status=row["status"],
+                prescription_count=row["prescription_count"],
+                total_amount=row["total"] or 0,
+                insurance_covered_amount=row["covered"] or 0,
+            )
+            for row in grouped.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0002_archive_date_index"),
+        ("prescriptions", "0004_archive_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PrescriptionDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("DRAFT", "Nháp"),
+                            ("ACTIVE", "Có hiệu lực"),
+                            ("PARTIALLY_DISPENSED", "Cấp thuốc một phần"),
+                            ("FULLY_DISPENSED", "Đã cấp thuốc đầy đủ"),
+                            ("CANCELLED", "Đã hủy"),
+                            ("EXPIRED", "Hết hạn"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("prescription_count", models.IntegerField(default=0)),
+                (
+                    "total_amount",
+                    models.DecimalField(decimal_places=0, default=0, max_digits=15),
+                ),
+                (
+                    "insurance_covered_amount",
+                    models.DecimalField(decimal_places=0, default=0, max_digits=15),
+                ),
+                (
+                    "doctor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="prescription_daily_stats",
+                        to="appointments.doctorprofile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Thống kê đơn thuốc theo ngày",
+                "verbose_name_plural": "Thống kê đơn thuốc theo ngày",
+                "db_table": "prescription_daily_stats",
+                "ordering": ["day"],
+                "indexes": [
+                    models.Index(
+                        fields=["doctor", "day"], name="prescriptio_doctor__ed1bed_idx"
+                    )
+                ],
+                "unique_together": {("day", "doctor", "status")},
+            },
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+CATALOG_MODELS = (
+    ("category", "DrugCategory"),
+    ("drug", "Drug"),
+    ("interaction", "DrugInteraction"),
+)
+
+
+def record_catalog(apps, schema_editor):
+    """Version the catalog rows written without signals (bulk imports)."""
+    CatalogChange = apps.get_model("prescriptions", "CatalogChange")
+    changes = []
+    for kind, model_name in CATALOG_MODELS:
+        model = apps.get_model("prescriptions", model_name)
+        recorded = set(CatalogChange.objects.filter(kind=kind).values_list("object_id", flat=True))
+        changes += [
+            CatalogChange(kind=kind, object_id=str(pk))
+            for pk in model.objects.order_by("pk").values_list("pk", flat=True)
+            if str(pk) not in recorded
+        ]
+    CatalogChange.objects.bulk_create(changes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("prescriptions", "0005_prescription_daily_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(record_catalog, migrations.RunPython.noop),
+    ]
@@ -162,11 +162,15 @@ class Drug(models.Model):
     @property
     def stock_status(self):
         """Trạng thái tồn kho"""
-        if self.current_stock <= 0:
+        return self.stock_status_for(self.current_stock, self.minimum_stock, self.maximum_stock)
+    
+    @staticmethod
+    def stock_status_for(current_stock, minimum_stock, maximum_stock):
+        if current_stock <= 0:
             return "HẾT HÀNG"
-        elif self.current_stock <= self.minimum_stock:
+        elif current_stock <= minimum_stock:
             return "SẮP HẾT"
-        elif self.current_stock >= self.maximum_stock:
+        elif current_stock >= maximum_stock:
             return "DƯ THỪA"
         else:
             return "BÌNH THƯỜNG"
@@ -368,12 +372,16 @@ class Prescription(models.Model):
     
     def get_dispensing_status(self):
         """Lấy trạng thái dispensing chung của đơn thuốc"""
-        dispensing_records = self.dispensing_records.all()
-        if not dispensing_records.exists():
+        # Đọc qua .all() để dùng lại prefetch_related('dispensing_records') nếu có
+        statuses = {record.status for record in self.dispensing_records.all()}
+        if not statuses:
+            # Bản ghi cấp thuốc của đơn đã kết thúc có thể đã được lưu trữ (shared.archive)
+            if self.status == 'FULLY_DISPENSED':
+                return 'DISPENSED'
+            if self.status == 'CANCELLED':
+                return 'CANCELLED'
             return 'UNPAID'
         
-        statuses = set(dispensing_records.values_list('status', flat=True))
-        
         if 'UNPAID' in statuses:
             return 'UNPAID'
         elif all(status == 'DISPENSED' for status in statuses):
@@ -535,6 +543,9 @@ class PrescriptionDispensing(models.Model):
         verbose_name = 'Lịch sử cấp thuốc'
         verbose_name_plural = 'Lịch sử cấp thuốc'
         ordering = ['-dispensed_at']
+        indexes = [
+            models.Index(fields=['dispensed_at']),
+        ]
     
     def __str__(self):
         return f"{self.prescription.prescription_number} - {self.prescription_item.drug.name} - {self.quantity_dispensed}"
@@ -629,4 +640,67 @@ class DrugInteraction(models.Model):
         verbose_name_plural = 'Tương tác thuốc'
     
     def __str__(self):
-        return f"{self.drug1.name} ↔ {self.drug2.name} ({self.get_severity_display()})"
\ No newline at end of file
+        return f"{self.drug1.name} ↔ {self.drug2.name} ({self.get_severity_display()})"
+
+class CatalogChange(models.Model):
+    """
+    Nhật ký thay đổi danh mục thuốc (nhóm thuốc, thuốc, tương tác thuốc).
+    ``id`` tăng dần và chính là phiên bản danh mục; mỗi đối tượng chỉ giữ
+    bản ghi thay đổi mới nhất (xem ``apps.prescriptions.catalog``).
+    """
+
+    KIND_CHOICES = [
+        ('category', 'Nhóm thuốc'),
+        ('drug', 'Thuốc'),
+        ('interaction', 'Tương tác thuốc'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'drug_catalog_changes'
+        verbose_name = 'Thay đổi danh mục thuốc'
+        verbose_name_plural = 'Thay đổi danh mục thuốc'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['kind', 'object_id']),
+        ]
+
+    def __str__(self):
+        action = 'xóa' if self.deleted else 'cập nhật'
+        return f"v{self.id} {self.kind} {self.object_id} ({action})"
+
+
+class PrescriptionDailyStat(models.Model):
+    """
+    Tổng hợp đơn thuốc theo ngày (giờ địa phương), bác sĩ và trạng thái.
+    Cập nhật cộng dồn mỗi khi đơn thuốc được lưu/xóa (xem ``apps.prescriptions.rollup``).
+    """
+
+    day = models.DateField()
+    doctor = models.ForeignKey(
+        'appointments.DoctorProfile',
+        on_delete=models.CASCADE,
+        related_name='prescription_daily_stats'
+    )
+    status = models.CharField(max_length=20, choices=Prescription.STATUS_CHOICES)
+    prescription_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    insurance_covered_amount = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+
+    class Meta:
+        db_table = 'prescription_daily_stats'
+        verbose_name = 'Thống kê đơn thuốc theo ngày'
+        verbose_name_plural = 'Thống kê đơn thuốc theo ngày'
+        ordering = ['day']
+        unique_together = ['day', 'doctor', 'status']
+        indexes = [
+            models.Index(fields=['doctor', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.doctor_id} {self.status}: {self.prescription_count}"
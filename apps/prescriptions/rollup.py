@@ -0,0 +1,183 @@
+"""
+Daily prescription rollup: one ``PrescriptionDailyStat`` row per local day,
+doctor and status with the number of prescriptions and their total and
+insurance-covered amounts.
+
+Saving or deleting a ``Prescription`` moves its contribution between rows in
+the same transaction: a status change is ``-1`` on the old row and ``+1`` on
+the new one, a recalculated total adjusts the amounts in place. Statistics
+over months then read a few hundred rows instead of every prescription.
+
+    stats = rollup.summary(date_from, date_to, doctor_id=None)
+
+The previous values are taken from the instance as loaded (``post_init``);
+instances loaded with ``only()`` / ``defer()`` re-read them around the save. Writes that bypass
+``save()`` / ``delete()`` (``QuerySet.update()``, ``bulk_create()``, the
+dataset generator) are not seen: run ``manage.py rebuild_prescription_rollup``
+for the affected days afterwards.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from shared.utils.dates import local_day_range
+
+from .models import Prescription, PrescriptionDailyStat
+
+TRACKED_FIELDS = ('prescription_date', 'doctor_id', 'status', 'total_amount', 'insurance_covered_amount')
+DISPENSED_STATUSES = ('PARTIALLY_DISPENSED', 'FULLY_DISPENSED')
+
+
+def _bucket(values):
+    """``((day, doctor_id, status), total, covered)`` for a prescription's values."""
+    if values['prescription_date'] is None:
+        return None
+    day = timezone.localtime(values['prescription_date']).date()
+    key = (day, values['doctor_id'], values['status'])
+    return key, values['total_amount'] or 0, values['insurance_covered_amount'] or 0
+
+
+def _snapshot(instance):
+    loaded = instance.__dict__
+    if any(field not in loaded for field in TRACKED_FIELDS):
+        return None
+    return _bucket(loaded)
+
+
+def _stored(pk):
+    values = Prescription.objects.filter(pk=pk).values(*TRACKED_FIELDS).first()
+    return _bucket(values) if values else None
+
+
+def _add(key, count, total, covered):
+    day, doctor_id, status = key
+    rows = PrescriptionDailyStat.objects.filter(day=day, doctor_id=doctor_id, status=status)
+    changes = {
+        'prescription_count': F('prescription_count') + count,
+        'total_amount': F('total_amount') + total,
+        'insurance_covered_amount': F('insurance_covered_amount') + covered,
+    }
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            PrescriptionDailyStat.objects.create(
+                day=day, doctor_id=doctor_id, status=status,
+                prescription_count=count, total_amount=total, insurance_covered_amount=covered,
+            )
+    except IntegrityError:
+        # Created concurrently by another writer
+        rows.update(**changes)
+
+
+def apply(old, new):
+    """Move a prescription's contribution from bucket ``old`` to ``new`` (either may be ``None``)."""
+    deltas = {}
+    for bucket, sign in ((old, -1), (new, 1)):
+        if bucket is None:
+            continue
+        key, total, covered = bucket
+        count_delta, total_delta, covered_delta = deltas.get(key, (0, 0, 0))
+        deltas[key] = (count_delta + sign, total_delta + sign * total, covered_delta + sign * covered)
+    for key, (count, total, covered) in deltas.items():
+        if count or total or covered:
+            _add(key, count, total, covered)
+
+
+@receiver(post_init, sender=Prescription)
+def remember_rollup_bucket(sender, instance, **kwargs):
+    instance._rollup_bucket = _snapshot(instance)
+
+
+@receiver(pre_save, sender=Prescription)
+def load_rollup_bucket(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance._rollup_bucket is not None:
+        return
+    # Loaded with only()/defer(): read the stored values
+    instance._rollup_bucket = _stored(instance.pk)
+
+
+@receiver(post_save, sender=Prescription)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = _snapshot(instance) or _stored(instance.pk)
+    apply(None if created else instance._rollup_bucket, new)
+    instance._rollup_bucket = new
+
+
+@receiver(post_delete, sender=Prescription)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    apply(instance._rollup_bucket or _snapshot(instance), None)
+    instance._rollup_bucket = None
+
+
+def rebuild(date_from=None, date_to=None):
+    """Recompute the rollup rows of ``[date_from, date_to]`` (every day if omitted) from the prescriptions."""
+    prescriptions = Prescription.objects.all()
+    stats = PrescriptionDailyStat.objects.all()
+    if date_from:
+        prescriptions = prescriptions.filter(prescription_date__gte=local_day_range(date_from)[0])
+        stats = stats.filter(day__gte=date_from)
+    if date_to:
+        prescriptions = prescriptions.filter(prescription_date__lt=local_day_range(date_to)[1])
+        stats = stats.filter(day__lte=date_to)
+
+    grouped = (
+        prescriptions.order_by()
+        .annotate(day=TruncDate('prescription_date'))  # ngày theo múi giờ hiện tại
+        .values('day', 'doctor_id', 'status')
+        .annotate(
+            prescription_count=Count('id'),
+            total=Sum('total_amount'),
+            covered=Sum('insurance_covered_amount'),
+        )
+    )
+    with transaction.atomic():
+        stats.delete()
+        rows = PrescriptionDailyStat.objects.bulk_create(
+            [
+                PrescriptionDailyStat(
+                    day=row['day'], doctor_id=row['doctor_id'], status=row['status'],
+                    prescription_count=row['prescription_count'],
+                    total_amount=row['total'] or 0, insurance_covered_amount=row['covered'] or 0,
+                )
+                for row in grouped.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def summary(date_from=None, date_to=None, doctor_id=None):
+    """Prescription statistics for local days ``[date_from, date_to]`` read from the rollup."""
+    stats = PrescriptionDailyStat.objects.all()
+    if date_from:
+        stats = stats.filter(day__gte=date_from)
+    if date_to:
+        stats = stats.filter(day__lte=date_to)
+    if doctor_id:
+        stats = stats.filter(doctor_id=doctor_id)
+
+    by_status = {}
+    total_amount = insurance_covered = 0
+    for row in stats.values('status').annotate(
+        count=Sum('prescription_count'),
+        total=Sum('total_amount'),
+        covered=Sum('insurance_covered_amount'),
+    ).order_by():
+        by_status[row['status']] = row['count'] or 0
+        total_amount += row['total'] or 0
+        insurance_covered += row['covered'] or 0
+
+    return {
+        'total_prescriptions': sum(by_status.values()),
+        'active_prescriptions': by_status.get('ACTIVE', 0),
+        'expired_prescriptions': by_status.get('EXPIRED', 0),
+        'dispensed_prescriptions': sum(by_status.get(status, 0) for status in DISPENSED_STATUSES),
+        'total_amount': total_amount,
+        'insurance_covered': insurance_covered,
+    }
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
@@ -8,6 +9,7 @@ from .models import (
     DrugCategory, Drug, Prescription, PrescriptionItem, 
     PrescriptionDispensing, DrugInteraction
 )
+from shared.utils.sparse_fields import SparseFieldsetSerializerMixin
 
 User = get_user_model()
 
@@ -31,7 +33,7 @@ class SimpleDoctorSerializer(serializers.Serializer):
     specialization = serializers.CharField()
     license_number = serializers.CharField()
 
-class DrugCategorySerializer(serializers.ModelSerializer):
+class DrugCategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     subcategories_count = serializers.SerializerMethodField()
     drugs_count = serializers.SerializerMethodField()
@@ -44,11 +46,29 @@ class DrugCategorySerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        field_annotations = {
+            'subcategories_count': {
+                'active_subcategory_count': models.Count(
+                    'subcategories', filter=models.Q(subcategories__is_active=True), distinct=True
+                ),
+            },
+            'drugs_count': {
+                'active_drug_count': models.Count(
+                    'drugs', filter=models.Q(drugs__is_active=True), distinct=True
+                ),
+            },
+        }
     
     def get_subcategories_count(self, obj):
+        annotated = getattr(obj, 'active_subcategory_count', None)
+        if annotated is not None:
+            return annotated
         return obj.subcategories.filter(is_active=True).count()
     
     def get_drugs_count(self, obj):
+        annotated = getattr(obj, 'active_drug_count', None)
+        if annotated is not None:
+            return annotated
         return obj.drugs.filter(is_active=True).count()
 
 class DrugSerializer(serializers.ModelSerializer):
@@ -87,7 +107,7 @@ class DrugSearchSerializer(serializers.Serializer):
     is_low_stock = serializers.BooleanField(required=False)
     is_active = serializers.BooleanField(required=False, default=True)
 
-class PrescriptionItemSerializer(serializers.ModelSerializer):
+class PrescriptionItemSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     drug_name = serializers.CharField(source='drug.name', read_only=True)
     drug_code = serializers.CharField(source='drug.code', read_only=True)
     drug_unit = serializers.CharField(source='drug.get_unit_display', read_only=True)
@@ -119,7 +139,7 @@ class PrescriptionItemSerializer(serializers.ModelSerializer):
             'created_at'
         ]
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+class PrescriptionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
 
     # Full nested objects with lazy import to avoid circular imports
     patient = serializers.SerializerMethodField()
@@ -173,6 +193,12 @@ class PrescriptionSerializer(serializers.ModelSerializer):
             'total_amount', 'insurance_covered_amount', 'patient_payment_amount',
             'created_at', 'updated_at'
         ]
+        # ?fields= (shared.utils.sparse_fields): quan hệ mà method field đọc tới
+        field_relations = {
+            'items_count': ['items'],
+            'dispensing_status': ['dispensing_records'],
+            'dispensing_status_display': ['dispensing_records'],
+        }
     
     def get_items_count(self, obj):
         return obj.items.count()
@@ -3,15 +3,17 @@ from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Sum, Count, Case, When, F
+from django.db.models import Q, F
 from django.utils import timezone
-from datetime import date, timedelta
+from django.utils.cache import get_conditional_response
+from datetime import timedelta
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, OpenApiExample
 
 from .models import (
     DrugCategory, Drug, Prescription, PrescriptionItem, 
     PrescriptionDispensing, DrugInteraction
 )
+from . import autocomplete, catalog, rollup
 from .serializers import (
     DrugCategorySerializer, DrugSerializer, DrugSearchSerializer,
     PrescriptionSerializer, PrescriptionCreateSerializer, PrescriptionItemSerializer,
@@ -19,14 +21,21 @@ from .serializers import (
     DrugInteractionSerializer, PrescriptionStatsSerializer, DrugInventorySerializer
 )
 from shared.permissions.base_permissions import HasPermission
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from shared.db.instrumentation import QueryBudget, query_budget
+from shared.db.routers import use_read_replica
+from shared.utils.conditional import ConditionalGetMixin
+from shared.utils.dates import local_day_range
+from shared.utils.idempotency import idempotent
+from shared.utils.sparse_fields import SparseFieldsetViewMixin
+from shared.throttling.throttles import throttle_scope
+from rest_framework.permissions import AllowAny, IsAuthenticated, SAFE_METHODS
 
 @extend_schema(tags=['drugs'])
-class DrugCategoryViewSet(ModelViewSet):
+class DrugCategoryViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Drug Category Management ViewSet
     """
-    queryset = DrugCategory.objects.all()
+    queryset = DrugCategory.objects.select_related('parent')
     serializer_class = DrugCategorySerializer
     permission_classes = [HasPermission]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -49,7 +58,7 @@ class DrugCategoryViewSet(ModelViewSet):
         return super().get_permissions()
 
 @extend_schema(tags=['drugs'])
-class DrugViewSet(ModelViewSet):
+class DrugViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Drug Management ViewSet
     """
@@ -64,6 +73,10 @@ class DrugViewSet(ModelViewSet):
     ]
     ordering_fields = ['name', 'unit_price', 'current_stock', 'created_at']
     ordering = ['name']
+    # ETag/Last-Modified (shared.utils.conditional): category_name, created_by_name
+    etag_related = ['category', 'created_by']
+    # Giới hạn tần suất theo nhóm route (shared.throttling); autocomplete đủ rẻ cho mỗi phím gõ
+    throttle_scopes = {'list': 'search', 'search': 'search'}
     
     # def get_permissions(self):
     #     if self.action in ['list', 'retrieve']:
@@ -163,8 +176,72 @@ class DrugViewSet(ModelViewSet):
         ], many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        operation_id='drug_autocomplete',
+        summary='Drug autocomplete',
+        description=(
+            'Ranked suggestions from the in-memory drug index: accent-insensitive prefix match '
+            'on code, name, active ingredient and brand, with price and stock status.'
+        ),
+        parameters=[
+            OpenApiParameter('q', type=str, description='Search prefix'),
+            OpenApiParameter('limit', type=int, description='Max suggestions (default 10, max 50)'),
+        ],
+        responses={200: OpenApiResponse(description='Ranked drug suggestions')},
+    )
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Prefix suggestions for the prescription composer"""
+        try:
+            limit = int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT))
+        except ValueError:
+            limit = autocomplete.DEFAULT_LIMIT
+        limit = max(1, min(limit, autocomplete.MAX_LIMIT))
+        return Response(autocomplete.suggest(request.query_params.get('q', ''), limit))
+
+    @extend_schema(
+        operation_id='drug_catalog',
+        summary='Versioned drug catalog',
+        description=(
+            'Compact snapshot of drug categories, drugs and interactions with the catalog version. '
+            'With ?since=<version>, only rows changed after that version plus deleted ids.'
+        ),
+        parameters=[
+            OpenApiParameter('since', type=int, description='Catalog version the client already has'),
+        ],
+        responses={200: OpenApiResponse(description='Catalog snapshot or delta')},
+    )
+    @action(detail=False, methods=['get'])
+    def catalog(self, request):
+        """Catalog snapshot, or the delta since a version"""
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                since = -1
+            if since < 0:
+                return Response(
+                    {'error': 'Tham số since phải là số nguyên không âm'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Phiên bản trước: client đã có bản này nhận 304 mà không phải dựng payload
+        version = catalog.current_version()
+        etag = 'W/"catalog-%d-%s"' % (version, 'full' if since is None else since)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if since is None:
+                payload = catalog.snapshot(version)
+            else:
+                payload = catalog.delta(since, version=version)
+            response = Response(payload)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
 @extend_schema(tags=['prescriptions'])
-class PrescriptionViewSet(ModelViewSet):
+class PrescriptionViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """
     Prescription Management ViewSet
     """
@@ -181,10 +258,21 @@ class PrescriptionViewSet(ModelViewSet):
     filterset_fields = [
         'status', 'prescription_type', 'patient', 'doctor', 'appointment'
     ]
+    # count + page + items/drug + dispensing records; the user row is read twice
+    # (JWTAuthMiddleware and DRF authentication)
+    query_budgets = {
+        'list': QueryBudget(max_queries=8, max_duplicates=2),
+        'retrieve': QueryBudget(max_queries=6, max_duplicates=2),
+    }
     
     def get_queryset(self):
         queryset = super().get_queryset()
         
+        # dispensing_status được tính từ dispensing_records; chỉ prefetch khi đọc
+        # vì các action ghi (mark_prepared, mark_dispensed...) cập nhật bằng .update()
+        if self.request is not None and self.request.method in SAFE_METHODS:
+            queryset = queryset.prefetch_related('dispensing_records')
+        
         # Lọc theo dispensing_status nếu có
         dispensing_status = self.request.query_params.get('dispensing_status')
         if dispensing_status:
@@ -195,10 +283,17 @@ class PrescriptionViewSet(ModelViewSet):
                 queryset = queryset.filter(dispensing_records__status='PENDING').distinct()
             elif dispensing_status == 'PREPARED':
                 queryset = queryset.filter(dispensing_records__status='PREPARED').distinct()
+            # Đơn đã kết thúc có bản ghi cấp thuốc đã lưu trữ: theo trạng thái đơn
             elif dispensing_status == 'DISPENSED':
-                queryset = queryset.filter(dispensing_records__status='DISPENSED').distinct()
+                queryset = queryset.filter(
+                    Q(dispensing_records__status='DISPENSED')
+                    | Q(status='FULLY_DISPENSED', dispensing_records__isnull=True)
+                ).distinct()
             elif dispensing_status == 'CANCELLED':
-                queryset = queryset.filter(dispensing_records__status='CANCELLED').distinct()
+                queryset = queryset.filter(
+                    Q(dispensing_records__status='CANCELLED')
+                    | Q(status='CANCELLED', dispensing_records__isnull=True)
+                ).distinct()
         
         return queryset
     ordering_fields = ['prescription_date', 'created_at', 'valid_until']
@@ -227,6 +322,11 @@ class PrescriptionViewSet(ModelViewSet):
             return PrescriptionCreateSerializer
         return PrescriptionSerializer
     
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        # Gửi lại cùng Idempotency-Key không tạo đơn thuốc thứ hai
+        return super().create(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         print(f"🔍 perform_create called with user: {self.request.user}")
         print(f"🔍 Request data: {self.request.data}")
@@ -252,8 +352,8 @@ class PrescriptionViewSet(ModelViewSet):
     @action(detail=False, methods=['get'])
     def today_prescriptions(self, request):
         """Get today's prescriptions"""
-        today = date.today()
-        queryset = self.get_queryset().filter(prescription_date__date=today)
+        day_start, day_end = local_day_range(timezone.localdate())
+        queryset = self.get_queryset().filter(prescription_date__gte=day_start, prescription_date__lt=day_end)
         
         doctor_id = request.query_params.get('doctor')
         if doctor_id:
@@ -273,11 +373,11 @@ class PrescriptionViewSet(ModelViewSet):
     @action(detail=False, methods=['get'])
     def expiring_soon(self, request):
         """Get prescriptions expiring in the next 7 days"""
-        seven_days_later = timezone.now() + timedelta(days=7)
+        now = timezone.now()
         queryset = self.get_queryset().filter(
             status='ACTIVE',
-            valid_until__lte=seven_days_later,
-            valid_until__gt=timezone.now()
+            valid_until__gt=now,
+            valid_until__lte=now + timedelta(days=7),
         )
         
         serializer = self.get_serializer(queryset, many=True)
@@ -522,6 +622,10 @@ class PrescriptionViewSet(ModelViewSet):
         if all(d.status == 'DISPENSED' for d in all_dispensing):
             prescription.status = 'FULLY_DISPENSED'
             prescription.save()
+        else:
+            # Bản ghi vừa sang trạng thái cuối qua .update(): chạm updated_at của đơn
+            # để lượt đồng bộ bù của shared.cutover chép lại
+            Prescription.objects.filter(pk=prescription.pk).update(updated_at=timezone.now())
         
         serializer = self.get_serializer(prescription)
         return Response(serializer.data)
@@ -556,6 +660,12 @@ class PrescriptionDispenseViewSet(ModelViewSet):
             return PrescriptionDispenseCreateSerializer
         return PrescriptionDispenseSerializer
 
+    def perform_update(self, serializer):
+        record = serializer.save()
+        # dispensed_at không đổi khi cập nhật: chạm updated_at của đơn để lượt
+        # đồng bộ bù của shared.cutover chép lại bản ghi (kể cả khi sang trạng thái cuối)
+        Prescription.objects.filter(pk=record.prescription_id).update(updated_at=timezone.now())
+
     def create(self, request, *args, **kwargs):
         # Extra guard at view layer to ensure payment before dispensing
         prescription_item_id = request.data.get('prescription_item')
@@ -584,51 +694,35 @@ class PrescriptionDispenseViewSet(ModelViewSet):
         400: OpenApiResponse(description='Invalid date format'),
     }
 )
+@throttle_scope('reporting')
+@use_read_replica
+@query_budget(max_queries=4)
 @api_view(['GET'])
 def prescription_statistics(request):
     """
     Prescription Statistics
+    
+    Đọc từ bảng tổng hợp theo ngày (apps.prescriptions.rollup), không quét đơn thuốc.
     """
     
-    # Date range
+    # Date range (ngày theo giờ địa phương, tính cả date_to)
     date_from = request.query_params.get('date_from')
     date_to = request.query_params.get('date_to')
     doctor_id = request.query_params.get('doctor')
     
-    queryset = Prescription.objects.all()
-    
     if date_from:
         try:
             date_from = timezone.datetime.strptime(date_from, '%Y-%m-%d').date()
-            queryset = queryset.filter(prescription_date__date__gte=date_from)
         except ValueError:
-            pass
+            date_from = None
     
     if date_to:
         try:
             date_to = timezone.datetime.strptime(date_to, '%Y-%m-%d').date()
-            queryset = queryset.filter(prescription_date__date__lte=date_to)
         except ValueError:
-            pass
-    
-    if doctor_id:
-        queryset = queryset.filter(doctor_id=doctor_id)
+            date_to = None
     
-    # Calculate statistics
-    stats = queryset.aggregate(
-        total_prescriptions=Count('id'),
-        active_prescriptions=Count(
-            Case(When(status='ACTIVE', then='id'))
-        ),
-        expired_prescriptions=Count(
-            Case(When(status='EXPIRED', then='id'))
-        ),
-        dispensed_prescriptions=Count(
-            Case(When(status__in=['PARTIALLY_DISPENSED', 'FULLY_DISPENSED'], then='id'))
-        ),
-        total_amount=Sum('total_amount') or 0,
-        insurance_covered=Sum('insurance_covered_amount') or 0,
-    )
+    stats = rollup.summary(date_from, date_to, doctor_id)
     
     serializer = PrescriptionStatsSerializer(stats)
     return Response(serializer.data)
\ No newline at end of file
@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.users"
+
+    def ready(self):
+        # Đổi phiên bản blacklist JWT khi có token bị thu hồi (shared.auth.blacklist)
+        from shared.auth import blacklist  # noqa: F401
+
+        # Làm mới cache vai trò/quyền khi dữ liệu phân quyền thay đổi
+        from django.db.models import Q
+        from shared.archive import registry as archive
+        from shared.cache import reference
+        from .models import AuditLog, Permission, Role, RolePermission, UserRole
+
+        reference.register('roles', Role, RolePermission, Permission)
+        reference.register('permissions', Permission)
+        reference.register('user-permissions', UserRole, Role, RolePermission, Permission)
+
+        # Lưu trữ nhật ký cũ; giữ log tạo/sửa tài khoản (UserSerializer đọc "người tạo/sửa")
+        archive.register(
+            'audit_logs', AuditLog, 'timestamp', retention_days=90,
+            exclude=Q(resource_type='USER', action__in=['CREATE', 'UPDATE']),
+            filter_fields=['user_id_backup', 'action', 'resource_type', 'resource_id'],
+        )
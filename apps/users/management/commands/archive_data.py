@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shared.archive import archiver, registry
+from shared.archive.storage import PartitionStore
+
+
+class Command(BaseCommand):
+    help = 'Move rows older than their retention window to the compressed archive (ARCHIVE_ROOT)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', action='append', help='Table to archive (repeatable, default: all)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that are due')
+        parser.add_argument('--verify', action='store_true', help='Check partition checksums, archive nothing')
+
+    def handle(self, *args, **options):
+        names = options['name'] or registry.names()
+        unknown = set(names) - set(registry.names())
+        if unknown:
+            raise CommandError(f"Unknown archive: {', '.join(sorted(unknown))} (known: {', '.join(registry.names())})")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        for name in names:
+            spec = registry.get(name)
+            if options['verify']:
+                self.verify(name)
+                continue
+
+            moved = archiver.archive(
+                spec,
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                dry_run=options['dry_run'],
+                pause=options['pause'],
+            )
+            verb = 'due' if options['dry_run'] else 'archived'
+            self.stdout.write(f'{name}: {moved} rows {verb} (retention {spec.retention_days} days)')
+
+    def verify(self, name):
+        store = PartitionStore(name)
+        partitions = store.partitions()
+        broken = [entry['file'] for entry in partitions if not store.verify(entry)]
+        for path in broken:
+            self.stderr.write(f'{name}: {path} is missing or corrupt')
+        rows = sum(entry['rows'] for entry in partitions)
+        self.stdout.write(f'{name}: {len(partitions)} partitions, {rows} rows, {len(broken)} broken')
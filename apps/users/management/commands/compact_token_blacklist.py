@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shared.auth import blacklist
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding/blacklisted JWT refresh tokens in batches (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per transaction')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired tokens')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        if options['dry_run']:
+            self.stdout.write(f'{blacklist.expired_count()} expired outstanding tokens')
+            return
+
+        outstanding, blacklisted = blacklist.compact(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(f'Deleted {outstanding} outstanding tokens ({blacklisted} blacklisted)')
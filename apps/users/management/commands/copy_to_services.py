@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from shared.cutover import copier, tables
+from shared.cutover.checkpoint import CheckpointStore
+
+
+class Command(BaseCommand):
+    help = 'Copy monolith tables into the hospital-microservices databases (resumable, with catch-up passes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', action='append', help='Table to copy (repeatable, default: all)')
+        parser.add_argument('--workers', type=int, default=4, help='Threads copying key ranges in parallel')
+        parser.add_argument('--shards', type=int, default=4, help='Key ranges per table (fixed at the first run)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows written per transaction')
+        parser.add_argument('--catch-up', action='store_true', help='Copy only rows changed since the last pass')
+        parser.add_argument('--overlap', type=int, default=60,
+                            help='Seconds re-read before the last pass (transactions that committed late)')
+        parser.add_argument('--reset', action='store_true', help='Forget the checkpoints of the tables and copy again')
+        parser.add_argument('--verify', action='store_true', help='Compare row counts after copying')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Monolith database to read from')
+
+    def handle(self, *args, **options):
+        names = options['table'] or tables.names()
+        unknown = set(names) - set(tables.names())
+        if unknown:
+            raise CommandError(f"Unknown table: {', '.join(sorted(unknown))} (known: {', '.join(tables.names())})")
+        for option in ('workers', 'shards', 'batch_size'):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be positive")
+        specs = [spec for spec in tables.specs() if spec.table in names]
+
+        store = CheckpointStore()
+        try:
+            with store.lock():
+                self.run(specs, store, options)
+        except BlockingIOError:
+            raise CommandError(f'Another copy holds {store.path}.lock')
+        except copier.CutoverError as exc:
+            raise CommandError(str(exc))
+
+    def run(self, specs, store, options):
+        if options['reset']:
+            for spec in specs:
+                store.reset(spec.table)
+
+        if options['catch_up']:
+            copied = copier.catch_up(
+                specs, store,
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                overlap=options['overlap'],
+                using=options['database'],
+            )
+        else:
+            copied = copier.copy(
+                specs, store,
+                workers=options['workers'],
+                shards=options['shards'],
+                batch_size=options['batch_size'],
+                using=options['database'],
+            )
+        for spec in specs:
+            self.stdout.write(f'{spec.service}.{spec.table}: {copied.get(spec.table, 0)} rows')
+
+        if options['verify']:
+            for table, (source, target) in copier.verify(specs, using=options['database']).items():
+                line = f'{table}: monolith {source}, service {target}'
+                self.stdout.write(self.style.SUCCESS(line) if source == target else self.style.WARNING(line))
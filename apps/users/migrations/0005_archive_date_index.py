@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_add_signup_fields"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["timestamp"], name="audit_logs_timesta_423be6_idx"
+            ),
+        ),
+    ]
@@ -154,4 +154,5 @@ class AuditLog(models.Model):
             models.Index(fields=['user_id_backup', 'timestamp']),
             models.Index(fields=['action', 'timestamp']),
             models.Index(fields=['resource_type', 'timestamp']),
+            models.Index(fields=['timestamp']),
         ]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from shared.auth.tokens import RefreshToken
 from .models import User, Role, Permission, UserRole
 
 class UserSerializer(serializers.ModelSerializer):
@@ -153,4 +155,8 @@ class UserRoleSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'role', 'role_name', 'assigned_by', 'assigned_by_username',
             'assigned_at', 'expires_at', 'is_active'
-        ]
\ No newline at end of file
+        ]
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    # Kiểm tra blacklist qua bộ lọc trong bộ nhớ (shared.auth.blacklist)
+    token_class = RefreshToken
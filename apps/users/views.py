@@ -2,7 +2,6 @@ from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth import update_session_auth_hash
@@ -15,6 +14,8 @@ from .serializers import (
     ChangePasswordSerializer, RoleSerializer, PermissionSerializer,
     UserRoleSerializer
 )
+from shared.auth.tokens import RefreshToken
+from shared.cache.mixins import ReferenceCacheMixin
 from shared.permissions.base_permissions import IsOwnerOrAdmin, HasPermission
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -255,10 +256,11 @@ class UserViewSet(ModelViewSet):
             return Response({'error': 'Role not found'}, 
                           status=status.HTTP_404_NOT_FOUND)
 
-class RoleViewSet(ModelViewSet):
+class RoleViewSet(ReferenceCacheMixin, ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     permission_classes = [HasPermission]
+    reference_cache = 'roles'
     
     def get_permissions(self):
         self.required_permissions = ['SYSTEM:READ']
@@ -267,10 +269,11 @@ class RoleViewSet(ModelViewSet):
         
         return super().get_permissions()
 
-class PermissionViewSet(ModelViewSet):
+class PermissionViewSet(ReferenceCacheMixin, ModelViewSet):
     queryset = Permission.objects.all()
     serializer_class = PermissionSerializer
     permission_classes = [HasPermission]
+    reference_cache = 'permissions'
     
     def get_permissions(self):
         self.required_permissions = ['SYSTEM:READ']
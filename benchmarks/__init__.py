@@ -0,0 +1,14 @@
+"""
+End-to-end API benchmark suite.
+
+Boots the project (in-process through the Django test client, or against a
+running server over HTTP), drives the hot API endpoints with configurable
+concurrency and records latency percentiles, throughput and DB query counts.
+Results are compared against ``benchmarks/baseline.json``; regressions make
+the run exit non-zero.
+
+    python -m benchmarks --generate small
+    python -m benchmarks --concurrency 8 --requests 500
+    python -m benchmarks --mode http --base-url http://127.0.0.1:8000
+    python -m benchmarks --update-baseline
+"""
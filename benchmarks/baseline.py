@@ -0,0 +1,56 @@
+"""
+Baseline storage and regression checks.
+
+Latency is compared on p95 with a relative tolerance plus an absolute floor
+(so sub-millisecond jitter on fast endpoints never fails a run). Query counts
+are deterministic and compared exactly: any increase is a regression.
+"""
+import json
+from pathlib import Path
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def save_baseline(report, path=DEFAULT_BASELINE):
+    with Path(path).open('w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False, sort_keys=True)
+        fh.write('\n')
+
+
+def compare(report, baseline, latency_tolerance=0.25, min_delta_ms=2.0, query_tolerance=0):
+    """Return a list of human-readable regressions (empty when the run is clean)."""
+    regressions = []
+    base_scenarios = (baseline or {}).get('scenarios', {})
+    for name, current in report['scenarios'].items():
+        if current.get('over_budget'):
+            regressions.append(f"{name}: {current['over_budget']} requests exceeded the view's query budget")
+
+        base = base_scenarios.get(name)
+        if not base:
+            continue
+
+        if base.get('p95_ms') is not None and current.get('p95_ms') is not None:
+            limit = max(base['p95_ms'] * (1 + latency_tolerance), base['p95_ms'] + min_delta_ms)
+            if current['p95_ms'] > limit:
+                regressions.append(
+                    f"{name}: p95 {current['p95_ms']:.1f}ms > {limit:.1f}ms (baseline {base['p95_ms']:.1f}ms)"
+                )
+
+        if base.get('queries_max') is not None and current.get('queries_max') is not None:
+            if current['queries_max'] > base['queries_max'] + query_tolerance:
+                regressions.append(
+                    f"{name}: {current['queries_max']} queries > baseline {base['queries_max']}"
+                )
+
+        if not base.get('errors') and current.get('errors'):
+            regressions.append(f"{name}: {current['errors']} error responses (statuses {current['statuses']})")
+
+    return regressions
@@ -0,0 +1,152 @@
+import argparse
+import os
+import platform
+import sys
+from datetime import datetime
+
+THROTTLE_SCOPES = ('default', 'search', 'booking', 'payment', 'reporting')
+
+
+def parse_args(argv=None):
+    from benchmarks.baseline import DEFAULT_BASELINE
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Hospital API benchmark suite')
+    parser.add_argument('--mode', choices=['inprocess', 'http'], default='inprocess',
+                        help='Drive the Django test client in-process or a running server over HTTP')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server URL for --mode http')
+    parser.add_argument('--settings', default=None, help='Django settings module (default: config.settings)')
+    parser.add_argument('--generate', metavar='PRESET', default=None,
+                        help='Run `generate_dataset --preset PRESET` before benchmarking')
+    parser.add_argument('--generate-workers', type=int, default=1)
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--list', action='store_true', help='List scenarios and exit')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Concurrent client threads')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario')
+    parser.add_argument('--seed', type=int, default=0, help='Seed used to sample request inputs')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--no-compare', action='store_true', help='Do not fail on regressions')
+    parser.add_argument('--latency-tolerance', type=float, default=0.25,
+                        help='Allowed relative p95 increase before failing (default 0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='Absolute p95 increase always tolerated, in ms')
+    parser.add_argument('--output', help='Also write the JSON report to this path')
+    parser.add_argument('--debug', action='store_true', help='Keep DEBUG=True (slower, not representative)')
+    return parser.parse_args(argv)
+
+
+def setup_django(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', args.settings or 'config.settings')
+    if args.settings:
+        os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    if not args.debug:
+        os.environ['DEBUG'] = 'False'
+    # Query count and budget status come from QueryInstrumentationMiddleware headers
+    os.environ.setdefault('QUERY_INSTRUMENTATION_HEADERS', 'True')
+    # Every request uses the same benchmark user: with the API throttle rates
+    # the reporting and booking scenarios would measure 429s. An empty rate
+    # disables a route class; set THROTTLE_RATE_* to benchmark throttling.
+    # (--mode http: start the server with the same variables.)
+    for scope in THROTTLE_SCOPES:
+        os.environ.setdefault(f'THROTTLE_RATE_{scope.upper()}', '')
+    import django
+    django.setup()
+
+
+def print_table(report, stream=sys.stdout):
+    header = f"{'scenario':<26}{'req':>6}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'queries':>9}"
+    stream.write(header + '\n' + '-' * len(header) + '\n')
+    for name, row in report['scenarios'].items():
+        def fmt(value):
+            return '-' if value is None else f'{value:.1f}'
+        stream.write(
+            f"{name:<26}{row['requests']:>6}{row['errors']:>5}"
+            f"{fmt(row['p50_ms']):>9}{fmt(row['p95_ms']):>9}{fmt(row['p99_ms']):>9}"
+            f"{fmt(row['throughput_rps']):>9}{'-' if row['queries_max'] is None else row['queries_max']:>9}\n"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from benchmarks.scenarios import SCENARIOS, SCENARIOS_BY_NAME
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f'{scenario.name:<26}{scenario.method:<6}{scenario.description}')
+        return 0
+
+    unknown = set(args.scenarios or []) - set(SCENARIOS_BY_NAME)
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    scenarios = [SCENARIOS_BY_NAME[name] for name in args.scenarios] if args.scenarios else SCENARIOS
+
+    setup_django(args)
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from benchmarks.baseline import compare, load_baseline, save_baseline
+    from benchmarks.fixtures import BenchmarkData
+    from benchmarks.runner import BenchmarkRunner, HttpTransport, InProcessTransport
+
+    if args.generate:
+        call_command('generate_dataset', preset=args.generate, workers=args.generate_workers)
+
+    from apps.appointments.models import Appointment
+    from apps.patients.models import Patient
+    from apps.prescriptions.models import Prescription
+
+    data = BenchmarkData(seed=args.seed, rollback=args.mode == 'inprocess')
+    if args.mode == 'http':
+        transport = HttpTransport(data, args.base_url)
+    else:
+        transport = InProcessTransport(data)
+    runner = BenchmarkRunner(transport, data, requests=args.requests,
+                             concurrency=args.concurrency, warmup=args.warmup)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'mode': transport.name,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'python': platform.python_version(),
+            'dataset': {
+                'patients': Patient.objects.count(),
+                'appointments': Appointment.objects.count(),
+                'prescriptions': Prescription.objects.count(),
+            },
+        },
+        'scenarios': {},
+    }
+    for scenario in scenarios:
+        print(f'Running {scenario.name} ...', file=sys.stderr)
+        report['scenarios'][scenario.name] = runner.run(scenario).to_dict()
+
+    print_table(report)
+
+    if args.output:
+        save_baseline(report, args.output)
+    if args.update_baseline:
+        save_baseline(report, args.baseline)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if args.no_compare:
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print('No baseline found; run with --update-baseline to record one.')
+        return 0
+    regressions = compare(report, baseline, latency_tolerance=args.latency_tolerance,
+                          min_delta_ms=args.min_delta_ms)
+    if regressions:
+        print('\nREGRESSIONS:')
+        for line in regressions:
+            print(f'  - {line}')
+        return 1
+    print('\nNo regressions against baseline.')
+    return 0
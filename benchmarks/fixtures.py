@@ -0,0 +1,76 @@
+"""
+Sample ids and credentials the scenarios draw their requests from.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+BENCHMARK_USERNAME = 'bench_admin'
+
+
+class BenchmarkData:
+    """Ids sampled once from the database before any timed request runs."""
+
+    def __init__(self, seed=0, sample_size=200, rollback=True):
+        from apps.appointments.models import DoctorProfile
+        from apps.patients.models import Patient
+        from apps.prescriptions.models import PrescriptionDispensing
+
+        rng = random.Random(seed)
+        # Writes against a live server persist, so each run books different
+        # slots; in-process writes are rolled back and can be replayed as-is.
+        self.rollback = rollback
+        self.offset = 0 if rollback else random.SystemRandom().randrange(10 ** 6)
+        self.today = timezone.localdate()
+        self.user = self._get_user()
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+        patients = list(
+            Patient.objects.filter(is_active=True)
+            .order_by('patient_code')
+            .values('id', 'full_name', 'patient_code', 'phone_number')[:sample_size * 5]
+        )
+        if not patients:
+            raise RuntimeError('No patients found - run with --generate or `manage.py generate_dataset` first')
+        patients = rng.sample(patients, min(sample_size, len(patients)))
+        self.patient_ids = [str(p['id']) for p in patients]
+        self.search_terms = []
+        for p in patients:
+            self.search_terms.extend([
+                p['full_name'].split()[-1],
+                p['patient_code'][:8],
+                p['phone_number'][:6],
+            ])
+
+        self.doctor_ids = [
+            str(pk) for pk in DoctorProfile.objects.filter(is_active=True).order_by('id').values_list('id', flat=True)
+        ]
+        if not self.doctor_ids:
+            raise RuntimeError('No doctors found - run with --generate first')
+
+        # Paid prescriptions still waiting to be prepared: the dispensing scenario
+        # moves them PENDING -> PREPARED.
+        self.pending_prescription_ids = [
+            str(pk) for pk in PrescriptionDispensing.objects.filter(status='PENDING')
+            .order_by('prescription_id').values_list('prescription_id', flat=True).distinct()[:sample_size * 5]
+        ]
+
+        self.stats_date_from = (self.today - timedelta(days=30)).isoformat()
+        self.stats_date_to = self.today.isoformat()
+
+    def _get_user(self):
+        User = get_user_model()
+        user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+        if user is None:
+            user = User.objects.create_superuser(
+                username=BENCHMARK_USERNAME,
+                email='bench@hospital.example.com',
+                password=None,
+                first_name='Benchmark',
+                last_name='Admin',
+                user_type='ADMIN',
+            )
+        return user
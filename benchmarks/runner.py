@@ -0,0 +1,226 @@
+"""
+Benchmark runner: drives a scenario through a transport with N threads and
+aggregates latency percentiles, throughput and DB query counts.
+"""
+import http.client
+import itertools
+import json
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from shared.db.instrumentation import QUERY_BUDGET_HEADER, QUERY_COUNT_HEADER
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def _budget_exceeded(headers):
+    return (headers.get(QUERY_BUDGET_HEADER) or '').startswith('exceeded')
+
+
+class Sample:
+    __slots__ = ('status', 'elapsed', 'queries', 'size', 'over_budget')
+
+    def __init__(self, status, elapsed, queries, size, over_budget=False):
+        self.status = status
+        self.elapsed = elapsed
+        self.queries = queries
+        self.size = size
+        self.over_budget = over_budget
+
+
+class InProcessTransport:
+    """Calls the WSGI handler directly through ``django.test.Client`` (one per thread)."""
+
+    name = 'inprocess'
+
+    def __init__(self, data):
+        self.data = data
+        self._local = threading.local()
+        # SQLite allows a single writer: serialise mutating requests instead of
+        # measuring "database is locked" retries.
+        self._write_lock = threading.Lock() if connection.vendor == 'sqlite' else None
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = Client(
+                raise_request_exception=False,
+                HTTP_HOST='localhost',
+                HTTP_AUTHORIZATION=f'Bearer {self.data.token}',
+            )
+            self._local.client = client
+        return client
+
+    def request(self, scenario, path, body):
+        client = self._client()
+        call = getattr(client, scenario.method.lower())
+        kwargs = {'data': json.dumps(body), 'content_type': 'application/json'} if body is not None else {}
+        # queries_log is a bounded deque: once full its length stops growing and
+        # CaptureQueriesContext would report zero, so start every request empty.
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            if scenario.mutating:
+                with self._write_lock or nullcontext(), transaction.atomic():
+                    started = time.perf_counter()
+                    response = call(path, **kwargs)
+                    elapsed = time.perf_counter() - started
+                    transaction.set_rollback(True)
+            else:
+                started = time.perf_counter()
+                response = call(path, **kwargs)
+                elapsed = time.perf_counter() - started
+        size = len(response.content) if not response.streaming else 0
+        # Prefer the count reported by QueryInstrumentationMiddleware; fall back
+        # to the debug cursor when instrumentation is disabled.
+        queries = response.get(QUERY_COUNT_HEADER)
+        queries = int(queries) if queries is not None else len(captured)
+        return Sample(response.status_code, elapsed, queries, size, _budget_exceeded(response))
+
+    def close_thread(self):
+        connection.close()
+
+
+class HttpTransport:
+    """Talks to a running server over keep-alive HTTP connections (one per thread)."""
+
+    name = 'http'
+
+    def __init__(self, data, base_url, timeout=30):
+        self.data = data
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def request(self, scenario, path, body):
+        headers = {'Authorization': f'Bearer {self.data.token}', 'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        conn = self._connection()
+        started = time.perf_counter()
+        try:
+            conn.request(scenario.method, self.prefix + path, body=payload, headers=headers)
+            response = conn.getresponse()
+            content = response.read()
+        except (ConnectionError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            return Sample(0, time.perf_counter() - started, None, 0)
+        elapsed = time.perf_counter() - started
+        queries = response.getheader(QUERY_COUNT_HEADER)
+        return Sample(
+            response.status, elapsed, int(queries) if queries is not None else None, len(content),
+            _budget_exceeded({QUERY_BUDGET_HEADER: response.getheader(QUERY_BUDGET_HEADER)}),
+        )
+
+    def close_thread(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+
+
+class ScenarioResult:
+    def __init__(self, scenario, samples, wall_time, concurrency):
+        self.scenario = scenario
+        self.samples = samples
+        self.wall_time = wall_time
+        self.concurrency = concurrency
+
+    def to_dict(self):
+        latencies = sorted(s.elapsed * 1000 for s in self.samples)
+        queries = sorted(s.queries for s in self.samples if s.queries is not None)
+        errors = sum(1 for s in self.samples if not 200 <= s.status < 400)
+
+        def ms(value):
+            return round(value, 3) if value is not None else None
+
+        return {
+            'requests': len(self.samples),
+            'errors': errors,
+            'over_budget': sum(1 for s in self.samples if s.over_budget),
+            'concurrency': self.concurrency,
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+            'max_ms': ms(latencies[-1]) if latencies else None,
+            'throughput_rps': round(len(self.samples) / self.wall_time, 2) if self.wall_time else None,
+            'queries_p50': percentile(queries, 50) if queries else None,
+            'queries_max': queries[-1] if queries else None,
+            'bytes_mean': round(sum(s.size for s in self.samples) / len(self.samples)) if self.samples else 0,
+            'statuses': sorted({s.status for s in self.samples}),
+        }
+
+
+class BenchmarkRunner:
+    def __init__(self, transport, data, requests=200, concurrency=1, warmup=10):
+        self.transport = transport
+        self.data = data
+        self.requests = requests
+        self.concurrency = max(1, concurrency)
+        self.warmup = warmup
+
+    def run(self, scenario):
+        # Warm-up requests are issued sequentially and discarded; the timed
+        # requests continue from the next index so no input is reused twice.
+        for i in range(self.warmup):
+            request = scenario.build(self.data, i)
+            if request is None:
+                break
+            self.transport.request(scenario, *request)
+
+        counter = itertools.count(self.warmup)
+        stop = self.warmup + self.requests
+        per_thread = [[] for _ in range(self.concurrency)]
+
+        def worker(samples):
+            try:
+                while True:
+                    i = next(counter)
+                    if i >= stop:
+                        return
+                    request = scenario.build(self.data, i)
+                    if request is None:
+                        return
+                    samples.append(self.transport.request(scenario, *request))
+            finally:
+                self.transport.close_thread()
+
+        threads = [threading.Thread(target=worker, args=(samples,)) for samples in per_thread]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        return ScenarioResult(scenario, [s for samples in per_thread for s in samples], wall_time, self.concurrency)
@@ -0,0 +1,95 @@
+"""
+Benchmark scenarios: one per hot endpoint.
+
+Each scenario builds the ``i``-th request from the sampled ``BenchmarkData``.
+``build`` returns ``(path, body)`` or ``None`` once a scenario has run out of
+inputs (e.g. no more prescriptions left to dispense against a live server).
+"""
+from datetime import time, timedelta
+
+
+class Scenario:
+    def __init__(self, name, method, build, mutating=False, description=''):
+        self.name = name
+        self.method = method
+        self.build = build
+        # Mutating scenarios are rolled back after each request when running
+        # in-process so that repeated runs see the same dataset.
+        self.mutating = mutating
+        self.description = description
+
+    def __repr__(self):
+        return f'<Scenario {self.name}>'
+
+
+def _pick(items, i):
+    return items[i % len(items)]
+
+
+def _patient_search(data, i):
+    return f'/api/patients/search/?q={_pick(data.search_terms, i)}', None
+
+
+def _available_slots(data, i):
+    day = data.today + timedelta(days=i % 14)
+    return f'/api/doctors/{_pick(data.doctor_ids, i)}/available_slots/?date={day.isoformat()}', None
+
+
+def _appointment_create(data, i):
+    # Spread bookings over 8:00-17:00 in 15 minute slots, starting past the
+    # generator's 30 day forward window so doctors are not already at capacity.
+    i += data.offset
+    slot = i % 36
+    minutes = 8 * 60 + slot * 15
+    day = data.today + timedelta(days=31 + (i // 36) % 140)
+    return '/api/appointments/', {
+        'patient': _pick(data.patient_ids, i),
+        'doctor': _pick(data.doctor_ids, i // 36),
+        'appointment_date': day.isoformat(),
+        'appointment_time': time(minutes // 60, minutes % 60).strftime('%H:%M'),
+        'appointment_type': 'NEW',
+        'priority': 'NORMAL',
+        'chief_complaint': 'Benchmark',
+    }
+
+
+def _prescription_list(data, i):
+    return f'/api/prescriptions/?page={1 + i % 5}', None
+
+
+def _dispensing_list(data, i):
+    return '/api/dispensing/?status=PENDING', None
+
+
+def _dispense(data, i):
+    ids = data.pending_prescription_ids
+    if not ids or (not data.rollback and i >= len(ids)):
+        return None
+    return f'/api/prescriptions/{_pick(ids, i)}/mark_prepared/', {}
+
+
+def _appointment_statistics(data, i):
+    return f'/api/appointments/statistics/?date={data.today.isoformat()}', None
+
+
+def _prescription_statistics(data, i):
+    return f'/api/prescriptions/statistics/?date_from={data.stats_date_from}&date_to={data.stats_date_to}', None
+
+
+def _patient_statistics(data, i):
+    return '/api/patients/statistics/', None
+
+
+SCENARIOS = [
+    Scenario('patient_search', 'GET', _patient_search, description='Patient search by name/code/phone'),
+    Scenario('available_slots', 'GET', _available_slots, description='Doctor available slots for a day'),
+    Scenario('appointment_create', 'POST', _appointment_create, mutating=True, description='Book an appointment'),
+    Scenario('prescription_list', 'GET', _prescription_list, description='Paginated prescription list'),
+    Scenario('dispensing_list', 'GET', _dispensing_list, description='Pending dispensing queue'),
+    Scenario('dispense', 'POST', _dispense, mutating=True, description='Mark a prescription prepared'),
+    Scenario('appointment_statistics', 'GET', _appointment_statistics, description='Daily appointment stats'),
+    Scenario('prescription_statistics', 'GET', _prescription_statistics, description='30 day prescription stats'),
+    Scenario('patient_statistics', 'GET', _patient_statistics, description='Patient stats'),
+]
+
+SCENARIOS_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
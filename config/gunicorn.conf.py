@@ -0,0 +1,45 @@
+"""
+Gunicorn deployment profiles.
+
+WSGI, multi-process:
+
+    gunicorn config.wsgi:application -c config/gunicorn.conf.py
+
+ASGI, for the async read paths under /api/async/ (long-poll and SSE payment
+status hold no thread while waiting); sync views keep working and run in
+each worker's thread pool:
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn config.asgi:application -c config/gunicorn.conf.py
+
+Streaming responses outlive ``timeout`` under the ASGI worker, which only
+uses it for worker heartbeats.
+
+Workers write metrics to per-process shards under METRICS_DIR; /metrics on
+any worker aggregates all of them.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+
+# Must be set before workers fork so they all share it.
+os.environ.setdefault('METRICS_DIR', '/tmp/hospital-metrics')
+# Read by settings.WEB_CONCURRENCY (per-process caches warn with several workers)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+
+def on_starting(server):
+    from shared.metrics.core import clear_metrics_dir
+    clear_metrics_dir(os.environ['METRICS_DIR'])
+
+
+def child_exit(server, worker):
+    from shared.metrics.core import store
+    store.mark_process_dead(worker.pid)
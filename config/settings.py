@@ -42,12 +42,15 @@ LOCAL_APPS = [
     'apps.appointments',
     'apps.prescriptions',
     'apps.payments',
+    'apps.dashboard',
     'frontend',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'shared.middlewares.metrics.MetricsMiddleware',
+    'shared.middlewares.query_instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'shared.middlewares.auth_middleware.JWTAuthMiddleware',
+    'shared.middlewares.read_replica.ReadReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +91,58 @@ DATABASES = {
     }
 }
 
+# Read replica for reporting endpoints (shared.db.routers). Enabled when
+# DB_REPLICA_NAME is set; views opt in with read_replica_actions / @use_read_replica.
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': os.getenv('DB_REPLICA_ENGINE', DATABASES['default']['ENGINE']),
+        'NAME': os.getenv('DB_REPLICA_NAME'),
+        'USER': os.getenv('DB_REPLICA_USER', ''),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', ''),
+        'HOST': os.getenv('DB_REPLICA_HOST', ''),
+        'PORT': os.getenv('DB_REPLICA_PORT', ''),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['shared.db.routers.ReadReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+
+# Cache
+# CACHE_BACKEND: locmem (default, one per process), file (shared by the
+# processes of one host; stand-in for memcached in tests), memcached, redis.
+# Dashboard widgets, patient overviews and the reference-data cache
+# (shared.cache.reference) use the default cache.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'tmp' / 'cache')),
+        },
+        'memcached': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211'),
+        },
+        'redis': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+        },
+    }[CACHE_BACKEND],
+}
+
+# Reference-data cache (shared.cache.reference): a per-process LRU in front of
+# the default cache. Other workers' changes are seen within
+# REFERENCE_CACHE_LOCAL_TTL seconds (version check interval).
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', '3600'))
+REFERENCE_CACHE_LOCAL_TTL = float(os.getenv('REFERENCE_CACHE_LOCAL_TTL', '5'))
+REFERENCE_CACHE_LOCAL_SIZE = int(os.getenv('REFERENCE_CACHE_LOCAL_SIZE', '512'))
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -136,6 +192,10 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework
+# orjson-backed JSON rendering/parsing (shared.utils.renderers / parsers). Same
+# output as DRF's stdlib classes; falls back to them if orjson is missing.
+API_FAST_JSON = os.getenv('API_FAST_JSON', 'True').lower() == 'true'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -145,12 +205,35 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'shared.utils.renderers.ORJSONRenderer' if API_FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'shared.utils.parsers.ORJSONParser' if API_FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    # Token buckets per user (or IP) and route class (shared.throttling)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'shared.throttling.throttles.TokenBucketThrottle',
+    ],
+    # Proxies in front of the app (nginx = 1). Anonymous clients are throttled
+    # by IP: 0 uses REMOTE_ADDR and ignores a client-supplied X-Forwarded-For.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+    'DEFAULT_THROTTLE_RATES': {
+        'default': os.getenv('THROTTLE_RATE_DEFAULT', '1200/min'),
+        'search': os.getenv('THROTTLE_RATE_SEARCH', '120/min'),
+        'booking': os.getenv('THROTTLE_RATE_BOOKING', '20/min'),
+        'payment': os.getenv('THROTTLE_RATE_PAYMENT', '20/min'),
+        'reporting': os.getenv('THROTTLE_RATE_REPORTING', '30/min'),
+    },
 }
 
+# Throttle buckets: memory (per process) or redis (shared by all workers)
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'memory')
+THROTTLE_REDIS_URL = os.getenv('THROTTLE_REDIS_URL', 'redis://127.0.0.1:6379/2')
+
 # Simple JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
@@ -158,8 +241,16 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.serializers.TokenRefreshSerializer',
 }
 
+# Blacklist refresh token: bộ lọc Bloom mỗi process, đồng bộ khi phiên bản trong
+# cache đổi hoặc sau số giây này (shared.auth.blacklist)
+JWT_BLACKLIST_SYNC_SECONDS = float(os.getenv('JWT_BLACKLIST_SYNC_SECONDS', '5'))
+# Mỗi lần đồng bộ đọc lại các token bị thu hồi trong số giây này trước lần trước
+# (giao dịch commit muộn, lệch đồng hồ giữa các máy)
+JWT_BLACKLIST_SYNC_OVERLAP_SECONDS = float(os.getenv('JWT_BLACKLIST_SYNC_OVERLAP_SECONDS', '60'))
+
 # DRF Spectacular Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Hospital Management System API',
@@ -242,6 +333,11 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Idempotency-Key: retries of create requests (shared.utils.idempotency)
+CORS_ALLOW_HEADERS = (
+    'accept', 'authorization', 'content-type', 'user-agent', 'x-csrftoken', 'x-requested-with',
+    'idempotency-key',
+)
 
 # Logging
 LOGGING = {
@@ -274,9 +370,99 @@ LOGGING = {
             'handlers': ['file', 'console'],
             'level': 'DEBUG',
         },
+        'shared': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+        },
     },
 }
 
+# Query instrumentation (shared.middlewares.query_instrumentation)
+QUERY_INSTRUMENTATION_ENABLED = os.getenv('QUERY_INSTRUMENTATION_ENABLED', 'True').lower() == 'true'
+QUERY_INSTRUMENTATION_HEADERS = os.getenv('QUERY_INSTRUMENTATION_HEADERS', str(DEBUG)).lower() == 'true'
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False').lower() == 'true'
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '1000'))
+DUPLICATE_QUERY_THRESHOLD = int(os.getenv('DUPLICATE_QUERY_THRESHOLD', '5'))
+
+# Prometheus metrics (shared.metrics). Multi-process servers must point
+# METRICS_DIR at a directory shared by all workers (see config/gunicorn.conf.py).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN')
+
+# Worker processes serving requests (exported by config/gunicorn.conf.py)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '1'))
+
+# Pub/sub for waking waiters (shared.pubsub): local (this process only) or
+# redis (fan-out to every worker through PUBSUB_REDIS_URL)
+PUBSUB_BACKEND = os.getenv('PUBSUB_BACKEND', 'local')
+PUBSUB_REDIS_URL = os.getenv('PUBSUB_REDIS_URL', 'redis://127.0.0.1:6379/3')
+
+# Async read paths (/api/async/). Long-poll and SSE endpoints wait for payment
+# status changes published through shared.pubsub; PAYMENT_STATUS_RECHECK_SECONDS
+# also re-reads the status periodically (0 = never). The local backend does not
+# deliver changes made by another worker, so the re-read is on by default only
+# there and with several workers; on redis waiters make no periodic queries.
+_PAYMENT_STATUS_RECHECK_DEFAULT = '3' if PUBSUB_BACKEND == 'local' and WEB_CONCURRENCY > 1 else '0'
+PAYMENT_STATUS_RECHECK_SECONDS = float(
+    os.getenv('PAYMENT_STATUS_RECHECK_SECONDS', _PAYMENT_STATUS_RECHECK_DEFAULT)
+)
+PAYMENT_STATUS_MAX_WAIT = float(os.getenv('PAYMENT_STATUS_MAX_WAIT', '30'))
+PAYMENT_STATUS_STREAM_SECONDS = float(os.getenv('PAYMENT_STATUS_STREAM_SECONDS', '300'))
+SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+
+# Drug autocomplete index (apps.prescriptions.autocomplete). Each worker checks
+# the catalog version at most every DRUG_AUTOCOMPLETE_VERSION_CHECK seconds.
+DRUG_AUTOCOMPLETE_VERSION_CHECK = float(os.getenv('DRUG_AUTOCOMPLETE_VERSION_CHECK', '1'))
+
+# Patient overview cache (apps.patients.overview), 0 disables it. Invalidation
+# runs in the writing process: use a shared cache backend with several workers.
+PATIENT_OVERVIEW_CACHE_SECONDS = int(os.getenv('PATIENT_OVERVIEW_CACHE_SECONDS', '0'))
+
+# Batch endpoint (shared.utils.batch): sub-requests per call, and threads used
+# for consecutive GETs when the client asks for parallel execution.
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '4'))
+
+# Idempotency-Key records (shared.utils.idempotency), kept in the default cache:
+# how long a response is replayed, how long a running request holds its key,
+# and how long a concurrent duplicate waits for it. With several workers the
+# default cache must be shared (memcached/redis); on locmem each worker keeps
+# its own records and the first keyed request logs an error.
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '10'))
+
+# Archive (shared.archive, `manage.py archive_data`): rows older than their
+# retention window move to gzip'd JSONL partitions under ARCHIVE_ROOT.
+ARCHIVE_ROOT = os.getenv('ARCHIVE_ROOT', str(BASE_DIR / 'archive'))
+ARCHIVE_RETENTION_DAYS = {
+    'audit_logs': int(os.getenv('ARCHIVE_AUDIT_LOG_DAYS', '90')),
+    'appointment_status_history': int(os.getenv('ARCHIVE_STATUS_HISTORY_DAYS', '365')),
+    'prescription_dispensing': int(os.getenv('ARCHIVE_DISPENSING_DAYS', '365')),
+    'vnpay_transactions': int(os.getenv('ARCHIVE_VNPAY_TRANSACTION_DAYS', '365')),
+}
+
+# VNPAY settlement reconciliation reports (apps.payments.reconciliation)
+RECONCILIATION_REPORT_DIR = os.getenv('RECONCILIATION_REPORT_DIR', str(BASE_DIR / 'reports'))
+
+# Copy to hospital-microservices (shared.cutover, `manage.py copy_to_services`).
+# One target database per service, enabled when CUTOVER_<SERVICE>_DB_NAME is
+# set; its tables are created by the service's own migrate.
+CUTOVER_DATABASES = {}
+for _service in ('patients', 'appointments', 'prescriptions', 'payments'):
+    _prefix = f'CUTOVER_{_service.upper()}_DB_'
+    if os.getenv(_prefix + 'NAME'):
+        CUTOVER_DATABASES[_service] = f'{_service}_service'
+        DATABASES[f'{_service}_service'] = {
+            'ENGINE': os.getenv(_prefix + 'ENGINE', 'django.db.backends.postgresql'),
+            'NAME': os.getenv(_prefix + 'NAME'),
+            'USER': os.getenv(_prefix + 'USER', ''),
+            'PASSWORD': os.getenv(_prefix + 'PASSWORD', ''),
+            'HOST': os.getenv(_prefix + 'HOST', ''),
+            'PORT': os.getenv(_prefix + 'PORT', ''),
+        }
+CUTOVER_CHECKPOINT_PATH = os.getenv('CUTOVER_CHECKPOINT_PATH', str(BASE_DIR / 'reports' / 'cutover.json'))
+
 # VNPAY Configuration
 VNPAY_TMN_CODE = os.getenv('VNPAY_TMN_CODE')
 VNPAY_HASH_SECRET = os.getenv('VNPAY_HASH_SECRET')
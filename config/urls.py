@@ -6,6 +6,10 @@ from django.http import HttpResponse
 from django.shortcuts import redirect
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from shared.archive.views import archive_view
+from shared.metrics.views import metrics_view
+from shared.utils.batch import batch_view
+
 def home(request):
     return redirect('login')
 
@@ -21,6 +25,14 @@ urlpatterns = [
     path('api/', include('apps.appointments.urls')),
     path('api/', include('apps.prescriptions.urls')),
     path('api/', include('apps.payments.urls')),
+    path('api/', include('apps.dashboard.urls')),
+    path('api/batch/', batch_view, name='batch'),
+    path('api/archive/<str:name>/', archive_view, name='archive'),
+
+    # Async (ASGI) read paths: same responses, no worker thread held while waiting
+    path('api/async/', include('apps.patients.async_urls')),
+    path('api/async/', include('apps.appointments.async_urls')),
+    path('api/async/', include('apps.payments.async_urls')),
 
     # Frontend views
     path('', include('frontend.urls')),
@@ -33,6 +45,9 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files during development
@@ -1,9 +1,14 @@
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Shared libraries (hospital-microservices/libs, /app/libs in the image)
+LIBS_DIR = BASE_DIR / 'libs' if (BASE_DIR / 'libs').is_dir() else BASE_DIR.parent / 'libs'
+sys.path.insert(0, str(LIBS_DIR))
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'django-insecure-change-me-in-production')
 
@@ -136,16 +141,23 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'ALGORITHM': os.getenv('JWT_ALGORITHM', 'HS256'),
-    'SIGNING_KEY': SECRET_KEY,
+    # Ký/kiểm tra bằng key set (users.tokens), không dùng SIGNING_KEY
+    'ALGORITHM': 'RS256',
+    'SIGNING_KEY': None,
     'VERIFYING_KEY': None,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('users.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# RS256 signing keys (<kid>.pem, created by `manage.py rotate_signing_key`).
+# The newest key signs unless JWT_ACTIVE_KID is set; all are published at /api/auth/jwks/.
+JWT_KEYS_DIR = Path(os.getenv('JWT_KEYS_DIR', str(BASE_DIR / 'keys')))
+JWT_ACTIVE_KID = os.getenv('JWT_ACTIVE_KID') or None
+JWT_ISSUER = os.getenv('JWT_ISSUER', 'hospital-auth')
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,34 @@
+"""
+Role/permission claims embedded in access tokens (see ``service_auth``).
+"""
+from service_auth.claims import (
+    CLAIMS_VERSION, DIGEST_CLAIM, ROLES_CLAIM, VERSION_CLAIM, permission_digest,
+)
+
+from .models import RolePermission, UserRole
+
+
+def active_roles(user):
+    """Names of the user's active roles, sorted."""
+    return sorted(
+        UserRole.objects.filter(user=user, is_active=True, role__is_active=True)
+        .values_list('role__name', flat=True)
+    )
+
+
+def role_permissions(role_names):
+    """``RESOURCE:ACTION`` strings granted by the active roles ``role_names``."""
+    rows = RolePermission.objects.filter(
+        role__name__in=role_names, role__is_active=True, permission__is_active=True,
+    ).values_list('permission__resource', 'permission__action').distinct()
+    return sorted(f'{resource}:{action}' for resource, action in rows)
+
+
+def authz_claims(user):
+    roles = active_roles(user)
+    return {
+        ROLES_CLAIM: roles,
+        DIGEST_CLAIM: permission_digest(role_permissions(roles)),
+        VERSION_CLAIM: CLAIMS_VERSION,
+        'is_superuser': user.is_superuser,
+    }
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    PermissionViewSet, RoleViewSet, RolePermissionViewSet, UserRoleViewSet
+    PermissionViewSet, RoleViewSet, RolePermissionViewSet, UserRoleViewSet,
+    permission_sets_view
 )
 
 router = DefaultRouter()
@@ -11,5 +12,6 @@ router.register(r'role-permissions', RolePermissionViewSet)
 router.register(r'user-roles', UserRoleViewSet)
 
 urlpatterns = [
+    path('permission-sets/', permission_sets_view, name='permission-sets'),
     path('', include(router.urls)),
 ]
@@ -1,7 +1,9 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from service_auth.claims import permission_digest
+from .authz import role_permissions
 from .models import Permission, Role, RolePermission, UserRole
 from .serializers import (
     PermissionSerializer, RoleSerializer, RoleCreateSerializer, RoleUpdateSerializer,
@@ -288,3 +290,23 @@ class UserRoleViewSet(viewsets.ModelViewSet):
         user_roles = UserRole.objects.filter(role_id=role_id, is_active=True)
         serializer = UserRoleSerializer(user_roles, many=True)
         return Response(serializer.data)
+
+
+@extend_schema(
+    tags=['roles'],
+    summary="Permission set of roles",
+    description="Permissions granted by the given active roles and their digest; "
+                "services call this when a token's perm_digest is not in their cache",
+    parameters=[OpenApiParameter('roles', str, description='Role names, comma separated')],
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def permission_sets_view(request):
+    """Get the permission set behind a token's perm_digest"""
+    roles = sorted({name for name in request.query_params.get('roles', '').split(',') if name})
+    granted = role_permissions(roles)
+    return Response({
+        'roles': roles,
+        'digest': permission_digest(granted),
+        'permissions': granted,
+    })
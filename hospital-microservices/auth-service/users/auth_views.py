@@ -1,10 +1,13 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from drf_spectacular.utils import extend_schema
 from django.contrib.auth import authenticate
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from .models import User
 from .serializers import LoginSerializer, UserSerializer
+from .tokens import RefreshToken, token_backend
 
 
 @extend_schema(
@@ -92,6 +95,15 @@ def refresh_view(request):
             return Response({'error': 'Refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         token = RefreshToken(refresh_token)
-        return Response({'access': str(token.access_token)})
+        user = User.objects.get(pk=token['user_id'], is_active=True)
+        return Response({'access': str(token.access_token_for(user))})
     except Exception as e:
         return Response({'error': 'Token không hợp lệ'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@require_GET
+def jwks_view(request):
+    """Public keys verifying access tokens (JWKS), fetched and cached by the other services"""
+    response = JsonResponse(token_backend().loader.get().jwks())
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
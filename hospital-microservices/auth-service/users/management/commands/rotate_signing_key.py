@@ -0,0 +1,40 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from service_auth.keys import generate_key
+
+
+class Command(BaseCommand):
+    help = 'Create a new RS256 signing key in JWT_KEYS_DIR; it signs new tokens, older keys keep verifying'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-missing', action='store_true', help='Only create a key if the directory has none')
+        parser.add_argument(
+            '--keep', type=int, default=3,
+            help='Keep this many newest keys, delete older ones (tokens they signed stop verifying)',
+        )
+
+    def handle(self, *args, **options):
+        if options['keep'] < 1:
+            raise CommandError('--keep must be positive')
+        directory = str(settings.JWT_KEYS_DIR)
+        existing = sorted(
+            name[:-4] for name in (os.listdir(directory) if os.path.isdir(directory) else []) if name.endswith('.pem')
+        )
+        if options['if_missing'] and existing:
+            self.stdout.write(f'Signing key present ({existing[-1]})')
+            return
+
+        kid = timezone.now().strftime('%Y%m%d%H%M%S')
+        if kid in existing:
+            raise CommandError(f'Key {kid} already exists, retry in a second')
+        generate_key(directory, kid)
+        keys = existing + [kid]
+        for old in keys[:-options['keep']]:
+            os.remove(os.path.join(directory, f'{old}.pem'))
+            self.stdout.write(f'Removed key {old}')
+        self.stdout.write(f'Created signing key {kid}')
+        if settings.JWT_ACTIVE_KID:
+            self.stdout.write(f'JWT_ACTIVE_KID={settings.JWT_ACTIVE_KID} still selects the signing key')
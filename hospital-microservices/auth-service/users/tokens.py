@@ -0,0 +1,84 @@
+"""
+Access/refresh tokens signed with the active key of the key set
+(``JWT_KEYS_DIR``), with the key id in the ``kid`` header and the user's
+role/permission claims (``roles.authz``).
+"""
+import jwt
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from service_auth.keys import ALGORITHM, KeySetLoader
+
+from roles.authz import authz_claims
+
+
+class KeySetTokenBackend(TokenBackend):
+    def __init__(self, loader, issuer=None, leeway=0):
+        super().__init__(ALGORITHM, issuer=issuer, leeway=leeway)
+        self.loader = loader
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+        keyset = self.loader.get()
+        return jwt.encode(
+            jwt_payload, keyset.signing_key, algorithm=self.algorithm,
+            headers={'kid': keyset.active_kid},
+        )
+
+    def get_verifying_key(self, token):
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError as exc:
+            raise TokenBackendError(_('Token is invalid')) from exc
+        key = self.loader.get().public_key(kid)
+        if key is None:
+            raise TokenBackendError(_('Token is invalid'))
+        return key
+
+
+_backend = None
+
+
+def token_backend():
+    global _backend
+    if _backend is None:
+        _backend = KeySetTokenBackend(
+            KeySetLoader(str(settings.JWT_KEYS_DIR), settings.JWT_ACTIVE_KID),
+            issuer=settings.JWT_ISSUER,
+        )
+    return _backend
+
+
+class KeySetTokenMixin:
+    @property
+    def token_backend(self):
+        return token_backend()
+
+    def get_token_backend(self):
+        return token_backend()
+
+
+class AccessToken(KeySetTokenMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(KeySetTokenMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in authz_claims(user).items():
+            token[claim] = value
+        return token
+
+    def access_token_for(self, user):
+        """New access token with ``user``'s current roles (they may have changed since login)."""
+        access = self.access_token
+        for claim, value in authz_claims(user).items():
+            access[claim] = value
+        return access
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet
-from .auth_views import login_view, logout_view, refresh_view
+from .auth_views import jwks_view, login_view, logout_view, refresh_view
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -11,4 +11,5 @@ urlpatterns = [
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
     path('refresh/', refresh_view, name='refresh'),
+    path('jwks/', jwks_view, name='jwks'),
 ]
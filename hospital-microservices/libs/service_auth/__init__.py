@@ -0,0 +1,22 @@
+"""
+Authentication contract between auth-service and the other services.
+
+auth-service signs access tokens with RS256; the key id is in the ``kid``
+header and the public keys are published as a key set (JWKS) at
+``/api/auth/jwks/``. Besides ``user_id`` a token carries (``claims``):
+
+- ``roles``: the user's active role names;
+- ``perm_digest``: a short hash of the user's permission set
+  (``RESOURCE:ACTION`` strings);
+- ``authz_ver``: version of this claims contract.
+
+A downstream service verifies tokens locally with the cached key set
+(``authentication.ServiceJWTAuthentication``, settings from
+``settings.simple_jwt``) and authorizes from the claims
+(``permissions.HasPermission``). Permission sets are cached by digest
+(``permission_sets``): users with the same roles share one entry, and
+auth-service is asked only when a digest has not been seen yet.
+
+The package lives in ``hospital-microservices/libs`` and is put on the
+path by each service's settings (``/app/libs`` in the images).
+"""
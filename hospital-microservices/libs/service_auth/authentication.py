@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.authentication import JWTTokenUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .claims import CLAIMS_VERSION, VERSION_CLAIM
+
+
+class ServiceJWTAuthentication(JWTTokenUserAuthentication):
+    """
+    Verifies access tokens against auth-service's key set and returns a
+    ``ServiceUser`` (``TOKEN_USER_CLASS``) without touching the database.
+    """
+
+    def get_user(self, validated_token):
+        if validated_token.get(VERSION_CLAIM) != CLAIMS_VERSION:
+            raise InvalidToken('Token không theo hợp đồng phân quyền hiện tại, vui lòng đăng nhập lại')
+        return super().get_user(validated_token)
@@ -0,0 +1,14 @@
+"""Claim names and the permission digest shared by issuer and verifiers."""
+import hashlib
+
+CLAIMS_VERSION = 1
+
+ROLES_CLAIM = 'roles'
+DIGEST_CLAIM = 'perm_digest'
+VERSION_CLAIM = 'authz_ver'
+
+
+def permission_digest(permissions):
+    """Short, order-independent hash of a set of ``RESOURCE:ACTION`` strings."""
+    canonical = '\n'.join(sorted(set(permissions)))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
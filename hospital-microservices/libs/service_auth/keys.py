@@ -0,0 +1,89 @@
+"""
+RS256 signing keys of auth-service and the key set (JWKS) it publishes.
+
+Keys are PEM files named ``<kid>.pem`` in one directory. The active key
+signs new tokens: ``active_kid`` if given, otherwise the greatest kid
+(``generate_key`` names keys by creation time). Every key in the directory
+is published, so tokens signed before a rotation keep verifying until the
+retired key file is removed.
+"""
+import json
+import os
+import threading
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+ALGORITHM = 'RS256'
+
+
+class KeySet:
+    def __init__(self, private_keys, active_kid=None):
+        if not private_keys:
+            raise ValueError('Key set is empty')
+        self.private_keys = private_keys  # kid -> private key
+        self.active_kid = active_kid or max(private_keys)
+        if self.active_kid not in private_keys:
+            raise ValueError(f'Active key {self.active_kid!r} is not in the key set')
+
+    @classmethod
+    def from_directory(cls, directory, active_kid=None):
+        keys = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.pem'):
+                with open(os.path.join(directory, name), 'rb') as handle:
+                    keys[name[:-4]] = serialization.load_pem_private_key(handle.read(), password=None)
+        return cls(keys, active_kid)
+
+    @property
+    def signing_key(self):
+        return self.private_keys[self.active_kid]
+
+    def public_key(self, kid):
+        private_key = self.private_keys.get(kid)
+        return private_key.public_key() if private_key is not None else None
+
+    def jwks(self):
+        """The public key set document (RFC 7517)."""
+        keys = []
+        for kid, private_key in sorted(self.private_keys.items()):
+            jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+            jwk.update({'kid': kid, 'alg': ALGORITHM, 'use': 'sig'})
+            keys.append(jwk)
+        return {'keys': keys}
+
+
+def generate_key(directory, kid):
+    """Write a new 2048-bit RSA private key as ``<directory>/<kid>.pem``."""
+    os.makedirs(directory, exist_ok=True)
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, f'{kid}.pem')
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ))
+    return path
+
+
+class KeySetLoader:
+    """Loads the key set of a directory and reloads it after a rotation (directory mtime)."""
+
+    def __init__(self, directory, active_kid=None):
+        self.directory = directory
+        self.active_kid = active_kid
+        self._keyset = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        mtime = os.stat(self.directory).st_mtime_ns
+        if self._keyset is None or mtime != self._mtime:
+            with self._lock:
+                if self._keyset is None or mtime != self._mtime:
+                    self._keyset = KeySet.from_directory(self.directory, self.active_kid)
+                    self._mtime = mtime
+        return self._keyset
@@ -0,0 +1,106 @@
+"""
+Permission sets cached by digest.
+
+Tokens carry ``perm_digest`` instead of the permissions themselves. The set
+behind a digest never changes (the digest is a hash of its content), so a
+service caches it for as long as it has room and asks auth-service
+(``GET /api/auth/permission-sets/?roles=...``, forwarding the caller's
+token) only for digests it has not seen.
+
+If the roles' permissions changed after the token was issued, auth-service
+answers with the current set and digest. The current set is used and cached
+under its own digest; the token's outdated digest maps to it for
+``SERVICE_AUTH_STALE_DIGEST_TTL`` seconds, so a token used until it expires
+does not ask again on every request.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .claims import permission_digest
+
+
+class PermissionSetUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Không kiểm tra được quyền: auth-service không phản hồi'
+    default_code = 'permission_set_unavailable'
+
+
+class PermissionSetCache:
+    def __init__(self, size=256, stale_ttl=60):
+        self.size = size
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()  # digest -> (permissions, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            permissions, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return permissions
+
+    def _put(self, digest, permissions, ttl=None):
+        with self._lock:
+            self._entries[digest] = (permissions, None if ttl is None else time.monotonic() + ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get(self, digest, roles, authorization):
+        """Permission set of a token with ``digest`` and ``roles``."""
+        permissions = self._get(digest)
+        if permissions is not None:
+            return permissions
+        permissions, current = fetch(roles, authorization)
+        self._put(current, permissions)
+        if current != digest:
+            self._put(digest, permissions, self.stale_ttl)
+        return permissions
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def fetch(roles, authorization):
+    """``(permissions, digest)`` of ``roles`` from auth-service."""
+    url = settings.AUTH_SERVICE_URL.rstrip('/') + '/api/auth/permission-sets/'
+    try:
+        response = requests.get(
+            url,
+            params={'roles': ','.join(roles)},
+            headers={'Authorization': authorization},
+            timeout=getattr(settings, 'SERVICE_AUTH_TIMEOUT', 3),
+        )
+        response.raise_for_status()
+        data = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        raise PermissionSetUnavailable() from exc
+    permissions = frozenset(data.get('permissions', ()))
+    if permission_digest(permissions) != data.get('digest'):
+        raise PermissionSetUnavailable('auth-service trả về tập quyền không khớp digest')
+    return permissions, data['digest']
+
+
+_cache = None
+
+
+def cache():
+    global _cache
+    if _cache is None:
+        _cache = PermissionSetCache(
+            size=getattr(settings, 'SERVICE_AUTH_PERMISSION_CACHE_SIZE', 256),
+            stale_ttl=getattr(settings, 'SERVICE_AUTH_STALE_DIGEST_TTL', 60),
+        )
+    return _cache
@@ -0,0 +1,22 @@
+from rest_framework.permissions import BasePermission
+
+
+class HasPermission(BasePermission):
+    """
+    Checks ``view.required_permissions`` (``RESOURCE:ACTION``) against the
+    permission set of the token, looked up by digest.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        if user.is_superuser:
+            return True
+
+        required_permissions = getattr(view, 'required_permissions', [])
+        if not required_permissions:
+            return True
+
+        return user.has_perms(required_permissions)
@@ -0,0 +1,19 @@
+"""Settings helpers for services that verify auth-service tokens."""
+import os
+
+
+def simple_jwt(auth_service_url, issuer=None, leeway=0):
+    """``SIMPLE_JWT`` for local verification against auth-service's published key set."""
+    return {
+        'ALGORITHM': 'RS256',
+        'SIGNING_KEY': None,
+        'VERIFYING_KEY': None,
+        'JWK_URL': auth_service_url.rstrip('/') + '/api/auth/jwks/',
+        'ISSUER': issuer or os.getenv('JWT_ISSUER', 'hospital-auth'),
+        'LEEWAY': leeway,
+        'AUTH_HEADER_TYPES': ('Bearer',),
+        'USER_ID_CLAIM': 'user_id',
+        'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+        'TOKEN_TYPE_CLAIM': 'token_type',
+        'TOKEN_USER_CLASS': 'service_auth.user.ServiceUser',
+    }
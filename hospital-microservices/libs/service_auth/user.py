@@ -0,0 +1,36 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+
+from . import permission_sets
+from .claims import DIGEST_CLAIM, ROLES_CLAIM
+
+
+class ServiceUser(TokenUser):
+    """User built from a verified access token; no database or network access until a permission check."""
+
+    @cached_property
+    def roles(self):
+        return tuple(self.token.get(ROLES_CLAIM, ()))
+
+    @cached_property
+    def permission_digest(self):
+        return self.token.get(DIGEST_CLAIM, '')
+
+    def has_role(self, *names):
+        return any(name in self.roles for name in names)
+
+    def get_all_permissions(self, obj=None):
+        """``RESOURCE:ACTION`` strings granted by the user's roles."""
+        if not self.roles:
+            return frozenset()
+        raw = self.token.token
+        if isinstance(raw, bytes):
+            # JWTAuthentication keeps the raw header value as bytes
+            raw = raw.decode()
+        return permission_sets.cache().get(self.permission_digest, self.roles, f'Bearer {raw}')
+
+    def has_perm(self, perm, obj=None):
+        return self.is_superuser or perm in self.get_all_permissions()
+
+    def has_perms(self, perm_list, obj=None):
+        return self.is_superuser or set(perm_list) <= self.get_all_permissions()
@@ -1,9 +1,14 @@
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Shared libraries (hospital-microservices/libs, /app/libs in the image)
+LIBS_DIR = BASE_DIR / 'libs' if (BASE_DIR / 'libs').is_dir() else BASE_DIR.parent / 'libs'
+sys.path.insert(0, str(LIBS_DIR))
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'django-insecure-change-me-in-production')
 
@@ -104,7 +109,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'service_auth.authentication.ServiceJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -116,6 +121,12 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# JWT: verified locally against auth-service's key set, authorization from
+# the token's role/permission claims (service_auth)
+from service_auth.settings import simple_jwt
+AUTH_SERVICE_URL = os.getenv('AUTH_SERVICE_URL', 'http://localhost:8001')
+SIMPLE_JWT = simple_jwt(AUTH_SERVICE_URL)
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Hospital Prescriptions Service API',
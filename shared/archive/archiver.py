@@ -0,0 +1,82 @@
+"""
+Move rows past their retention window from the hot table to the archive.
+
+Each batch of at most ``batch_size`` rows, oldest first:
+
+1. write the rows to partition files, listed in the manifest as ``pending``;
+2. delete exactly those rows from the hot table in one transaction;
+3. mark the partitions ``committed``.
+
+A run interrupted between the steps is repaired by ``recover()`` at the start
+of the next one: a pending partition whose rows are still in the hot table is
+discarded (they will be archived again), one whose rows are gone is
+committed. A row is therefore always in the hot table, the archive, or both
+for the length of one batch, never in neither.
+
+Small batches keep each delete transaction (and the locks it holds) short;
+``pause`` spaces them out further on a busy database.
+"""
+import logging
+import time
+import uuid
+
+from django.db import transaction
+
+from .storage import PENDING, PartitionStore
+
+logger = logging.getLogger(__name__)
+
+
+def columns(spec):
+    return [field.attname for field in spec.model._meta.concrete_fields]
+
+
+def recover(spec, store):
+    """Settle the partitions a previous run left ``pending``; returns how many."""
+    pending = store.partitions(states=(PENDING,))
+    pk_name = spec.model._meta.pk.attname
+    for entry in pending:
+        pks = [row[pk_name] for row in store.rows(entry)]
+        if spec.hot().filter(pk__in=pks).exists():
+            store.discard([entry])
+            logger.warning('Archive %s: discarded unfinished partition %s', spec.name, entry['file'])
+        else:
+            store.commit([entry])
+    return len(pending)
+
+
+def archive(spec, batch_size=1000, max_batches=None, dry_run=False, pause=0, now=None):
+    """
+    Archive ``spec``'s rows older than its retention window.
+
+    Returns the number of rows moved (or that would be, with ``dry_run``).
+    """
+    cutoff = spec.cutoff(now)
+    if dry_run:
+        return spec.due(cutoff).count()
+
+    store = PartitionStore(spec.name)
+    pk_name = spec.model._meta.pk.attname
+    fields = columns(spec)
+    moved = batches = 0
+
+    with store.lock():
+        recover(spec, store)
+        while max_batches is None or batches < max_batches:
+            rows = list(
+                spec.due(cutoff).order_by(spec.date_field, 'pk').values(*fields)[:batch_size]
+            )
+            if not rows:
+                break
+
+            entries = store.write(rows, spec.date_field, uuid.uuid4().hex[:12])
+            with transaction.atomic():
+                spec.hot().filter(pk__in=[row[pk_name] for row in rows]).delete()
+            store.commit(entries)
+
+            moved += len(rows)
+            batches += 1
+            logger.info('Archive %s: moved %d rows (%d total)', spec.name, len(rows), moved)
+            if pause:
+                time.sleep(pause)
+    return moved
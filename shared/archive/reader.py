@@ -0,0 +1,95 @@
+"""
+Read archived rows together with the hot table.
+
+    rows = reader.read('audit_logs', start, end, filters={'user_id_backup': '42'})
+
+Returns plain dicts (column ``attname`` -> value, dates as ``datetime``)
+for ``start <= date < end``, oldest first, from the hot table and every
+partition overlapping the range: callers do not need to know
+whether a row has been archived yet. Only the partitions of the range are
+opened, so a narrow range over a long archive stays cheap.
+
+Every source is already in ``(date, pk)`` order (the archiver writes its
+batches that way), so they are merged lazily: with ``limit`` the hot query is
+limited too and partitions are read only as far as the merge needs them.
+"""
+import heapq
+import uuid
+from itertools import islice
+
+from django.utils.dateparse import parse_datetime
+
+from . import registry
+from .archiver import columns
+from .storage import COMMITTED, PENDING, PartitionStore
+
+
+def _matches(row, filters):
+    return all(str(row.get(key)) == str(value) for key, value in filters.items())
+
+
+def _partition_rows(spec, store, entry, start, end, filters, skip=frozenset()):
+    pk_name = spec.model._meta.pk.attname
+    try:
+        for row in store.rows(entry):
+            if skip and str(row[pk_name]) in skip:
+                continue
+            row[spec.date_field] = parse_datetime(row[spec.date_field])
+            if start <= row[spec.date_field] < end and _matches(row, filters):
+                yield row
+    except FileNotFoundError:
+        # A pending partition discarded by the archiver: its rows are hot.
+        return
+
+
+def _still_hot(spec, store, entries):
+    """Keys of the rows of pending ``entries`` that are still in the hot table (at most a batch)."""
+    pk_name = spec.model._meta.pk.attname
+    archived = set()
+    for entry in entries:
+        if entry['state'] == PENDING:
+            try:
+                archived.update(row[pk_name] for row in store.rows(entry))
+            except FileNotFoundError:
+                continue
+    if not archived:
+        return frozenset()
+    return frozenset(str(pk) for pk in spec.hot().filter(pk__in=archived).values_list('pk', flat=True))
+
+
+def read_archive(spec, start, end, filters=None):
+    """One iterator per partition of the range, each in ``(date, pk)`` order."""
+    store = PartitionStore(spec.name)
+    entries = store.partitions(start, end, states=(PENDING, COMMITTED))
+    # A row is in both for the length of one batch; the hot copy wins.
+    skip = _still_hot(spec, store, entries)
+    return [_partition_rows(spec, store, entry, start, end, filters or {}, skip) for entry in entries]
+
+
+def read_hot(spec, start, end, filters=None, limit=None):
+    queryset = spec.hot().filter(**{
+        f'{spec.date_field}__gte': start,
+        f'{spec.date_field}__lt': end,
+    })
+    if filters:
+        queryset = queryset.filter(**filters)
+    queryset = queryset.order_by(spec.date_field, 'pk').values(*columns(spec))
+    return queryset[:limit] if limit is not None else queryset.iterator()
+
+
+def _pk_key(value):
+    # UUID keys are str in the partitions
+    return str(value) if isinstance(value, uuid.UUID) else value
+
+
+def read(name, start, end, filters=None, limit=None):
+    """Rows of archive ``name`` dated in ``[start, end)``, hot and archived."""
+    if limit is not None and limit < 1:
+        raise ValueError('limit must be positive')
+    spec = registry.get(name)
+    pk_name = spec.model._meta.pk.attname
+    merged = heapq.merge(
+        read_hot(spec, start, end, filters, limit), *read_archive(spec, start, end, filters),
+        key=lambda row: (row[spec.date_field], _pk_key(row[pk_name])),
+    )
+    return list(islice(merged, limit))
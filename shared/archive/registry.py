@@ -0,0 +1,67 @@
+"""
+Tables whose old rows are moved to the archive (``shared.archive``).
+
+Apps declare them in ``ready()``::
+
+    registry.register('audit_logs', AuditLog, 'timestamp', retention_days=90)
+
+``retention_days`` is the default; ``ARCHIVE_RETENTION_DAYS['audit_logs']``
+overrides it. ``eligible`` narrows the rows that may leave the hot table (e.g.
+only finished transactions), ``exclude`` keeps rows the application still
+reads no matter how old they are. ``filter_fields`` are the columns the
+read API accepts as exact-match query parameters.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class ArchiveSpec:
+    def __init__(self, name, model, date_field, retention_days, eligible=None, exclude=None,
+                 filter_fields=()):
+        self.name = name
+        self.model = model
+        self.date_field = date_field
+        self.default_retention_days = retention_days
+        self.eligible = eligible
+        self.exclude = exclude
+        self.filter_fields = tuple(filter_fields)
+
+    @property
+    def retention_days(self):
+        overrides = getattr(settings, 'ARCHIVE_RETENTION_DAYS', {}) or {}
+        return int(overrides.get(self.name, self.default_retention_days))
+
+    def cutoff(self, now=None):
+        """Rows dated before this instant are due for archiving."""
+        return (now or timezone.now()) - timedelta(days=self.retention_days)
+
+    def due(self, cutoff):
+        """Hot rows older than ``cutoff`` that may be archived."""
+        queryset = self.model._base_manager.filter(**{f'{self.date_field}__lt': cutoff})
+        if self.eligible is not None:
+            queryset = queryset.filter(self.eligible)
+        if self.exclude is not None:
+            queryset = queryset.exclude(self.exclude)
+        return queryset
+
+    def hot(self):
+        return self.model._base_manager.all()
+
+
+_specs = {}
+
+
+def register(name, model, date_field, retention_days, eligible=None, exclude=None, filter_fields=()):
+    _specs[name] = ArchiveSpec(name, model, date_field, retention_days, eligible, exclude, filter_fields)
+    return _specs[name]
+
+
+def get(name):
+    """The spec registered as ``name``; ``KeyError`` if there is none."""
+    return _specs[name]
+
+
+def names():
+    return sorted(_specs)
@@ -0,0 +1,176 @@
+"""
+Archive partitions on disk.
+
+    ARCHIVE_ROOT/<name>/manifest.json
+    ARCHIVE_ROOT/<name>/<YYYY-MM-DD>/<batch>.jsonl.gz
+
+One gzip'd JSON-lines file per archived batch and local day, a row per line
+(column ``attname`` -> value). Files are never modified once written; the
+manifest lists them with their day, first/last timestamp, row count, SHA-256
+and state:
+
+- ``pending``: written, the rows may still be in the hot table;
+- ``committed``: the rows were deleted from the hot table, the file is the
+  only copy.
+
+The manifest is rewritten atomically (temp file + ``os.replace``), and one
+archiver per table at a time holds ``.lock``.
+"""
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+PENDING = 'pending'
+COMMITTED = 'committed'
+
+
+def archive_root():
+    return str(getattr(settings, 'ARCHIVE_ROOT', os.path.join(settings.BASE_DIR, 'archive')))
+
+
+def partition_day(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    return value
+
+
+class PartitionStore:
+    def __init__(self, name, root=None):
+        self.name = name
+        self.path = os.path.join(root or archive_root(), name)
+        self.manifest_path = os.path.join(self.path, 'manifest.json')
+
+    @contextmanager
+    def lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, '.lock'), 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    # Manifest
+
+    def manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {'name': self.name, 'partitions': []}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=1)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _set_state(self, files, state):
+        manifest = self.manifest()
+        files = set(files)
+        if state is None:
+            manifest['partitions'] = [p for p in manifest['partitions'] if p['file'] not in files]
+        else:
+            for partition in manifest['partitions']:
+                if partition['file'] in files:
+                    partition['state'] = state
+        self._save_manifest(manifest)
+
+    def partitions(self, start=None, end=None, states=(COMMITTED,)):
+        """Manifest entries overlapping ``[start, end)``."""
+        result = []
+        for partition in self.manifest()['partitions']:
+            if partition['state'] not in states:
+                continue
+            if start is not None and _as_datetime(partition['max']) < start:
+                continue
+            if end is not None and _as_datetime(partition['min']) >= end:
+                continue
+            result.append(partition)
+        return result
+
+    # Files
+
+    def write(self, rows, date_field, batch_id):
+        """
+        Write ``rows`` (ordered by ``date_field``) as ``pending`` partitions,
+        one file per local day, and return their manifest entries.
+        """
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(partition_day(row[date_field]), []).append(row)
+
+        entries = []
+        for day, day_rows in by_day.items():
+            relative = os.path.join(day.isoformat(), f'{batch_id}.jsonl.gz')
+            full_path = os.path.join(self.path, relative)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with gzip.open(full_path, 'wt', encoding='utf-8') as handle:
+                for row in day_rows:
+                    handle.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':')))
+                    handle.write('\n')
+            entries.append({
+                'file': relative,
+                'date': day.isoformat(),
+                'min': day_rows[0][date_field].isoformat(),
+                'max': day_rows[-1][date_field].isoformat(),
+                'rows': len(day_rows),
+                'sha256': self._checksum(full_path),
+                'state': PENDING,
+            })
+
+        manifest = self.manifest()
+        manifest['partitions'].extend(entries)
+        self._save_manifest(manifest)
+        return entries
+
+    def commit(self, entries):
+        self._set_state([entry['file'] for entry in entries], COMMITTED)
+
+    def discard(self, entries):
+        for entry in entries:
+            try:
+                os.remove(os.path.join(self.path, entry['file']))
+            except FileNotFoundError:
+                pass
+        self._set_state([entry['file'] for entry in entries], None)
+
+    def rows(self, entry):
+        with gzip.open(os.path.join(self.path, entry['file']), 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                yield json.loads(line)
+
+    def verify(self, entry):
+        """True if the file is present and matches its manifest checksum."""
+        try:
+            return self._checksum(os.path.join(self.path, entry['file'])) == entry['sha256']
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _checksum(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1 << 16), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,76 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from shared.permissions.base_permissions import HasPermission
+
+from . import reader, registry
+
+MAX_LIMIT = 1000
+
+
+def _parse_bound(value):
+    """``YYYY-MM-DD`` (local midnight) or an ISO datetime; ``None`` if invalid."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@api_view(['GET'])
+@permission_classes([HasPermission])
+def archive_view(request, name):
+    """
+    Rows of an archived table for ``[start, end)``, hot and archived alike.
+
+    ``?start=2025-01-01&end=2025-02-01`` (dates or ISO datetimes, at most 31
+    days apart), ``limit`` (default and max 1000) and the table's filter
+    columns as exact matches.
+    """
+    try:
+        spec = registry.get(name)
+    except KeyError:
+        return Response({'error': 'Không tìm thấy bảng lưu trữ'}, status=status.HTTP_404_NOT_FOUND)
+
+    start = _parse_bound(request.query_params.get('start', ''))
+    end = _parse_bound(request.query_params.get('end', ''))
+    if start is None or end is None or start >= end:
+        return Response(
+            {'error': 'Cần start và end hợp lệ (start < end)'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if end - start > timedelta(days=31):
+        return Response({'error': 'Khoảng thời gian tối đa 31 ngày'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(int(request.query_params.get('limit', MAX_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return Response({'error': 'limit phải là số nguyên dương'}, status=status.HTTP_400_BAD_REQUEST)
+
+    filters = {
+        field: request.query_params[field]
+        for field in spec.filter_fields
+        if field in request.query_params
+    }
+    rows = reader.read(name, start, end, filters=filters, limit=limit + 1)
+    return Response({
+        'name': name,
+        'start': start,
+        'end': end,
+        'truncated': len(rows) > limit,
+        'results': rows[:limit],
+    })
+
+
+archive_view.cls.required_permissions = ['SYSTEM:READ']
@@ -0,0 +1,178 @@
+"""
+Refresh-token blacklist (``rest_framework_simplejwt.token_blacklist``)
+without a query per refresh, and batched compaction of its tables.
+
+    if blacklist.is_blacklisted(jti): ...
+    blacklist.compact(batch_size=1000)     # manage.py compact_token_blacklist
+
+Every process keeps a Bloom filter (``shared.utils.bloom``) of the jtis that
+are blacklisted and not yet expired. A jti the filter has never seen is
+certainly not blacklisted: the common case, a valid refresh token, costs one
+read of the blacklist version from the shared cache and no query. A filter
+hit (a blacklisted token, or ~1% false positives) is confirmed in the
+database.
+
+Blacklisting a token (rotation, logout) writes a new random version to
+``CACHES['default']`` on commit. A process that sees a new version, or whose
+filter is older than ``JWT_BLACKLIST_SYNC_SECONDS``, adds the rows
+blacklisted since its last sync to its filter. The window starts
+``JWT_BLACKLIST_SYNC_OVERLAP_SECONDS`` before that sync, so rows whose
+transaction committed after it (``blacklisted_at`` is set before the commit,
+and ids are not committed in order) are still read. With several
+workers and a per-process cache (locmem), a token blacklisted by another
+worker is caught after at most ``JWT_BLACKLIST_SYNC_SECONDS``; a shared
+cache (redis, memcached) makes it immediate. The filter is rebuilt from the
+live rows when it fills up, which also drops expired tokens from it.
+
+With ``ROTATE_REFRESH_TOKENS`` and ``BLACKLIST_AFTER_ROTATION`` every refresh
+adds an outstanding token and a blacklist row. ``compact()`` deletes expired
+outstanding tokens together with their blacklist rows, one short
+transaction per batch; run it periodically (cron).
+"""
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from shared.utils.bloom import BloomFilter
+
+VERSION_KEY = 'jwt-blacklist:version'
+ERROR_RATE = 0.01
+MIN_CAPACITY = 10000
+
+
+def _sync_seconds():
+    return getattr(settings, 'JWT_BLACKLIST_SYNC_SECONDS', 5.0)
+
+
+def _sync_overlap():
+    return timedelta(seconds=getattr(settings, 'JWT_BLACKLIST_SYNC_OVERLAP_SECONDS', 60.0))
+
+
+class BlacklistIndex:
+    def __init__(self):
+        self.filter = None
+        self.version = None
+        self.loaded_at = None
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def _fresh(self, version):
+        return (
+            self.filter is not None
+            and version is not None
+            and version == self.version
+            and time.monotonic() - self.synced_at < _sync_seconds()
+        )
+
+    def sync(self):
+        # Version read before the rows: a blacklisting committed after this
+        # read changes the version again and is picked up by the next sync.
+        version = cache.get(VERSION_KEY)
+        if self._fresh(version):
+            return
+        with self.lock:
+            if self._fresh(version):
+                return
+            if version is None:
+                cache.add(VERSION_KEY, uuid.uuid4().hex[:12], None)
+                version = cache.get(VERSION_KEY)
+            # Taken before the rows are read: the next sync re-reads from here
+            started = timezone.now()
+            if self.filter is None or self.filter.is_full:
+                self._rebuild()
+            else:
+                self._load(BlacklistedToken.objects.filter(blacklisted_at__gte=self.loaded_at - _sync_overlap()))
+            self.loaded_at = started
+            self.version = version
+            self.synced_at = time.monotonic()
+
+    def _live(self):
+        # Expired tokens fail verification anyway: leave them out of the filter
+        return BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+
+    def _rebuild(self):
+        live = self._live()
+        self.filter = BloomFilter(max(MIN_CAPACITY, 2 * live.count()), ERROR_RATE)
+        self._load(live)
+
+    def _load(self, queryset):
+        for jti in queryset.order_by().values_list('token__jti', flat=True).iterator(chunk_size=5000):
+            self.filter.add(jti)
+
+    def contains(self, jti):
+        self.sync()
+        if jti not in self.filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def reset(self):
+        with self.lock:
+            self.filter = None
+
+
+index = BlacklistIndex()
+
+
+def is_blacklisted(jti):
+    return index.contains(jti)
+
+
+def invalidate():
+    """Tell every process to pull new blacklist rows on its next check."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex[:12], None)
+
+
+def _on_blacklisted(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(invalidate)
+
+
+post_save.connect(_on_blacklisted, sender=BlacklistedToken, dispatch_uid='jwt-blacklist:save')
+
+
+def expired_count(now=None):
+    return OutstandingToken.objects.filter(expires_at__lte=now or timezone.now()).count()
+
+
+def compact(batch_size=1000, max_batches=None, pause=0, now=None):
+    """
+    Delete expired outstanding tokens and their blacklist rows in batches.
+    Returns ``(outstanding, blacklisted)`` deleted.
+
+    ``expires_at`` has no index, so the tokens are walked in primary-key
+    order. Refresh tokens all get the same lifetime, so expiry follows the
+    key: the walk stops at the first batch without an expired token.
+    """
+    now = now or timezone.now()
+    last_id = 0
+    batches = 0
+    outstanding = blacklisted = 0
+    while max_batches is None or batches < max_batches:
+        rows = list(
+            OutstandingToken.objects.filter(id__gt=last_id)
+            .order_by('id').values_list('id', 'expires_at')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        expired = [pk for pk, expires_at in rows if expires_at <= now]
+        if not expired:
+            break
+        with transaction.atomic():
+            _, deleted = OutstandingToken.objects.filter(id__in=expired).delete()
+        outstanding += deleted.get(OutstandingToken._meta.label, 0)
+        blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+        batches += 1
+        if pause:
+            time.sleep(pause)
+    if outstanding:
+        index.reset()
+    return outstanding, blacklisted
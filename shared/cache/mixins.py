@@ -0,0 +1,100 @@
+"""
+``list`` / ``retrieve`` served from the reference-data cache.
+
+    class DepartmentViewSet(ReferenceCacheMixin, ConditionalGetMixin, ModelViewSet):
+        reference_cache = 'departments'
+
+The cached entry is the response data plus its validators, keyed by the full
+request URL (page, filters, ``?fields=``) and serializer class, so a hit costs
+no queries and still answers ``If-None-Match`` / ``If-Modified-Since`` with 304.
+Put the mixin first: on a miss it stores whatever the rest of the view
+(``ConditionalGetMixin`` included) produced. Views without their own ETag get
+one hashed from the data.
+
+Permission checks run before the cache is consulted. Only cache views whose
+output does not depend on the requesting user; invalidation is declared with
+``shared.cache.reference.register()`` in the app's ``ready()``.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from . import reference
+
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+class ReferenceCacheMixin:
+    reference_cache = None
+    reference_cache_actions = ('list', 'retrieve')
+
+    def get_reference_cache_key(self, request):
+        serializer_class = self.get_serializer_class()
+        key = repr((
+            self.action,
+            request.build_absolute_uri(),
+            f'{serializer_class.__module__}.{serializer_class.__qualname__}',
+        ))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _build_entry(self, handler, request, *args, **kwargs):
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200 or getattr(response, 'data', None) is None:
+            return None, response
+        # Plain JSON types: no serializer backlinks kept alive in the local tier.
+        encoded = json.dumps(response.data, cls=DjangoJSONEncoder)
+        etag = response.get('ETag') or 'W/"%s"' % hashlib.sha1(encoded.encode()).hexdigest()
+        entry = {
+            'data': json.loads(encoded),
+            'etag': etag,
+            'last_modified': response.get('Last-Modified'),
+        }
+        return entry, response
+
+    def _cached(self, handler, request, *args, **kwargs):
+        if not self.reference_cache or self.action not in self.reference_cache_actions:
+            return handler(request, *args, **kwargs)
+
+        uncached = []
+
+        def compute():
+            # Fill the cache with a full response even for conditional requests;
+            # they are answered from the cached validators below.
+            conditional = {key: request.META.pop(key) for key in CONDITIONAL_HEADERS if key in request.META}
+            try:
+                entry, response = self._build_entry(handler, request, *args, **kwargs)
+            finally:
+                request.META.update(conditional)
+            if entry is None:
+                uncached.append(response)
+                raise _NotCacheable
+            return entry
+
+        try:
+            entry = reference.get_or_set(self.reference_cache, self.get_reference_cache_key(request), compute)
+        except _NotCacheable:
+            return uncached[0]
+
+        last_modified = parse_http_date_safe(entry['last_modified']) if entry['last_modified'] else None
+        response = get_conditional_response(request, etag=entry['etag'], last_modified=last_modified)
+        if response is None:
+            response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        if entry['last_modified']:
+            response['Last-Modified'] = entry['last_modified']
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+
+class _NotCacheable(Exception):
+    """Raised out of ``compute()`` so error responses are passed through uncached."""
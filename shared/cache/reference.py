@@ -0,0 +1,125 @@
+"""
+Two-tier cache for small, rarely changing reference data (departments,
+doctors, roles, permissions).
+
+    local LRU (per process)  ->  shared cache (CACHES['default'])  ->  compute
+
+Entries live in namespaces. Every key carries the namespace's current version
+(``ref:departments:<version>:<key>``), and changing a model registered for the
+namespace writes a new version to the shared cache on commit, so old entries
+are never read again and simply expire. Nothing has to enumerate or delete them.
+
+    reference.register('departments', Department, DoctorProfile)
+    data = reference.get_or_set('departments', key, lambda: build(...))
+
+The version itself is cached in the local tier for ``REFERENCE_CACHE_LOCAL_TTL``
+seconds: a steady-state read touches neither the database nor the shared cache,
+and a change made by another worker is visible here after at most that long.
+Changes made by this process are visible immediately. Writes made with
+``QuerySet.update()`` / ``bulk_create()`` send no signals; call
+``invalidate()`` after them.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from shared.metrics.instruments import record_cache_lookup
+
+from .lru import LocalLRU
+
+PREFIX = 'ref'
+_MISSING = object()
+
+_local = None
+_registry = {}  # model -> set of namespaces
+_ignored_fields = {}  # model -> fields whose saves don't invalidate
+
+
+def _settings():
+    return (
+        getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 3600),
+        getattr(settings, 'REFERENCE_CACHE_LOCAL_TTL', 5.0),
+    )
+
+
+def local_cache():
+    global _local
+    if _local is None:
+        _local = LocalLRU(getattr(settings, 'REFERENCE_CACHE_LOCAL_SIZE', 512))
+    return _local
+
+
+def _version_key(namespace):
+    return f'{PREFIX}:{namespace}:version'
+
+
+def version(namespace):
+    """Current version token of ``namespace``."""
+    local = local_cache()
+    key = _version_key(namespace)
+    current = local.get(key)
+    if current is None:
+        current = cache.get(key)
+        if current is None:
+            # Random, not a counter: a restarted/evicted version must not
+            # point back at entries written under an older one.
+            cache.add(key, uuid.uuid4().hex[:12], None)
+            current = cache.get(key)
+        local.set(key, current, _settings()[1])
+    return current
+
+
+def get_or_set(namespace, key, compute, timeout=None):
+    """Cached value of ``key`` in ``namespace``; ``compute()`` fills both tiers on a miss."""
+    shared_timeout, _ = _settings()
+    timeout = shared_timeout if timeout is None else timeout
+    full_key = f'{PREFIX}:{namespace}:{version(namespace)}:{key}'
+
+    local = local_cache()
+    value = local.get(full_key, _MISSING)
+    record_cache_lookup('reference_local', hit=value is not _MISSING)
+    if value is not _MISSING:
+        return value
+
+    value = cache.get(full_key, _MISSING)
+    record_cache_lookup('reference', hit=value is not _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(full_key, value, timeout)
+    local.set(full_key, value, timeout)
+    return value
+
+
+def invalidate(namespace):
+    """Start a new version of ``namespace``; every worker drops its entries within the local TTL."""
+    new_version = uuid.uuid4().hex[:12]
+    cache.set(_version_key(namespace), new_version, None)
+    local = local_cache()
+    local.delete_prefix(f'{PREFIX}:{namespace}:')
+    local.set(_version_key(namespace), new_version, _settings()[1])
+
+
+def _on_change(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    ignored = _ignored_fields.get(sender)
+    if update_fields and ignored and set(update_fields) <= ignored:
+        return
+    for namespace in _registry.get(sender, ()):
+        transaction.on_commit(lambda namespace=namespace: invalidate(namespace))
+
+
+def register(namespace, *models, ignore_fields=()):
+    """
+    Invalidate ``namespace`` whenever one of ``models`` is saved or deleted.
+
+    Saves touching only ``ignore_fields`` (e.g. ``last_login``) are skipped.
+    """
+    for model in models:
+        _registry.setdefault(model, set()).add(namespace)
+        if ignore_fields:
+            _ignored_fields[model] = set(ignore_fields)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'reference-cache:save:{model._meta.label}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'reference-cache:delete:{model._meta.label}')
@@ -0,0 +1,23 @@
+"""
+Copy the monolith's data into the per-service databases of
+``hospital-microservices/`` (``manage.py copy_to_services``).
+
+    python manage.py copy_to_services --workers 8          # full copy, resumable
+    python manage.py copy_to_services --catch-up           # rows changed since the last pass
+    python manage.py copy_to_services --catch-up --verify  # during the cutover window
+
+``tables`` maps each monolith table to its service's table: foreign keys
+become the UUID columns the services use (``patient_id``, ``doctor_id``,
+``prescription_id``...), columns the service dropped are left behind.
+``copier`` streams every table in primary-key order, split into key ranges
+copied by parallel workers, and upserts the rows into the service database
+in multi-row ``INSERT ... ON CONFLICT``. ``checkpoint`` records the last key
+written per range, so an interrupted copy resumes where it stopped and
+re-copying a range is harmless.
+
+The full copy runs while the monolith keeps serving. Each catch-up pass then
+copies the rows changed (``updated_at``) since the previous pass started;
+the last pass, run with writes stopped, is short. Deletes are not carried
+over, nor are writes that bypass ``updated_at`` (``QuerySet.update()``
+without it).
+"""
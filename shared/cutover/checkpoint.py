@@ -0,0 +1,80 @@
+"""
+Progress of the copy, one JSON file (``CUTOVER_CHECKPOINT_PATH``)::
+
+    {"tables": {"patients": {
+        "started_at": "...",     # before the first row was read
+        "copied_at": "...",      # every range written
+        "synced_at": "...",      # next catch-up copies rows changed after this
+        "shards": [{"start": null, "end": "4000...", "last_pk": "3f2a...", "rows": 81920, "done": false}, ...]
+    }}}
+
+The file is rewritten atomically (temp file + ``os.replace``) after every
+batch, and one copy at a time holds ``<path>.lock``.
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+
+def checkpoint_path():
+    return str(getattr(settings, 'CUTOVER_CHECKPOINT_PATH', os.path.join(settings.BASE_DIR, 'reports', 'cutover.json')))
+
+
+class CheckpointStore:
+    def __init__(self, path=None):
+        self.path = path or checkpoint_path()
+        self._mutex = threading.Lock()
+        self.state = self._read()
+
+    @contextmanager
+    def lock(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(f'{self.path}.lock', 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {'tables': {}}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(self.state, handle, indent=1)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.path)
+
+    def table(self, name):
+        return self.state['tables'].get(name, {})
+
+    def update(self, name, **values):
+        with self._mutex:
+            self.state['tables'].setdefault(name, {}).update(values)
+            self._save()
+
+    def update_shard(self, name, index, **values):
+        with self._mutex:
+            self.state['tables'][name]['shards'][index].update(values)
+            self._save()
+
+    def reset(self, name):
+        with self._mutex:
+            self.state['tables'].pop(name, None)
+            self._save()
+
+    def timestamp(self, name, key):
+        value = self.table(name).get(key)
+        return parse_datetime(value) if value else None
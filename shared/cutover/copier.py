@@ -0,0 +1,282 @@
+"""
+Stream monolith tables into the service databases.
+
+Each table is split into primary-key ranges (UUID space or integer span,
+fixed at the first run and kept in the checkpoint). A worker thread reads
+its range in key order through ``QuerySet.iterator()`` (a server-side cursor
+on PostgreSQL, opened inside a transaction so it is not materialized like a
+``WITH HOLD`` cursor) and writes every ``batch_size`` rows to the target in
+one transaction, then records the last key. Tables that another table of the
+same service references (``depends_on``) are finished first.
+
+Rows are written with ``INSERT ... ON CONFLICT (pk) DO UPDATE`` (PostgreSQL,
+SQLite), so writing a row twice, after a crash or in a catch-up pass,
+leaves the newest values.
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+UPSERT_VENDORS = ('postgresql', 'sqlite')
+
+
+class CutoverError(Exception):
+    pass
+
+
+def target_alias(spec):
+    alias = (getattr(settings, 'CUTOVER_DATABASES', {}) or {}).get(spec.service)
+    if alias not in connections.databases:
+        raise CutoverError(
+            f'No database for the {spec.service} service (set CUTOVER_{spec.service.upper()}_DB_NAME)'
+        )
+    return alias
+
+
+def stages(specs):
+    """``specs`` grouped so that every table comes after the tables it depends on."""
+    selected = {spec.table: spec for spec in specs}
+    depth = {}
+
+    def level(spec):
+        if spec.table not in depth:
+            deps = [selected[name] for name in spec.depends_on if name in selected]
+            depth[spec.table] = 1 + max((level(dep) for dep in deps), default=-1)
+        return depth[spec.table]
+
+    grouped = {}
+    for spec in specs:
+        grouped.setdefault(level(spec), []).append(spec)
+    return [grouped[key] for key in sorted(grouped)]
+
+
+class TableWriter:
+    """Multi-row upserts of source rows into ``spec``'s table in the target database."""
+
+    def __init__(self, spec, alias):
+        self.spec = spec
+        self.connection = connection = connections[alias]
+        if connection.vendor not in UPSERT_VENDORS:
+            raise CutoverError(f'{alias}: {connection.vendor} is not supported (PostgreSQL or SQLite)')
+
+        with connection.cursor() as cursor:
+            if spec.table not in connection.introspection.table_names(cursor):
+                raise CutoverError(f'{alias}: table {spec.table} is missing, run the service\'s migrate first')
+            target_columns = [column.name for column in connection.introspection.get_table_description(cursor, spec.table)]
+            self.pk_column = connection.introspection.get_primary_key_column(cursor, spec.table)
+        try:
+            resolved = spec.resolve(target_columns)
+        except KeyError as exc:
+            raise CutoverError(f'{spec.table}: no source for target columns {exc.args[0]}') from None
+
+        # Source columns read, the key first (it is the checkpoint)
+        self.sources = [spec.model._meta.pk.attname]
+        for _name, column in resolved:
+            if column.source is not None and column.source not in self.sources:
+                self.sources.append(column.source)
+        self.plan = [
+            (None if column.source is None else self.sources.index(column.source), column.convert, spec.field(column))
+            for _name, column in resolved
+        ]
+
+        quote = connection.ops.quote_name
+        names = [name for name, _column in resolved]
+        self.insert = f'INSERT INTO {quote(spec.table)} ({", ".join(quote(name) for name in names)}) VALUES '
+        self.row_sql = f'({", ".join(["%s"] * len(names))})'
+        updates = ', '.join(f'{quote(name)} = EXCLUDED.{quote(name)}' for name in names if name != self.pk_column)
+        self.conflict = f' ON CONFLICT ({quote(self.pk_column)}) DO UPDATE SET {updates}'
+        max_params = connection.features.max_query_params or 65535
+        self.rows_per_statement = max(1, max_params // len(names))
+
+    def convert(self, row):
+        values = []
+        for index, convert, field in self.plan:
+            value = None if index is None else row[index]
+            if convert is not None:
+                value = convert(value)
+            values.append(field.get_db_prep_value(value, self.connection, prepared=False))
+        return values
+
+    def write(self, rows):
+        values = [self.convert(row) for row in rows]
+        step = self.rows_per_statement
+        with transaction.atomic(using=self.connection.alias), self.connection.cursor() as cursor:
+            for start in range(0, len(values), step):
+                chunk = values[start:start + step]
+                sql = self.insert + ', '.join([self.row_sql] * len(chunk)) + self.conflict
+                cursor.execute(sql, [value for row in chunk for value in row])
+
+    def reset_sequence(self):
+        """Move the target's id sequence past the copied keys (PostgreSQL)."""
+        if not self.spec.integer_pk or self.connection.vendor != 'postgresql':
+            return
+        quote = self.connection.ops.quote_name
+        table, pk = quote(self.spec.table), quote(self.pk_column)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({pk}), 1), MAX({pk}) IS NOT NULL) '
+                f'FROM {table}',
+                [self.spec.table, self.pk_column],
+            )
+
+    def count(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.connection.ops.quote_name(self.spec.table)}')
+            return cursor.fetchone()[0]
+
+
+def _key(value):
+    return str(value) if isinstance(value, uuid.UUID) else value
+
+
+def shard_bounds(spec, shards, using=DEFAULT_DB_ALIAS):
+    """``[(start, end)]`` key ranges (``start`` included, ``end`` excluded, ``None`` = open)."""
+    if isinstance(spec.model._meta.pk, models.UUIDField):
+        edges = [uuid.UUID(int=(2 ** 128) * i // shards) for i in range(1, shards)]
+    else:
+        span = spec.queryset(using).aggregate(low=Min('pk'), high=Max('pk'))
+        if span['low'] is None:
+            return [(None, None)]
+        width = span['high'] - span['low'] + 1
+        edges = sorted({span['low'] + width * i // shards for i in range(1, shards)} - {span['low']})
+    starts = [None] + edges
+    ends = edges + [None]
+    return [(_key(start), _key(end)) for start, end in zip(starts, ends)]
+
+
+def _stream(queryset, sources, batch_size, using):
+    """Batches of ``sources`` tuples in key order, read through one server-side cursor."""
+    with transaction.atomic(using=using):
+        batch = []
+        for row in queryset.order_by('pk').values_list(*sources).iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def copy_shard(spec, index, store, batch_size, using=DEFAULT_DB_ALIAS):
+    """Copy one key range from its checkpoint on; returns the rows written."""
+    writer = TableWriter(spec, target_alias(spec))
+    shard = store.table(spec.table)['shards'][index]
+    queryset = spec.queryset(using)
+    if shard.get('last_pk') is not None:
+        queryset = queryset.filter(pk__gt=shard['last_pk'])
+    elif shard['start'] is not None:
+        queryset = queryset.filter(pk__gte=shard['start'])
+    if shard['end'] is not None:
+        queryset = queryset.filter(pk__lt=shard['end'])
+
+    resumed = written = shard.get('rows', 0)
+    for rows in _stream(queryset, writer.sources, batch_size, using):
+        writer.write(rows)
+        written += len(rows)
+        store.update_shard(spec.table, index, last_pk=_key(rows[-1][0]), rows=written)
+        logger.info('Cutover %s[%d]: %d rows', spec.table, index, written)
+    store.update_shard(spec.table, index, done=True)
+    return written - resumed
+
+
+def catch_up_table(spec, since, batch_size, using=DEFAULT_DB_ALIAS):
+    """Copy the rows of ``spec`` changed after ``since``; returns how many."""
+    writer = TableWriter(spec, target_alias(spec))
+    queryset = spec.queryset(using).filter(spec.changed(since))
+    written = 0
+    for rows in _stream(queryset, writer.sources, batch_size, using):
+        writer.write(rows)
+        written += len(rows)
+    writer.reset_sequence()
+    return written
+
+
+def _in_worker(function, *args):
+    try:
+        return function(*args)
+    finally:
+        # Pool threads open their own connections; don't leave them behind.
+        connections.close_all()
+
+
+def _run(tasks, workers):
+    """Run ``(function, *args)`` tasks on ``workers`` threads; results in order."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [function(*args) for function, *args in tasks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(_in_worker, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def copy(specs, store, workers=4, shards=4, batch_size=2000, using=DEFAULT_DB_ALIAS):
+    """
+    Full copy of ``specs``, resuming from the checkpoint. Returns
+    ``{table: rows written in this run}``.
+    """
+    copied = {}
+    for stage in stages(specs):
+        tasks = []
+        for spec in stage:
+            target_alias(spec)
+            state = store.table(spec.table)
+            if 'shards' not in state:
+                # Taken before any row is read: the first catch-up starts here
+                store.update(
+                    spec.table,
+                    started_at=timezone.now().isoformat(),
+                    shards=[{'start': start, 'end': end} for start, end in shard_bounds(spec, shards, using)],
+                )
+            tasks += [
+                (copy_shard, spec, index, store, batch_size, using)
+                for index, shard in enumerate(store.table(spec.table)['shards'])
+                if not shard.get('done')
+            ]
+            copied[spec.table] = 0
+
+        for (_function, spec, *_args), written in zip(tasks, _run(tasks, workers)):
+            copied[spec.table] += written
+
+        for spec in stage:
+            state = store.table(spec.table)
+            if 'copied_at' not in state:
+                TableWriter(spec, target_alias(spec)).reset_sequence()
+                store.update(spec.table, copied_at=timezone.now().isoformat(), synced_at=state['started_at'])
+    return copied
+
+
+def catch_up(specs, store, workers=4, batch_size=2000, overlap=60, using=DEFAULT_DB_ALIAS):
+    """
+    Copy the rows changed since each table's last pass (less ``overlap``
+    seconds, for transactions that committed late). Returns ``{table: rows}``.
+    """
+    pending = [spec.table for spec in specs if 'copied_at' not in store.table(spec.table)]
+    if pending:
+        raise CutoverError(f'Full copy not finished for: {", ".join(pending)}')
+
+    copied = {}
+    for stage in stages(specs):
+        started = timezone.now()
+        tasks = [
+            (catch_up_table, spec, store.timestamp(spec.table, 'synced_at') - timedelta(seconds=overlap), batch_size, using)
+            for spec in stage
+        ]
+        for spec, written in zip(stage, _run(tasks, workers)):
+            copied[spec.table] = written
+            store.update(spec.table, synced_at=started.isoformat())
+    return copied
+
+
+def verify(specs, using=DEFAULT_DB_ALIAS):
+    """``{table: (monolith rows, service rows)}``."""
+    return {
+        spec.table: (spec.queryset(using).count(), TableWriter(spec, target_alias(spec)).count())
+        for spec in specs
+    }
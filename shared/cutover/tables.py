@@ -0,0 +1,231 @@
+"""
+Monolith tables and where they go in ``hospital-microservices/``.
+
+A target column takes the source column of the same name unless the spec
+maps it (``columns``); source columns the service no longer has are dropped.
+Foreign keys to UUID primary keys are copied as they are, so
+``appointments.patient_id`` in the appointments service is the patient's id
+in the patients service. User references (``created_by_id``,
+``doctor_id`` of medical records...) keep the monolith user UUIDs.
+
+``doctor_profiles`` has an integer key in the monolith and a UUID in the
+appointments service: the UUID is derived from the old key
+(``doctor_uuid``), and appointments and prescriptions map their
+``doctor_id`` the same way.
+
+Not copied: users and roles (the auth service keeps integer user ids),
+``doctor_schedules`` (weekly and deprecated in the monolith, per date in the
+service), and the monolith-only drug interactions, catalog changes, daily
+prescription statistics and audit logs.
+"""
+import uuid
+
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+# Fixed namespace: the same monolith doctor always gets the same UUID
+DOCTOR_NAMESPACE = uuid.UUID('2d7f3c1a-5b8e-4f60-9a1d-7c4e8b2f6a93')
+
+# DoctorProfile.SPECIALIZATION_CHOICES of the appointments service
+SPECIALIZATIONS = {
+    'INTERNAL_MEDICINE': 'Nội khoa',
+    'SURGERY': 'Ngoại khoa',
+    'PEDIATRICS': 'Nhi khoa',
+    'OBSTETRICS': 'Sản khoa',
+    'CARDIOLOGY': 'Tim mạch',
+    'NEUROLOGY': 'Thần kinh',
+    'ORTHOPEDICS': 'Chỉnh hình',
+    'DERMATOLOGY': 'Da liễu',
+    'OPHTHALMOLOGY': 'Mắt',
+    'ENT': 'Tai mũi họng',
+    'PSYCHIATRY': 'Tâm thần',
+    'EMERGENCY': 'Cấp cứu',
+    'RADIOLOGY': 'Chẩn đoán hình ảnh',
+    'LABORATORY': 'Xét nghiệm',
+    'PHARMACY': 'Dược',
+    'OTHER': 'Khác',
+}
+_SPECIALIZATION_BY_LABEL = {label.lower(): code for code, label in SPECIALIZATIONS.items()}
+
+
+def doctor_uuid(pk):
+    return None if pk is None else uuid.uuid5(DOCTOR_NAMESPACE, f'doctor_profiles:{pk}')
+
+
+def specialization_code(value):
+    """Free-text specialization of the monolith -> choice code of the service (``OTHER`` if unknown)."""
+    value = (value or '').strip()
+    if value.upper() in SPECIALIZATIONS:
+        return value.upper()
+    return _SPECIALIZATION_BY_LABEL.get(value.lower(), 'OTHER')
+
+
+def file_url(name):
+    return default_storage.url(name) if name else ''
+
+
+def changed_after(*fields):
+    """Catch-up filter: rows where any of ``fields`` is later than ``since``."""
+    def changed(since):
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__gt': since})
+        return condition
+    return changed
+
+
+def open_time_slots(since):
+    # time_slots has no updated_at; bookings change current_appointments on
+    # the slots of today and later
+    return Q(created_at__gt=since) | Q(date__gte=timezone.localdate(since))
+
+
+def open_dispensing(since):
+    # dispensed_at is set on insert only, and mark_as_paid / mark_prepared move
+    # UNPAID -> PENDING -> PREPARED with QuerySet.update(), which touches
+    # nothing: every row not yet in a final state is copied on each pass. The
+    # move to DISPENSED / CANCELLED always touches prescription.updated_at
+    # (mark_dispensed, PrescriptionDispenseViewSet.perform_update), so the row
+    # is copied once more after its last change.
+    return (
+        Q(status__in=('UNPAID', 'PENDING', 'PREPARED'))
+        | Q(dispensed_at__gt=since)
+        | Q(prescription__updated_at__gt=since)
+    )
+
+
+class Column:
+    """
+    Value of a target column: source column ``source`` (``None`` for a
+    constant) through ``convert``. ``field`` prepares the value for the target
+    database; by default the source field.
+    """
+
+    def __init__(self, source, convert=None, field=None):
+        self.source = source
+        self.convert = convert
+        self.field = field
+
+
+class TableSpec:
+    def __init__(self, service, model, columns=None, depends_on=(), changed=None):
+        self.service = service
+        self.model = model
+        self.table = model._meta.db_table
+        self.columns = columns or {}
+        self.depends_on = tuple(depends_on)
+        self.changed = changed or changed_after('updated_at')
+
+    def __repr__(self):
+        return f'<TableSpec {self.service}.{self.table}>'
+
+    def queryset(self, using):
+        return self.model._base_manager.using(using)
+
+    @property
+    def integer_pk(self):
+        """Target key copied from an auto-increment key (its sequence must follow)."""
+        pk = self.model._meta.pk
+        return pk.column not in self.columns and isinstance(pk, models.AutoField)
+
+    def resolve(self, target_columns):
+        """``[(target column, Column)]`` for ``target_columns``; raises ``KeyError`` listing unmapped ones."""
+        by_column = {field.column: field for field in self.model._meta.concrete_fields}
+        resolved, missing = [], []
+        for name in target_columns:
+            if name in self.columns:
+                resolved.append((name, self.columns[name]))
+            elif name in by_column:
+                resolved.append((name, Column(by_column[name].attname)))
+            else:
+                missing.append(name)
+        if missing:
+            raise KeyError(', '.join(missing))
+        return resolved
+
+    def field(self, column):
+        return column.field or self.model._meta.get_field(column.source)
+
+
+_specs = None
+
+
+def specs():
+    """Every table, in dependency order within each service."""
+    global _specs
+    if _specs is None:
+        _specs = _build()
+    return _specs
+
+
+def get(table):
+    for spec in specs():
+        if spec.table == table:
+            return spec
+    raise KeyError(table)
+
+
+def names():
+    return [spec.table for spec in specs()]
+
+
+def _build():
+    from apps.appointments.models import Appointment, AppointmentStatusHistory, Department, DoctorProfile, TimeSlot
+    from apps.patients.models import MedicalRecord, Patient, PatientDocument
+    from apps.payments.models import Payment, PaymentReceipt, VNPayTransaction
+    from apps.prescriptions.models import (
+        Drug, DrugCategory, Prescription, PrescriptionDispensing, PrescriptionItem,
+    )
+
+    doctor = Column('doctor_id', doctor_uuid, models.UUIDField())
+    return [
+        TableSpec('patients', Patient),
+        TableSpec('patients', MedicalRecord),
+        TableSpec(
+            'patients', PatientDocument,
+            columns={'file_url': Column('file', file_url, models.CharField())},
+            changed=changed_after('uploaded_at'),
+        ),
+
+        TableSpec('appointments', Department),
+        TableSpec(
+            'appointments', DoctorProfile,
+            columns={
+                'id': Column('id', doctor_uuid, models.UUIDField()),
+                'specialization': Column('specialization', specialization_code),
+                'max_appointments_per_day': Column('max_patients_per_day'),
+                'is_available': Column(None, lambda _: True, models.BooleanField()),
+            },
+            depends_on=('departments',),
+        ),
+        TableSpec('appointments', Appointment, columns={'doctor_id': doctor}),
+        TableSpec(
+            'appointments', AppointmentStatusHistory,
+            depends_on=('appointments',), changed=changed_after('changed_at'),
+        ),
+        TableSpec(
+            'appointments', TimeSlot,
+            columns={'doctor_id': doctor}, depends_on=('doctor_profiles',), changed=open_time_slots,
+        ),
+
+        TableSpec('prescriptions', DrugCategory),
+        TableSpec('prescriptions', Drug, depends_on=('drug_categories',)),
+        TableSpec('prescriptions', Prescription, columns={'doctor_id': doctor}),
+        TableSpec(
+            'prescriptions', PrescriptionItem,
+            depends_on=('prescriptions', 'drugs'),
+            # quantity_dispensed changes when the prescription is dispensed
+            changed=changed_after('created_at', 'prescription__updated_at'),
+        ),
+        TableSpec(
+            'prescriptions', PrescriptionDispensing,
+            depends_on=('prescription_items',),
+            changed=open_dispensing,
+        ),
+
+        TableSpec('payments', Payment),
+        TableSpec('payments', VNPayTransaction, depends_on=('payments',)),
+        TableSpec('payments', PaymentReceipt, depends_on=('payments',), changed=changed_after('created_at')),
+    ]
@@ -0,0 +1,168 @@
+"""
+Per-request database instrumentation.
+
+An execute wrapper installed on every database connection records query
+count, DB time and SQL fingerprints into the ``QueryStats`` object of the
+enclosing ``collect_queries()`` block. ``QueryInstrumentationMiddleware`` uses it for
+every request; tests and scripts can use it directly.
+
+Views declare query budgets next to their permissions::
+
+    class PrescriptionViewSet(ModelViewSet):
+        query_budgets = {
+            'list': QueryBudget(max_queries=8),
+        }
+
+    @query_budget(max_queries=3)
+    @api_view(['GET'])
+    def prescription_statistics(request):
+        ...
+"""
+import contextvars
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+QUERY_BUDGET_HEADER = 'X-Query-Budget'
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+_current_stats = contextvars.ContextVar('query_stats', default=None)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r'IN \((?:(?:%s|\?), )*(?:%s|\?)\)')
+
+
+def fingerprint(sql):
+    """Normalise SQL so that the same statement with different parameters collapses to one key."""
+    sql = _WHITESPACE_RE.sub(' ', sql).strip()
+    sql = _LITERAL_RE.sub('?', sql)
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request exceeds its declared query budget in strict mode."""
+
+
+class QueryStats:
+    """Queries executed while a ``collect_queries()`` block was active."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def db_ms(self):
+        return self.duration * 1000
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first (N+1 candidates)."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n > 1]
+
+    @property
+    def max_duplicates(self):
+        duplicates = self.duplicates
+        return duplicates[0][1] if duplicates else 0
+
+
+class QueryBudget:
+    """Upper bounds for one view/action. ``None`` means unbounded."""
+
+    def __init__(self, max_queries=None, max_db_ms=None, max_duplicates=None):
+        self.max_queries = max_queries
+        self.max_db_ms = max_db_ms
+        self.max_duplicates = max_duplicates
+
+    def violations(self, stats):
+        violations = []
+        if self.max_queries is not None and stats.count > self.max_queries:
+            violations.append(f'{stats.count} queries > {self.max_queries}')
+        if self.max_db_ms is not None and stats.db_ms > self.max_db_ms:
+            violations.append(f'{stats.db_ms:.1f}ms db > {self.max_db_ms}ms')
+        if self.max_duplicates is not None and stats.max_duplicates > self.max_duplicates:
+            violations.append(f'{stats.max_duplicates} duplicate queries > {self.max_duplicates}')
+        return violations
+
+    def __repr__(self):
+        return (f'QueryBudget(max_queries={self.max_queries}, max_db_ms={self.max_db_ms}, '
+                f'max_duplicates={self.max_duplicates})')
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, time.perf_counter() - started)
+
+
+def install_execute_wrapper(connection, **kwargs):
+    """Attach the recording wrapper to ``connection`` once; it is a no-op outside ``collect_queries()``."""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+# Installed on every connection as it is opened, in whichever thread opens it,
+# so queries run through sync_to_async by async views are recorded too: the
+# stats object travels with the context, not with the thread.
+connection_created.connect(install_execute_wrapper, dispatch_uid='shared.db.instrumentation')
+
+
+@contextmanager
+def collect_queries():
+    """Record every query run in the current context (including sync_to_async threads)."""
+    for connection in connections.all(initialized_only=True):
+        install_execute_wrapper(connection)
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def query_budget(**limits):
+    """Attach a ``QueryBudget`` to a function-based view (apply above ``@api_view``)."""
+    def decorator(view_func):
+        view_func.query_budget = QueryBudget(**limits)
+        return view_func
+    return decorator
+
+
+def get_view_budget(view_func, method):
+    """Resolve the budget declared for ``view_func`` handling ``method``.
+
+    Function views carry it as ``view_func.query_budget``; class-based views and
+    viewsets declare ``query_budgets`` keyed by action name (viewsets) or by
+    lower-case HTTP method (plain APIViews).
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    budgets = getattr(getattr(view_func, 'cls', None), 'query_budgets', None)
+    if not budgets:
+        return None
+    method = method.lower()
+    actions = getattr(view_func, 'actions', None)
+    return budgets.get(actions.get(method) if actions else method)
+
+
+def assert_query_budget(response):
+    """Fail if ``response`` reports an exceeded budget (needs instrumentation headers enabled)."""
+    status = response.get(QUERY_BUDGET_HEADER) if hasattr(response, 'get') else None
+    if status and status.startswith('exceeded'):
+        raise QueryBudgetExceeded(status)
@@ -0,0 +1,161 @@
+"""
+Read-replica routing for reporting endpoints.
+
+Only views that opt in are served from the replica, and only for safe
+methods. Declaration mirrors query budgets::
+
+    class PatientViewSet(ModelViewSet):
+        read_replica_actions = ['statistics']
+
+    @use_read_replica
+    @api_view(['GET'])
+    def appointment_statistics(request):
+        ...
+
+A request stays on the primary when
+
+- the client wrote something within the last ``REPLICA_STICKY_SECONDS``
+  (read-your-writes, tracked by cookie and per-user cache key),
+- the view itself has already written during this request,
+- the replica is unreachable or lags more than ``REPLICA_MAX_LAG_SECONDS``.
+
+``ReadReplicaMiddleware`` decides per request; ``ReadReplicaRouter`` applies
+the decision. Outside a request (commands, shell) everything uses ``default``.
+"""
+import contextvars
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_routing_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+class RoutingState:
+    """Per-request routing decision plus whether the request has written."""
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+def use_read_replica(view_func):
+    """Mark a function-based view as replica-safe (apply above ``@api_view``)."""
+    view_func.use_read_replica = True
+    return view_func
+
+
+def view_uses_replica(view_func, method):
+    if getattr(view_func, 'use_read_replica', False):
+        return True
+    actions = getattr(getattr(view_func, 'cls', None), 'read_replica_actions', None)
+    if not actions:
+        return False
+    view_actions = getattr(view_func, 'actions', None)
+    action = view_actions.get(method.lower()) if view_actions else method.lower()
+    return action in actions
+
+
+class routing_state:
+    """Context manager activating a ``RoutingState`` (used by the middleware and by tests)."""
+
+    def __init__(self, read_alias=None):
+        self.state = RoutingState()
+        self.state.read_alias = read_alias
+
+    def __enter__(self):
+        self._token = _routing_state.set(self.state)
+        return self.state
+
+    def __exit__(self, *exc_info):
+        _routing_state.reset(self._token)
+
+
+class ReplicaLagMonitor:
+    """Caches the replica's replication lag for ``REPLICA_LAG_CHECK_INTERVAL`` seconds per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._healthy = False
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+        now = time.monotonic()
+        if now - self._checked_at < interval:
+            return self._healthy
+        with self._lock:
+            if now - self._checked_at >= interval:
+                self._healthy = self._check(alias)
+                self._checked_at = now
+        return self._healthy
+
+    def _check(self, alias):
+        max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5)
+        try:
+            lag = self.lag_seconds(alias)
+        except Exception:
+            logger.warning('Replica %s unavailable, reading from primary', alias, exc_info=True)
+            return False
+        if lag is not None and lag > max_lag:
+            logger.warning('Replica %s lags %.1fs (max %ss), reading from primary', alias, lag, max_lag)
+            return False
+        return True
+
+    def lag_seconds(self, alias):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                )
+                row = cursor.fetchone()
+                return float(row[0]) if row and row[0] is not None else 0.0
+            if connection.vendor == 'mysql':
+                cursor.execute('SHOW REPLICA STATUS')
+                row = cursor.fetchone()
+                if not row:
+                    return 0.0
+                columns = [col[0] for col in cursor.description]
+                lag = dict(zip(columns, row)).get('Seconds_Behind_Source')
+                return float(lag) if lag is not None else None
+            # Engines without replication (SQLite in development): probe only.
+            cursor.execute('SELECT 1')
+            return 0.0
+
+
+lag_monitor = ReplicaLagMonitor()
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state.wrote:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The cutover targets (shared.cutover) are the services' own databases,
+        # whose schema the services migrate themselves.
+        cutover = getattr(settings, 'CUTOVER_DATABASES', {}).values()
+        return db != replica_alias() and db not in cutover
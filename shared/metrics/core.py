@@ -0,0 +1,327 @@
+"""
+Minimal Prometheus-compatible metrics with multi-process support.
+
+Every process writes its samples into its own memory-mapped shard file
+(``<METRICS_DIR>/<kind>_<pid>.db``); nothing is shared between processes, so
+an update is a dict lookup plus an in-place ``struct.pack_into`` under a
+process-local lock. The scrape endpoint reads every shard and aggregates:
+
+- counters and histograms are summed across all shards, including those of
+  workers that have exited (their counts must not go backwards);
+- gauges are summed across live processes only.
+
+Without ``METRICS_DIR`` a private temporary directory is used, which is
+correct for single-process servers (``runserver``, one uvicorn worker).
+"""
+import glob
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from bisect import bisect_left
+
+_HEADER = struct.Struct('<I4x')
+_KEY_LEN = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MmapShard:
+    """Append-only key -> float64 map stored in a memory-mapped file.
+
+    Layout: 8 byte header holding the number of used bytes, then entries of
+    ``<uint32 key length><utf-8 key padded to 8 bytes><float64 value>``. The
+    owning process is the only writer; readers parse a snapshot of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._positions = {}
+        fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+        self._file = os.fdopen(fd, 'r+b')
+        size = os.fstat(fd).st_size
+        if size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+            size = _INITIAL_SIZE
+        self._mmap = mmap.mmap(fd, size)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0] or _HEADER.size
+        if self._used == _HEADER.size:
+            _HEADER.pack_into(self._mmap, 0, self._used)
+        for key, value, position in _iter_entries(self._mmap, self._used):
+            self._positions[key] = position
+
+    def _grow(self, needed):
+        size = len(self._mmap)
+        while size < needed:
+            size *= 2
+        self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+    def _allocate(self, key):
+        encoded = key.encode('utf-8')
+        padded = len(encoded) + (8 - (_KEY_LEN.size + len(encoded)) % 8) % 8
+        entry_size = _KEY_LEN.size + padded + _VALUE.size
+        if self._used + entry_size > len(self._mmap):
+            self._grow(self._used + entry_size)
+        offset = self._used
+        _KEY_LEN.pack_into(self._mmap, offset, len(encoded))
+        self._mmap[offset + _KEY_LEN.size:offset + _KEY_LEN.size + len(encoded)] = encoded
+        position = offset + _KEY_LEN.size + padded
+        _VALUE.pack_into(self._mmap, position, 0.0)
+        # Publish the entry only once it is fully written.
+        self._used += entry_size
+        _HEADER.pack_into(self._mmap, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def add(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._allocate(key)
+        _VALUE.pack_into(self._mmap, position, _VALUE.unpack_from(self._mmap, position)[0] + amount)
+
+    def set(self, key, value):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._allocate(key)
+        _VALUE.pack_into(self._mmap, position, value)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+def _iter_entries(buffer, used):
+    offset = _HEADER.size
+    while offset < used:
+        key_len = _KEY_LEN.unpack_from(buffer, offset)[0]
+        key_start = offset + _KEY_LEN.size
+        key = bytes(buffer[key_start:key_start + key_len]).decode('utf-8')
+        padded = key_len + (8 - (_KEY_LEN.size + key_len) % 8) % 8
+        position = key_start + padded
+        yield key, _VALUE.unpack_from(buffer, position)[0], position
+        offset = position + _VALUE.size
+
+
+def read_shard(path):
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if len(data) < _HEADER.size:
+        return
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    for key, value, _position in _iter_entries(data, used):
+        yield key, value
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ShardStore:
+    """Per-process shards for counters and gauges, reopened after ``fork()``."""
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._shards = {}
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = os.environ.get('METRICS_DIR') or tempfile.mkdtemp(prefix='hospital-metrics-')
+        return self._directory
+
+    def _shard(self, kind):
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked child: never write into the parent's files.
+            self._shards = {}
+            self._pid = pid
+        shard = self._shards.get(kind)
+        if shard is None:
+            os.makedirs(self.directory, exist_ok=True)
+            shard = MmapShard(os.path.join(self.directory, f'{kind}_{pid}.db'))
+            self._shards[kind] = shard
+        return shard
+
+    def add(self, kind, key, amount):
+        with self._lock:
+            self._shard(kind).add(key, amount)
+
+    def set(self, kind, key, value):
+        with self._lock:
+            self._shard(kind).set(key, value)
+
+    def add_many(self, kind, items):
+        with self._lock:
+            shard = self._shard(kind)
+            for key, amount in items:
+                shard.add(key, amount)
+
+    def collect(self):
+        """Aggregate all shards in the directory into ``{key: value}``."""
+        totals = {}
+        for path in glob.glob(os.path.join(self.directory, '*.db')):
+            kind, _, pid = os.path.basename(path)[:-3].rpartition('_')
+            if kind == 'gauge' and not _pid_alive(int(pid)):
+                continue
+            try:
+                entries = list(read_shard(path))
+            except (OSError, ValueError, struct.error):
+                continue
+            for key, value in entries:
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def mark_process_dead(self, pid):
+        """Drop a dead worker's gauges (gunicorn ``child_exit`` hook)."""
+        path = os.path.join(self.directory, f'gauge_{pid}.db')
+        if os.path.exists(path):
+            os.remove(path)
+
+
+store = ShardStore()
+
+
+class Metric:
+    kind = 'counter'
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        REGISTRY.append(self)
+
+    def _key(self, suffix, labels, extra=()):
+        cache_key = (suffix, labels, extra)
+        key = self._keys.get(cache_key)
+        if key is None:
+            if len(labels) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}, got {labels}')
+            pairs = list(zip(self.labelnames, (str(v) for v in labels))) + list(extra)
+            key = json.dumps([self.name + suffix, pairs], ensure_ascii=False)
+            self._keys[cache_key] = key
+        return key
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, *labels, amount=1):
+        store.add(self.kind, self._key('', labels), amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+    type_name = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        store.add(self.kind, self._key('', labels), amount)
+
+    def dec(self, *labels, amount=1):
+        store.add(self.kind, self._key('', labels), -amount)
+
+    def set(self, *labels, value):
+        store.set(self.kind, self._key('', labels), value)
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_labels = [_format_bound(b) for b in self.buckets] + ['+Inf']
+
+    def observe(self, *labels, value):
+        index = bisect_left(self.buckets, value)
+        bucket = self._key('_bucket', labels, (('le', self._bucket_labels[index]),))
+        store.add_many(self.kind, (
+            (bucket, 1),
+            (self._key('_sum', labels), value),
+            (self._key('_count', labels), 1),
+        ))
+
+
+REGISTRY = []
+
+
+def _format_bound(value):
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(registry=None):
+    """Prometheus text exposition format (0.0.4) for all registered metrics."""
+    registry = REGISTRY if registry is None else registry
+    samples = {}
+    for key, value in store.collect().items():
+        name, pairs = json.loads(key)
+        samples.setdefault(name, []).append((pairs, value))
+
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {_escape(metric.documentation)}')
+        lines.append(f'# TYPE {metric.name} {metric.type_name}')
+        if isinstance(metric, Histogram):
+            lines.extend(_render_histogram(metric, samples))
+            continue
+        for pairs, value in sorted(samples.get(metric.name, []), key=lambda s: s[0]):
+            lines.append(f'{metric.name}{_format_labels(pairs)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(metric, samples):
+    # Buckets are stored non-cumulatively; Prometheus expects cumulative counts.
+    series = {}
+    for pairs, value in samples.get(metric.name + '_bucket', []):
+        labels = tuple(tuple(p) for p in pairs[:-1])
+        series.setdefault(labels, {})[pairs[-1][1]] = value
+    sums = {tuple(tuple(p) for p in pairs): v for pairs, v in samples.get(metric.name + '_sum', [])}
+    counts = {tuple(tuple(p) for p in pairs): v for pairs, v in samples.get(metric.name + '_count', [])}
+
+    lines = []
+    for labels in sorted(series):
+        cumulative = 0.0
+        for bound in metric._bucket_labels:
+            cumulative += series[labels].get(bound, 0.0)
+            lines.append(
+                f'{metric.name}_bucket{_format_labels(list(labels) + [("le", bound)])} {_format_value(cumulative)}'
+            )
+        lines.append(f'{metric.name}_sum{_format_labels(labels)} {_format_value(sums.get(labels, 0.0))}')
+        lines.append(f'{metric.name}_count{_format_labels(labels)} {_format_value(counts.get(labels, 0.0))}')
+    return lines
+
+
+def clear_metrics_dir(directory):
+    """Delete and recreate ``directory`` (for deploy hooks that run before workers fork)."""
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
@@ -0,0 +1,64 @@
+"""
+Application metrics. Import the instrument and call it; no setup needed.
+
+    from shared.metrics.instruments import record_cache_lookup
+    record_cache_lookup('reference', hit=True)
+"""
+from .core import Counter, Gauge, Histogram
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route, method and status code',
+    ['route', 'method', 'status'],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ['route', 'method'],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being processed',
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size by route',
+    ['route', 'method'], buckets=SIZE_BUCKETS,
+)
+HTTP_ERRORS = Counter(
+    'http_request_errors_total', 'Responses with status >= 500 or unhandled exceptions',
+    ['route', 'method', 'status'],
+)
+
+DB_QUERIES = Counter(
+    'db_queries_total', 'Database queries executed, by route',
+    ['route'],
+)
+DB_QUERY_DURATION = Histogram(
+    'db_request_duration_seconds', 'Total database time per request, by route',
+    ['route'],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'db_connections_opened_total', 'New database connections (pool misses when CONN_MAX_AGE > 0)',
+    ['alias'],
+)
+DB_CONNECTIONS_REUSED = Counter(
+    'db_connections_reused_total', 'Requests served on an already open persistent connection',
+    ['alias'],
+)
+
+THROTTLED_REQUESTS = Counter(
+    'http_requests_throttled_total', 'Requests refused with 429, by route class and client kind (user/anon)',
+    ['scope', 'client'],
+)
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by cache name and result (hit/miss)',
+    ['cache', 'result'],
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.inc(cache_name, 'hit' if hit else 'miss')
+
+
+def record_throttled(scope, client):
+    THROTTLED_REQUESTS.inc(scope, client)
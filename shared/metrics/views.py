@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from . import instruments  # noqa: F401 - registers the application metrics
+from .core import render
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape endpoint aggregating every worker's shard."""
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', None)
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
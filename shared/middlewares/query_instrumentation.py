@@ -0,0 +1,110 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from shared.db.instrumentation import (
+    QUERY_BUDGET_HEADER, QUERY_COUNT_HEADER, QueryBudgetExceeded, collect_queries, get_view_budget,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, DB time and duplicate query fingerprints per request.
+
+    - ``Server-Timing`` / ``X-Query-Count`` / ``X-Query-Budget`` response headers
+      when ``QUERY_INSTRUMENTATION_HEADERS`` is on (DEBUG by default).
+    - One JSON log line per request: DEBUG normally, WARNING when the request
+      is slow, repeats a query ``DUPLICATE_QUERY_THRESHOLD`` times or exceeds
+      the view's ``QueryBudget``.
+    - ``QUERY_BUDGET_STRICT`` raises ``QueryBudgetExceeded`` instead (tests).
+    - ``request.query_stats`` for middleware further out (metrics).
+
+    Works under WSGI and ASGI; async views' ORM calls are counted too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.expose_headers = getattr(settings, 'QUERY_INSTRUMENTATION_HEADERS', settings.DEBUG)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+        self.slow_request_ms = getattr(settings, 'SLOW_REQUEST_MS', 1000)
+        self.duplicate_threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.query_budget = None
+        started = time.perf_counter()
+        with collect_queries() as stats:
+            request.query_stats = stats
+            response = self.get_response(request)
+        return self.finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        request.query_budget = None
+        started = time.perf_counter()
+        with collect_queries() as stats:
+            request.query_stats = stats
+            response = await self.get_response(request)
+        return self.finish(request, response, stats, started)
+
+    def finish(self, request, response, stats, started):
+        total_ms = (time.perf_counter() - started) * 1000
+
+        budget = request.query_budget
+        violations = budget.violations(stats) if budget else []
+
+        if self.expose_headers:
+            response['Server-Timing'] = (
+                f'db;dur={stats.db_ms:.2f};desc="{stats.count} queries", total;dur={total_ms:.2f}'
+            )
+            response[QUERY_COUNT_HEADER] = str(stats.count)
+            if budget:
+                response[QUERY_BUDGET_HEADER] = f"exceeded: {'; '.join(violations)}" if violations else 'ok'
+
+        self.log(request, response, stats, total_ms, violations)
+
+        if violations and self.strict:
+            raise QueryBudgetExceeded(f'{request.method} {request.path}: {"; ".join(violations)}')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_view_budget(view_func, request.method)
+        return None
+
+    def log(self, request, response, stats, total_ms, violations):
+        slow = total_ms >= self.slow_request_ms
+        repeated = stats.max_duplicates >= self.duplicate_threshold
+        level = logging.WARNING if (violations or slow or repeated) else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+
+        match = getattr(request, 'resolver_match', None)
+        payload = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'db_ms': round(stats.db_ms, 2),
+            'queries': stats.count,
+            'duplicates': [
+                {'count': n, 'sql': sql[:300]} for sql, n in stats.duplicates[:3]
+            ],
+        }
+        if violations:
+            payload['budget_violations'] = violations
+        logger.log(level, json.dumps(payload, ensure_ascii=False))
@@ -0,0 +1,81 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+from shared.db.routers import lag_monitor, replica_alias, routing_state, view_uses_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_primary_until'
+
+
+class ReadReplicaMiddleware:
+    """
+    Routes reads of replica-enabled views to the replica alias.
+
+    Must come after the authentication middlewares so the per-user
+    read-your-writes pin can be checked in ``process_view``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing_state() as state:
+            request.db_routing = state
+            response = self.get_response(request)
+        if state.wrote:
+            self.pin_to_primary(request, response)
+        return response
+
+    async def __acall__(self, request):
+        with routing_state() as state:
+            request.db_routing = state
+            response = await self.get_response(request)
+        if state.wrote:
+            await sync_to_async(self.pin_to_primary)(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in SAFE_METHODS
+                and view_uses_replica(view_func, request.method)
+                and not self.is_pinned(request)):
+            alias = replica_alias()
+            if lag_monitor.is_healthy(alias):
+                request.db_routing.read_alias = alias
+        return None
+
+    def _pin_key(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'db:primary-pin:{user.pk}'
+        return None
+
+    def is_pinned(self, request):
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        key = self._pin_key(request)
+        return bool(key and cache.get(key))
+
+    def pin_to_primary(self, request, response):
+        until = time.time() + self.sticky_seconds
+        response.set_cookie(PIN_COOKIE, f'{until:.0f}', max_age=self.sticky_seconds,
+                            httponly=True, samesite='Lax')
+        key = self._pin_key(request)
+        if key:
+            cache.set(key, 1, self.sticky_seconds)
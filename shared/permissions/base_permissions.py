@@ -1,5 +1,6 @@
 from rest_framework.permissions import BasePermission
 from apps.users.models import UserRole
+from shared.cache import reference
 
 class HasPermission(BasePermission):
     """
@@ -26,7 +27,21 @@ class HasPermission(BasePermission):
         return all(perm in user_permissions for perm in required_permissions)
     
     def get_user_permissions(self, user):
-        """Get all permissions for a user"""
+        """Get all permissions for a user (cached on the user instance for this request)"""
+        cached = getattr(user, '_role_permission_cache', None)
+        if cached is not None:
+            return cached
+
+        # Reference-data cache, invalidated when roles/permissions change
+        permissions = reference.get_or_set(
+            'user-permissions', str(user.pk), lambda: self.load_user_permissions(user)
+        )
+        
+        # The user object lives for one request (batch sub-requests share it)
+        user._role_permission_cache = permissions
+        return permissions
+
+    def load_user_permissions(self, user):
         permissions = set()
         
         for user_role in user.user_roles.filter(is_active=True):
@@ -36,7 +51,7 @@ class HasPermission(BasePermission):
             for resource, action in role_permissions:
                 permissions.add(f"{resource}:{action}")
         
-        return permissions
+        return frozenset(permissions)
 
 class IsOwnerOrAdmin(BasePermission):
     """
@@ -0,0 +1,158 @@
+"""
+In-process publish/subscribe for waking async waiters (long-poll, SSE).
+
+    async with get_broker().subscribe('payment:42') as subscription:
+        message = await subscription.get(timeout=25)   # None on timeout
+
+    get_broker().publish('payment:42', {'status': 'PAID'})   # from any thread
+
+A waiter costs a queue entry, not a query: it sleeps on its event loop until
+a message for its channel arrives or the timeout expires. ``publish`` may be
+called from sync code in any thread (views, model saves); delivery hops onto
+each subscriber's loop with ``call_soon_threadsafe``.
+
+``PUBSUB_BACKEND`` decides how far a message travels:
+
+- ``local``: subscribers of this process only. Enough for one worker (and
+  ``runserver``); with several, a waiter only hears about changes made by its
+  own process and otherwise waits out its timeout.
+- ``redis``: published to Redis (``PUBSUB_REDIS_URL``) and fanned back out by
+  a listener thread in every process, so all workers hear every message.
+  Needs the ``redis`` package.
+
+Messages are JSON-serialisable dicts. Delivery is best effort: a subscriber
+must read the current state after subscribing, then treat messages as hints.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, channel, loop):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+        except RuntimeError:
+            # Loop already closed: the waiter is gone.
+            pass
+
+    async def get(self, timeout=None):
+        """Next message, or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker:
+    def __init__(self):
+        self._subscriptions = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        self._on_subscribe()
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscriptions.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+    def deliver(self, channel, message):
+        """Hand ``message`` to this process's subscribers of ``channel``."""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def _on_subscribe(self):
+        pass
+
+
+class RedisBroker(Broker):
+    """Fan-out through Redis: every process's listener delivers every message locally."""
+
+    def __init__(self, url, prefix='pubsub:'):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImproperlyConfigured("PUBSUB_BACKEND='redis' requires the redis package") from exc
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, channel, message):
+        try:
+            self._client.publish(self.prefix + channel, json.dumps(message))
+        except Exception:
+            # Redis down: at least wake this process's waiters.
+            logger.exception('Pub/sub publish to Redis failed, delivering locally')
+            self.deliver(channel, message)
+
+    def _on_subscribe(self):
+        # Started by the first subscriber: processes that never wait don't listen.
+        if self._listener is None:
+            with self._listener_lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, name='pubsub-listener', daemon=True)
+                    self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + '*')
+                for item in pubsub.listen():
+                    channel = item['channel'].decode()[len(self.prefix):]
+                    self.deliver(channel, json.loads(item['data']))
+            except Exception:
+                logger.exception('Pub/sub listener lost its Redis connection, reconnecting')
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'PUBSUB_BACKEND', 'local')
+                if backend == 'redis':
+                    _broker = RedisBroker(settings.PUBSUB_REDIS_URL)
+                else:
+                    _broker = Broker()
+    return _broker
@@ -0,0 +1,94 @@
+"""
+Token bucket storage for ``shared.throttling``.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+second; a request takes one token or is refused with the time until the next
+one. ``consume()`` does the refill, the check and the update in one atomic
+step, so concurrent requests of one client can never spend the same token.
+
+- ``MemoryBucketStore``: a dict under a lock. Atomic within one process, so
+  limits are per worker; the stand-in for tests and ``runserver``.
+- ``RedisBucketStore``: one Lua script per request, atomic across every worker
+  and host sharing the Redis server. Needs the ``redis`` package.
+
+A bucket that has refilled completely is the same as no bucket, so idle
+buckets are dropped (memory) or expire (Redis) once full.
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class MemoryBucketStore:
+    def __init__(self, max_buckets=50000):
+        self.max_buckets = max_buckets
+        self._buckets = {}  # key -> (tokens, updated_at, seconds until full)
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        """``(allowed, wait_seconds)`` after taking one token from ``key``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, 0))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, (capacity - tokens) / rate)
+            if len(self._buckets) > self.max_buckets:
+                self._prune(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _prune(self, now):
+        for key, (_, updated_at, refill) in list(self._buckets.items()):
+            if now - updated_at >= refill:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# KEYS[1] bucket; ARGV capacity, rate (tokens/s). Server time keeps every
+# worker on the same clock. Returns {allowed, wait in ms}.
+_CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, wait}
+"""
+
+
+class RedisBucketStore:
+    def __init__(self, url, prefix='throttle'):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImproperlyConfigured("THROTTLE_STORE='redis' requires the redis package") from exc
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(_CONSUME_SCRIPT)
+
+    def consume(self, key, capacity, rate):
+        allowed, wait_ms = self._consume(keys=[f'{self.prefix}:{key}'], args=[capacity, rate])
+        return bool(allowed), wait_ms / 1000
+
+    def clear(self):
+        for key in self._client.scan_iter(f'{self.prefix}:*'):
+            self._client.delete(key)
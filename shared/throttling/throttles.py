@@ -0,0 +1,98 @@
+"""
+Token bucket throttling for the DRF API.
+
+Every request takes a token from the bucket of its route class and client:
+the user for authenticated requests, the client IP otherwise (``REMOTE_ADDR``,
+or the ``X-Forwarded-For`` entry added by the last of
+``REST_FRAMEWORK['NUM_PROXIES']`` trusted proxies). Views declare
+their route class the same way they declare query budgets::
+
+    class AppointmentViewSet(ModelViewSet):
+        throttle_scopes = {'list': 'search', 'create': 'booking'}
+
+    @throttle_scope('reporting')
+    @api_view(['GET'])
+    def appointment_statistics(request):
+        ...
+
+Everything else is in the ``default`` class. Rates come from
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` (``'20/min'``: a bucket of 20
+tokens refilled at 20 per minute, so a client can burst up to 20 and then
+sustain the rate); a class without a rate is not limited. Refused requests get
+429 with ``Retry-After`` and are counted in ``http_requests_throttled_total``.
+
+Buckets live in ``THROTTLE_STORE``: ``memory`` (per process) or ``redis``
+(shared by all workers, ``THROTTLE_REDIS_URL``); see ``shared.throttling.stores``.
+"""
+import math
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from shared.metrics.instruments import record_throttled
+
+from .stores import MemoryBucketStore, RedisBucketStore
+
+DEFAULT_SCOPE = 'default'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        backend = getattr(settings, 'THROTTLE_STORE', 'memory')
+        if backend == 'redis':
+            _store = RedisBucketStore(settings.THROTTLE_REDIS_URL)
+        else:
+            _store = MemoryBucketStore()
+    return _store
+
+
+def parse_rate(rate):
+    """``'20/min'`` -> ``(capacity 20, 20/60 tokens per second)``."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period.strip()[0]]
+
+
+def throttle_scope(scope):
+    """Put a function-based view in route class ``scope`` (apply above ``@api_view``)."""
+    def decorator(view_func):
+        view_func.cls.throttle_scope = scope
+        return view_func
+    return decorator
+
+
+def get_scope(view):
+    scopes = getattr(view, 'throttle_scopes', None) or {}
+    action = getattr(view, 'action', None)
+    if action in scopes:
+        return scopes[action]
+    return getattr(view, 'throttle_scope', None) or DEFAULT_SCOPE
+
+
+class TokenBucketThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        scope = get_scope(view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if not rate:
+            return True
+        capacity, per_second = parse_rate(rate)
+
+        user = request.user
+        if user and user.is_authenticated:
+            client, ident = 'user', user.pk
+        else:
+            client, ident = 'anon', self.get_ident(request)
+
+        allowed, self._wait = get_store().consume(f'{scope}:{client}:{ident}', capacity, per_second)
+        if not allowed:
+            record_throttled(scope, client)
+        return allowed
+
+    def wait(self):
+        # Whole seconds: Retry-After does not take fractions.
+        return math.ceil(self._wait)
@@ -0,0 +1,143 @@
+"""
+Helpers for the async (ASGI) read paths mounted under ``/api/async/``.
+
+Async views run on the event loop instead of occupying a worker thread, which
+matters for long-poll and SSE endpoints that mostly wait. They bypass DRF's
+sync request cycle, so method checks, authentication, pagination and error
+rendering are reproduced here with the same response shapes the sync
+endpoints return; serializers and filter backends are reused as-is.
+
+    @async_api_view(authenticated=True)
+    async def today_appointments(request):
+        rows = [a async for a in queryset]
+        return json_response(AppointmentSerializer(rows, many=True).data)
+
+Under WSGI these views still work (Django runs them in a one-off event loop),
+they just don't save a thread.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def render(data):
+    """Encode with the first configured DRF renderer, exactly as the sync API does."""
+    return api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data)
+
+
+def dumps(data):
+    return render(data).decode()
+
+
+def json_response(data, status=200):
+    return HttpResponse(render(data), status=status, content_type='application/json')
+
+
+def _exception_response(exc):
+    # Same body as rest_framework.views.exception_handler.
+    detail = exc.detail
+    data = detail if isinstance(detail, (list, dict)) else {'detail': detail}
+    return json_response(data, status=exc.status_code)
+
+
+async def aget_user(request):
+    """
+    The request user without touching the DB from the event loop.
+
+    ``JWTAuthMiddleware`` has already resolved Bearer tokens (in a thread);
+    the lazy session user is evaluated in a thread here.
+    """
+    if getattr(request, 'token', None) is not None:
+        return request.user
+    return await sync_to_async(_evaluate_user)(request)
+
+
+def _evaluate_user(request):
+    user = request.user
+    user.is_authenticated  # forces the SimpleLazyObject session lookup
+    return user
+
+
+def async_api_view(methods=('GET',), authenticated=False):
+    """Method check, optional authentication and APIException rendering for an async view."""
+    methods = [method.upper() for method in methods]
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = json_response(
+                    {'detail': f'Method "{request.method}" not allowed.'}, status=405
+                )
+                response['Allow'] = ', '.join(methods)
+                return response
+            if authenticated:
+                user = await aget_user(request)
+                if not user.is_authenticated:
+                    return json_response(
+                        {'detail': 'Authentication credentials were not provided.'}, status=401
+                    )
+                request.user = user
+            try:
+                return await view_func(request, *args, **kwargs)
+            except APIException as exc:
+                return _exception_response(exc)
+        return wrapper
+    return decorator
+
+
+def viewset_for(viewset_class, request, action):
+    """An instance of ``viewset_class`` bound to ``request``, for reusing its filter backends."""
+    view = viewset_class(action=action, format_kwarg=None, args=(), kwargs={})
+    view.request = Request(request)
+    view.headers = {}
+    return view
+
+
+async def afilter_queryset(view):
+    # Filter backends are lazy except for form validation (ModelChoiceFilter
+    # looks the value up), so build the queryset in a thread once.
+    return await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """``PageNumberPagination`` whose count and page fetch use the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        count = await queryset.acount()
+        # The paginator only needs the count to validate the page number.
+        paginator = self.django_paginator_class(range(count), page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        bottom = (self.page.number - 1) * paginator.per_page
+        self.page.object_list = [obj async for obj in queryset[bottom:bottom + paginator.per_page]]
+        return self.page.object_list
+
+    def get_paginated_data(self, data):
+        return {
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+async def alist(viewset_class, request):
+    """Async equivalent of ``ListModelMixin.list`` for a read-only viewset action."""
+    view = viewset_for(viewset_class, request, 'list')
+    queryset = await afilter_queryset(view)
+    paginator = AsyncPageNumberPagination()
+    page = await paginator.apaginate_queryset(queryset, view.request)
+    serializer = view.get_serializer(page, many=True)
+    return json_response(paginator.get_paginated_data(serializer.data))
@@ -0,0 +1,256 @@
+"""
+``POST /api/batch/``: several API calls in one round trip.
+
+Each sub-request is resolved against the URL conf and run in-process with the
+caller's already authenticated user (and token), so a batch of N calls pays
+for authentication once and role permissions are loaded once::
+
+    POST /api/batch/
+    {
+        "parallel": true,
+        "requests": [
+            {"id": "departments", "method": "GET", "path": "/api/departments/"},
+            {"id": "doctors", "method": "GET", "path": "/api/doctors/?department=3"},
+            {"method": "POST", "path": "/api/appointments/", "body": {...}}
+        ]
+    }
+
+    -> {"results": [{"id": "departments", "status": 200, "headers": {...}, "body": {...}}, ...]}
+
+Every sub-request gets its own status; one failing does not stop the others
+and nothing is rolled back across them. Results come back in request order.
+With ``parallel`` consecutive GET/HEAD sub-requests run concurrently (up to
+``BATCH_MAX_WORKERS`` threads); a write waits for everything before it and
+blocks everything after it. Sub-requests go straight to the view: middlewares
+do not run for them, so they are not routed to the read replica and are not
+counted separately in the request metrics.
+"""
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connection, connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+SAFE_METHODS = ('GET', 'HEAD')
+API_PREFIX = '/api/'
+BATCH_PATH = '/api/batch/'
+RESULT_HEADERS = ('ETag', 'Last-Modified', 'Location', 'Cache-Control', 'Retry-After')
+# Headers a sub-request may not set for itself.
+RESERVED_HEADERS = ('HTTP_AUTHORIZATION', 'HTTP_COOKIE', 'HTTP_HOST')
+
+
+def _max_requests():
+    return getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+
+
+def _max_workers():
+    return getattr(settings, 'BATCH_MAX_WORKERS', 4)
+
+
+def parse_batch(data):
+    """``(items, parallel)`` from the request body; raises ``ValueError`` with the message for the client."""
+    parallel = False
+    if isinstance(data, dict):
+        parallel = bool(data.get('parallel', False))
+        data = data.get('requests')
+    if not isinstance(data, list) or not data:
+        raise ValueError('Cần danh sách requests')
+    if len(data) > _max_requests():
+        raise ValueError(f'Tối đa {_max_requests()} request mỗi batch')
+
+    items = []
+    for position, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            raise ValueError(f'Request #{position} không hợp lệ')
+        method = str(entry.get('method', 'GET')).upper()
+        path = entry.get('path')
+        if method not in METHODS:
+            raise ValueError(f'Request #{position}: method {method} không được hỗ trợ')
+        if not isinstance(path, str) or not path.startswith(API_PREFIX):
+            raise ValueError(f'Request #{position}: path phải bắt đầu bằng {API_PREFIX}')
+        if path.split('?', 1)[0].rstrip('/') == BATCH_PATH.rstrip('/'):
+            raise ValueError(f'Request #{position}: không thể lồng batch')
+        headers = entry.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise ValueError(f'Request #{position}: headers không hợp lệ')
+        items.append({
+            'id': entry.get('id', position),
+            'method': method,
+            'path': path,
+            'body': entry.get('body'),
+            'headers': headers,
+        })
+    return items, parallel
+
+
+def build_request(parent, user, auth, item):
+    """A Django request for ``item`` carrying the parent's client info and credentials."""
+    request = HttpRequest()
+    path, _, query = item['path'].partition('?')
+    body = b'' if item['body'] is None else json.dumps(item['body']).encode()
+
+    # Conditional headers belong to the batch call itself, not to its parts.
+    request.META = {
+        key: value for key, value in parent.META.items()
+        if not key.startswith('HTTP_IF_') and key not in ('CONTENT_TYPE', 'CONTENT_LENGTH')
+    }
+    for name, value in item['headers'].items():
+        key = 'HTTP_' + str(name).upper().replace('-', '_')
+        if key not in RESERVED_HEADERS:
+            request.META[key] = str(value)
+    request.META.update({
+        'REQUEST_METHOD': item['method'],
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+    })
+    request.method = item['method']
+    request.path = request.path_info = path
+    request.GET = QueryDict(query)
+    request.COOKIES = parent.COOKIES
+    request._body = body
+    request._stream = io.BytesIO(body)
+    request._read_started = False
+    if hasattr(parent, 'session'):
+        request.session = parent.session
+    if hasattr(parent, 'db_routing'):
+        request.db_routing = parent.db_routing
+
+    # Already authenticated: DRF uses these instead of re-validating the token.
+    request.user = user
+    request._force_auth_user = user
+    request._force_auth_token = auth
+    if hasattr(parent, 'token'):
+        request.token = parent.token
+    return request
+
+
+def _response_body(response):
+    # DRF data goes into the batch response as-is, without encoding it twice.
+    data = getattr(response, 'data', None)
+    if data is not None:
+        return data
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+    content = response.content
+    if not content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content)
+    return content.decode(response.charset, errors='replace')
+
+
+def _error(item, status_code, message):
+    return {'id': item['id'], 'status': status_code, 'headers': {}, 'body': {'detail': message}}
+
+
+def run_one(request, item):
+    """Run one sub-request; always returns a result, never raises."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return _error(item, status.HTTP_404_NOT_FOUND, 'Không tìm thấy endpoint')
+    request.resolver_match = match
+
+    try:
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(request, *match.args, **match.kwargs)
+        else:
+            response = match.func(request, *match.args, **match.kwargs)
+        if getattr(response, 'streaming', False):
+            return _error(item, status.HTTP_400_BAD_REQUEST, 'Endpoint streaming không hỗ trợ trong batch')
+        body = _response_body(response)
+    except Http404:
+        return _error(item, status.HTTP_404_NOT_FOUND, 'Không tìm thấy')
+    except PermissionDenied:
+        return _error(item, status.HTTP_403_FORBIDDEN, 'Không có quyền truy cập')
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', item['method'], item['path'])
+        return _error(item, status.HTTP_500_INTERNAL_SERVER_ERROR, 'Lỗi máy chủ')
+
+    return {
+        'id': item['id'],
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RESULT_HEADERS if response.has_header(name)},
+        'body': body,
+    }
+
+
+def _run_in_worker(request, item):
+    try:
+        return run_one(request, item)
+    finally:
+        # Pool threads open their own connections; don't leave them behind.
+        connections.close_all()
+
+
+def run_batch(requests, items, parallel):
+    """Results for ``items`` in order; runs of reads go to a thread pool when ``parallel``."""
+    results = []
+    pending = []
+
+    def flush():
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(_max_workers(), len(pending))) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, _run_in_worker, request, item)
+                    for request, item in pending
+                ]
+                results.extend(future.result() for future in futures)
+        else:
+            results.extend(run_one(request, item) for request, item in pending)
+        pending.clear()
+
+    # Other threads cannot see writes made inside an open transaction.
+    parallel = parallel and _max_workers() > 1 and not connection.in_atomic_block
+    for request, item in zip(requests, items):
+        if parallel and item['method'] in SAFE_METHODS:
+            pending.append((request, item))
+            continue
+        flush()
+        results.append(run_one(request, item))
+    flush()
+    return results
+
+
+@extend_schema(
+    summary="Batch Requests",
+    description=(
+        "Run several API requests in one call, with the caller's credentials. "
+        "Each result carries its own status; `parallel` runs consecutive GETs concurrently."
+    ),
+    request=dict,
+    responses={200: dict},
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch_view(request):
+    """
+    Batch Requests
+
+    Results are returned in request order, one per sub-request.
+    """
+    try:
+        items, parallel = parse_batch(request.data)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    parent = request._request
+    sub_requests = [build_request(parent, request.user, request.auth, item) for item in items]
+    return Response({'results': run_batch(sub_requests, items, parallel)})
@@ -0,0 +1,158 @@
+"""
+Conditional GET (ETag / Last-Modified) for ModelViewSets.
+
+``list`` and ``retrieve`` first run one aggregate probe over the filtered
+queryset, on its own table: the row count and ``Max(updated_at)``. Relations in
+``etag_related`` whose data the serializer renders are not joined into the
+probe; each related model carries a version token (``shared.cache.reference``)
+that changes when one of its rows is saved or deleted. The ETag hashes the
+probe and those versions with the request URL (page, filters, ``?fields=``),
+the serializer class and ``etag_version``; ``If-None-Match`` /
+``If-Modified-Since`` matching it returns 304 before anything is loaded or
+serialized. Collections only get an ETag; details of views without
+``etag_related`` also get ``Last-Modified``.
+
+    class DoctorProfileViewSet(ConditionalGetMixin, ModelViewSet):
+        # doctor_name comes from the user row, department_name from the department
+        etag_related = ['user', 'department']
+
+    # in the app's ready()
+    conditional.track(Department)
+    conditional.track(get_user_model(), ignore_fields=['last_login'])
+
+A related change made by another worker reaches this worker's ETags within
+``REFERENCE_CACHE_LOCAL_TTL`` seconds. Bump ``etag_version`` when the
+serializer output changes shape. Views whose output depends on today's date
+(ages, validity flags) set ``etag_vary_by_date = True``. Writes made with
+``QuerySet.update()`` bypass ``auto_now`` and the signals, and therefore the
+ETag; only opt in views whose rows (and ``etag_related`` rows) are saved
+through ``save()``.
+"""
+import datetime
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from shared.cache import reference
+
+_tracked = set()
+
+
+def _namespace(model):
+    return f'etag:{model._meta.label_lower}'
+
+
+def track(*models, ignore_fields=()):
+    """Version ``models`` for the ETags of views listing them in ``etag_related``."""
+    for model in models:
+        reference.register(_namespace(model), model, ignore_fields=ignore_fields)
+        _tracked.add(model)
+
+
+def _timestamp_field(model):
+    for name in ('updated_at', 'created_at'):
+        try:
+            model._meta.get_field(name)
+            return name
+        except FieldDoesNotExist:
+            continue
+    return None
+
+
+def _related_model(model, path):
+    for name in path.split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+class ConditionalGetMixin:
+    etag_version = 1
+    etag_related = ()
+    etag_vary_by_date = False
+
+    def get_validator_aggregates(self):
+        aggregates = {'rows': Count('pk')}
+        field = _timestamp_field(self.get_queryset().model)
+        if field:
+            aggregates['ts'] = Max(field)
+        return aggregates
+
+    def get_related_versions(self):
+        model = self.get_queryset().model
+        versions = []
+        for path in self.etag_related:
+            related_model = _related_model(model, path)
+            if related_model not in _tracked:
+                raise ImproperlyConfigured(
+                    f'{type(self).__name__}.etag_related: call shared.utils.conditional.track('
+                    f'{related_model.__name__}) in the app\'s ready()'
+                )
+            versions.append((path, reference.version(_namespace(related_model))))
+        return versions
+
+    def get_validators(self, queryset):
+        """``(etag, last_modified, row_count)`` for the rows in ``queryset``."""
+        probe = queryset.order_by().aggregate(**self.get_validator_aggregates())
+        related = self.get_related_versions()
+        last_modified = probe.get('ts')
+
+        extra = ()
+        if self.etag_vary_by_date:
+            today = timezone.localdate()
+            extra = (today.isoformat(),)
+            midnight = timezone.make_aware(datetime.datetime.combine(today, datetime.time.min))
+            last_modified = max(last_modified, midnight) if last_modified else midnight
+        if related:
+            # A related change moves only its version, not a timestamp
+            last_modified = None
+
+        serializer_class = self.get_serializer_class()
+        key = repr((
+            self.request.get_full_path(),
+            f'{serializer_class.__module__}.{serializer_class.__qualname__}',
+            self.etag_version,
+            sorted((k, v.isoformat() if hasattr(v, 'isoformat') else v) for k, v in probe.items()),
+            related,
+            extra,
+        ))
+        etag = 'W/"%s"' % hashlib.sha1(key.encode()).hexdigest()
+        return etag, int(last_modified.timestamp()) if last_modified else None, probe['rows']
+
+    def _conditional(self, request, validators, handler, *args, **kwargs):
+        etag, last_modified, _ = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            if not response.has_header('Cache-Control'):
+                # Cacheable, but always revalidated.
+                response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag, _, rows = self.get_validators(self.filter_queryset(self.get_queryset()))
+        # No Last-Modified on collections: a deleted row leaves the newest
+        # timestamp unchanged, only the count in the ETag notices.
+        validators = (etag, None, rows)
+        return self._conditional(request, validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+            validators = self.get_validators(queryset)
+        except (TypeError, ValueError, ValidationError):
+            # Malformed pk: let get_object() produce the 404.
+            return super().retrieve(request, *args, **kwargs)
+        if not validators[2]:
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, validators, super().retrieve, *args, **kwargs)
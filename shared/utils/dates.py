@@ -0,0 +1,24 @@
+"""
+Local calendar days as half-open datetime ranges.
+
+``created_at__date=day`` converts every row's timestamp to the local timezone
+before comparing, so the database cannot use an index on the column. Filter
+on the instants the local day starts and ends instead::
+
+    start, end = local_day_range(date_from, date_to)
+    queryset.filter(created_at__gte=start, created_at__lt=end)
+"""
+import datetime
+
+from django.utils import timezone
+
+
+def local_midnight(day):
+    """Aware datetime of ``day`` 00:00 in the current timezone."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def local_day_range(first_day, last_day=None):
+    """``(start, end)`` covering ``first_day`` through ``last_day`` inclusive; ``end`` is exclusive."""
+    last_day = first_day if last_day is None else last_day
+    return local_midnight(first_day), local_midnight(last_day + datetime.timedelta(days=1))
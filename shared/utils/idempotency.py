@@ -0,0 +1,178 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+A client that may retry a POST sends a unique key with it; every retry with
+the same key gets the first execution's response back instead of creating a
+second record::
+
+    class AppointmentViewSet(ModelViewSet):
+        @idempotent
+        def create(self, request, *args, **kwargs):
+            return super().create(request, *args, **kwargs)
+
+Per key the store (the default cache) holds one compact record: a fingerprint
+of the request (method, path, user, body), then either ``pending`` or the
+final status, ``Location`` and JSON body. Records expire after
+``IDEMPOTENCY_TTL`` seconds.
+
+- The first request claims the key with an atomic ``cache.add``.
+- A duplicate arriving while the first one runs waits up to
+  ``IDEMPOTENCY_WAIT_SECONDS`` for it, then gets the stored response
+  (``Idempotent-Replayed: true``), or 409 if it is still running.
+- Reusing a key for a different request is rejected with 422.
+- 5xx responses and unhandled exceptions release the key so the retry runs
+  again; other responses (validation errors included) are replayed.
+
+Requests without the header behave as before. A claim left by a crashed worker
+expires after ``IDEMPOTENCY_LOCK_SECONDS``. Atomicity of the claim is the cache
+backend's: memcached, redis and locmem are atomic, the file backend is not.
+
+The records must be visible to every worker: with several worker processes
+(``WEB_CONCURRENCY``, set by ``config/gunicorn.conf.py``) the default cache
+has to be memcached or redis. locmem keeps one store per process, so a retry
+that reaches another worker runs again; the first keyed request of each
+process logs an error when that is the case.
+"""
+import hashlib
+import json
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+PENDING = 'pending'
+
+logger = logging.getLogger(__name__)
+_store_checked = False
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _check_store():
+    """Log once per process when the records are not shared by the workers."""
+    global _store_checked
+    if _store_checked:
+        return
+    _store_checked = True
+    workers = _setting('WEB_CONCURRENCY', 1)
+    if workers > 1 and isinstance(caches['default'], LocMemCache):
+        logger.error(
+            'Idempotency-Key records are kept in a per-process locmem cache with %d workers: '
+            'retries reaching another worker are executed again. Set CACHE_BACKEND to memcached or redis.',
+            workers,
+        )
+
+
+def fingerprint(request):
+    user = request.user
+    parts = [
+        request.method,
+        request.path,
+        str(user.pk) if user and user.is_authenticated else '',
+        request.body.decode('utf-8', errors='replace'),
+    ]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+
+def _cache_key(request, key):
+    user = request.user
+    owner = str(user.pk) if user and user.is_authenticated else 'anon'
+    digest = hashlib.sha1(f'{request.path}|{owner}|{key}'.encode()).hexdigest()
+    return f'idempotency:{digest}'
+
+
+def _replay(record):
+    _, status_code, location, body = record
+    response = Response(json.loads(body) if body else None, status=status_code)
+    if location:
+        response['Location'] = location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _in_progress():
+    response = Response(
+        {'error': 'Request với Idempotency-Key này đang được xử lý'},
+        status=status.HTTP_409_CONFLICT,
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def _wait_for(cache_key, request_fingerprint, deadline):
+    """
+    The record for ``cache_key`` once it is finished, ``None`` if it was released.
+
+    Returns early for another request's record, and still pending at ``deadline``.
+    """
+    delay = 0.05
+    while True:
+        record = cache.get(cache_key)
+        if record is None or record[1] != PENDING or record[0] != request_fingerprint:
+            return record
+        if time.monotonic() >= deadline:
+            return record
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def idempotent(view_method):
+    """Make a viewset action honour the ``Idempotency-Key`` header."""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': 'Idempotency-Key quá dài'}, status=status.HTTP_400_BAD_REQUEST)
+        _check_store()
+
+        cache_key = _cache_key(request, key)
+        request_fingerprint = fingerprint(request)
+        lock_seconds = _setting('IDEMPOTENCY_LOCK_SECONDS', 60)
+
+        if not cache.add(cache_key, (request_fingerprint, PENDING, None, None), lock_seconds):
+            deadline = time.monotonic() + _setting('IDEMPOTENCY_WAIT_SECONDS', 10)
+            record = _wait_for(cache_key, request_fingerprint, deadline)
+            if record is not None and record[0] != request_fingerprint:
+                return Response(
+                    {'error': 'Idempotency-Key đã được dùng cho một request khác'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if record is not None and record[1] == PENDING:
+                return _in_progress()
+            if record is not None:
+                return _replay(record)
+            # Released by a failed first attempt: run it now.
+            if not cache.add(cache_key, (request_fingerprint, PENDING, None, None), lock_seconds):
+                return _in_progress()
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except APIException as exc:
+            # Validation errors are answers too: render them now so they are stored.
+            response = self.handle_exception(exc)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+            return response
+        data = getattr(response, 'data', None)
+        body = json.dumps(data, cls=DjangoJSONEncoder) if data is not None else ''
+        record = (request_fingerprint, response.status_code, response.get('Location'), body)
+        cache.set(cache_key, record, _setting('IDEMPOTENCY_TTL', 86400))
+        return response
+    return wrapper
@@ -0,0 +1,35 @@
+"""
+orjson-backed JSON parser for DRF, falling back to the stdlib parser when
+orjson is not installed, rejects the body, or the body has integers too long
+for 64 bits (orjson would silently turn them into floats), so error messages
+and edge cases stay those of ``JSONParser``.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+_LONG_NUMBER_RE = re.compile(rb'\d{20,}')
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if _LONG_NUMBER_RE.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            if encoding.lower().replace('-', '') != 'utf8':
+                return orjson.loads(body.decode(encoding))
+            return orjson.loads(body)
+        except (orjson.JSONDecodeError, UnicodeDecodeError, LookupError):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
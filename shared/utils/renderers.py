@@ -0,0 +1,52 @@
+"""
+orjson-backed JSON renderer for DRF.
+
+Output is byte-for-byte what ``rest_framework.renderers.JSONRenderer``
+produces with the default settings (UTF-8, compact, ``Z`` for UTC,
+``\\u2028``/``\\u2029`` escaped). Types orjson does not know natively
+(``Decimal``, lazy translation strings, querysets...) go through DRF's own
+``JSONEncoder.default``, so e.g. a raw ``Decimal`` aggregate still renders as
+a number, as before; serializer ``DecimalField``s are already strings.
+
+Falls back to the stdlib renderer when orjson is not installed, when the
+client asks for indentation other than 2 or for non-default JSON settings
+(``UNICODE_JSON``/``COMPACT_JSON`` off), and for values orjson rejects
+(integers beyond 64 bits).
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+def orjson_dumps(data, indent=None):
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    ret = orjson.dumps(data, default=_default, option=options)
+    return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson_dumps(data, indent)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,195 @@
+"""
+Sparse fieldsets for read endpoints: ``?fields=`` and ``?expand=``.
+
+    GET /api/prescriptions/?fields=id,prescription_number,patient_name
+    GET /api/prescriptions/<id>/?fields=id,items.drug_name,items.quantity
+    GET /api/appointments/?fields=id,appointment_number,patient&expand=patient
+
+``fields`` keeps only the listed fields (dotted names reach into nested
+serializers); unknown names are ignored. ``expand`` swaps a primary-key field
+for the nested serializer declared in ``Meta.expandable_fields``, the way
+``PatientSummarySerializer`` stands in for a full patient.
+
+The queryset follows the fields: when either parameter is present the
+viewset's ``select_related``/``prefetch_related`` are rebuilt from the fields
+actually rendered, so relations nobody asked for are never joined or
+prefetched. ``Meta.field_annotations`` are added on every safe request, but
+only for rendered fields. Without the parameters responses and joins are
+unchanged.
+
+Serializers opt in with ``SparseFieldsetSerializerMixin``::
+
+    class PrescriptionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+        class Meta:
+            ...
+            # relations read by SerializerMethodFields / model properties
+            field_relations = {'dispensing_status': ['dispensing_records']}
+
+viewsets with ``SparseFieldsetViewMixin`` (before ``ModelViewSet``).
+Relations reached through a field's ``source`` (``patient.full_name``,
+nested serializers) are derived automatically.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_fields(value):
+    """``'id,items.drug_name,items.quantity'`` -> ``{'id': {}, 'items': {'drug_name': {}, 'quantity': {}}}``."""
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree or None
+
+
+def parse_expand(value):
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Accepts ``fields`` (a ``parse_fields`` tree) and ``expand`` (a set of names).
+
+    ``Meta.expandable_fields``: ``{name: SerializerClass}`` or
+    ``{name: (SerializerClass, kwargs)}``.
+    ``Meta.field_relations``: ``{name: ['relation__path', ...]}`` for fields whose
+    relations can't be read from ``source``.
+    ``Meta.field_annotations``: ``{name: {'alias': expression}}``.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self._requested_fields = fields
+        self._expand = expand or set()
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        meta = getattr(self, 'Meta', None)
+
+        for name, spec in getattr(meta, 'expandable_fields', {}).items():
+            if name in self._expand and name in fields:
+                serializer_class, kwargs = spec if isinstance(spec, tuple) else (spec, {})
+                fields[name] = serializer_class(read_only=True, **kwargs)
+
+        requested = self._requested_fields
+        if requested:
+            fields = {name: field for name, field in fields.items() if name in requested}
+            for name, field in fields.items():
+                nested = field.child if isinstance(field, serializers.ListSerializer) else field
+                if requested[name] and isinstance(nested, SparseFieldsetSerializerMixin):
+                    nested._requested_fields = requested[name]
+        return fields
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None):
+        """``queryset`` with only the joins, prefetches and annotations ``fields``/``expand`` need."""
+        serializer = cls(fields=fields, expand=expand)
+        select, prefetch = set(), set()
+        _collect_relations(serializer, queryset.model, '', False, select, prefetch)
+
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return cls.annotate_queryset(queryset, serializer.fields)
+
+    @classmethod
+    def annotate_queryset(cls, queryset, field_names=None):
+        """Add ``Meta.field_annotations`` for ``field_names`` (all fields when ``None``)."""
+        annotations = {}
+        for name, exprs in getattr(cls.Meta, 'field_annotations', {}).items():
+            if field_names is None or name in field_names:
+                annotations.update(exprs)
+        return queryset.annotate(**annotations) if annotations else queryset
+
+
+def _relation_hops(model, attrs):
+    """Leading ``attrs`` that are model relations, and whether any of them is to-many."""
+    hops, many = [], False
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        hops.append(attr)
+        many = many or field.one_to_many or field.many_to_many
+        model = field.related_model
+    return hops, many, model
+
+
+def _add(prefix, hops, many, select, prefetch):
+    if hops:
+        (prefetch if many else select).add(prefix + '__'.join(hops))
+
+
+def _collect_relations(serializer, model, prefix, many, select, prefetch):
+    meta = getattr(serializer, 'Meta', None)
+    declared = getattr(meta, 'field_relations', {})
+
+    for name, field in serializer.fields.items():
+        for path in declared.get(name, ()):
+            hops, to_many, _ = _relation_hops(model, path.split('__'))
+            _add(prefix, hops, many or to_many, select, prefetch)
+
+        if field.source == '*' or field.write_only:
+            continue
+        attrs = field.source.split('.')
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.BaseSerializer):
+            hops, to_many, related_model = _relation_hops(model, attrs)
+            if not hops:
+                continue
+            to_many = many or to_many or isinstance(field, serializers.ListSerializer)
+            _add(prefix, hops, to_many, select, prefetch)
+            path = prefix + '__'.join(hops) + '__'
+            _collect_relations(nested, related_model, path, to_many, select, prefetch)
+        else:
+            # The last attribute is the value itself; a bare FK renders its pk
+            # without a join.
+            hops, to_many, _ = _relation_hops(model, attrs[:-1])
+            _add(prefix, hops, many or to_many, select, prefetch)
+
+
+class SparseFieldsetViewMixin:
+    """Applies ``?fields=``/``?expand=`` on safe requests to serializers using the mixin above."""
+
+    def _sparse_fieldset(self):
+        """``(serializer_class, fields, expand)`` for safe requests to opted-in serializers, else ``None``."""
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsetSerializerMixin):
+            return None
+        fields = parse_fields(request.query_params.get(FIELDS_PARAM))
+        expand = parse_expand(request.query_params.get(EXPAND_PARAM))
+        return serializer_class, fields, expand
+
+    def get_serializer(self, *args, **kwargs):
+        sparse = self._sparse_fieldset()
+        if sparse is not None:
+            _, kwargs['fields'], kwargs['expand'] = sparse
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sparse = self._sparse_fieldset()
+        if sparse is None:
+            return queryset
+        serializer_class, fields, expand = sparse
+        if fields is None and expand is None:
+            return serializer_class.annotate_queryset(queryset)
+        return serializer_class.optimize_queryset(queryset, fields, expand)
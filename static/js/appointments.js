@@ -204,23 +204,40 @@ async function loadAppointments(page = 1) {
 async function loadFormData() {
     try {
 
+        // Reception: require department before doctors; Others: preload all doctors
+        const isReception = (JSON.parse(localStorage.getItem('user_data') || '{}').user_type === 'RECEPTION');
+
+        // Departments, patients (and doctors) in one round trip
+        const requests = [
+            { id: 'departments', method: 'GET', path: '/api/departments/' },
+            { id: 'patients', method: 'GET', path: '/api/patients/' },
+        ];
+        if (!isReception) {
+            requests.push({ id: 'doctors', method: 'GET', path: '/api/doctors/' });
+        }
+        const results = await window.HospitalApp.batch(requests);
+        const listOf = (id) => {
+            const result = results[id];
+            if (!result || result.status !== 200) {
+                console.error(`❌ Error loading ${id}:`, result && result.body);
+                return [];
+            }
+            return result.body.results || result.body;
+        };
         
         // Load departments
-        const deptResponse = await axios.get('/api/departments/');
-        populateSelectOptions('#department-filter', deptResponse.data.results || deptResponse.data, 'id', 'name');
-        populateSelectOptions('#add-department', deptResponse.data.results || deptResponse.data, 'id', 'name');
+        const departments = listOf('departments');
+        populateSelectOptions('#department-filter', departments, 'id', 'name');
+        populateSelectOptions('#add-department', departments, 'id', 'name');
         
         // Load patients
-        const patientResponse = await axios.get('/api/patients/');
-        const patients = patientResponse.data.results || patientResponse.data;
+        const patients = listOf('patients');
         populateSelectOptions('#add-patient', patients, 'id', (p) => {
             const phone = p.phone_number || 'N/A';
             const name = p.full_name || 'Chưa rõ tên';
             return `${phone} - ${name}`;
         });
         
-        // Reception: require department before doctors; Others: preload all doctors
-        const isReception = (JSON.parse(localStorage.getItem('user_data') || '{}').user_type === 'RECEPTION');
         if (isReception) {
             const addDoctor = document.querySelector('#add-doctor');
             if (addDoctor) {
@@ -229,8 +246,7 @@ async function loadFormData() {
             }
         } else {
             // Load doctors
-            const doctorResponse = await axios.get('/api/doctors/');
-            const doctors = doctorResponse.data.results || doctorResponse.data;
+            const doctors = listOf('doctors');
             populateSelectOptions('#add-doctor', doctors, 'id', (doctor) => {
                 const fullName = doctor.doctor_name || 'N/A';
                 return `${fullName} - ${doctor.department_name || 'Chưa phân khoa'}`;
@@ -510,7 +526,7 @@ async function handleAddAppointment(e) {
         const formData = new FormData(e.target);
         const data = Object.fromEntries(formData.entries());
 
-        const response = await axios.post('/api/appointments/', data);
+        const response = await window.HospitalApp.idempotentPost('/api/appointments/', data);
         
         showAlert('Đặt lịch hẹn thành công!', 'success');
         
@@ -37,68 +37,34 @@ function initializeDashboard() {
 
 async function loadAllDashboardData() {
     try {
-        // Load data in parallel for better performance
-        await Promise.all([
-            loadDashboardStats(),
-            loadRecentPatients(),
-            loadRecentActivities(),
-            loadChartsData()
-        ]);
+        // One request for every widget (cached server-side, revalidated with ETag)
+        const widgets = await loadDashboardSummary();
+        renderDashboardStats(widgets);
+        renderRecentPatients(widgets.recent_patients);
+        renderRecentActivities(widgets.recent_activity);
+        renderCharts(widgets);
     } catch (error) {
         console.error('❌ Error loading dashboard data:', error);
-        showAlert('Lỗi khi tải dữ liệu dashboard', 'danger');
+        handleApiError(error, 'dữ liệu dashboard');
     }
 }
 
-async function loadDashboardStats() {
-    try {
-        // Load patients stats
-        const patientsResponse = await axios.get('/api/patients/statistics/');
-        const patientsStats = patientsResponse.data;
+async function loadDashboardSummary() {
+    const response = await axios.get('/api/dashboard/summary/');
+    return response.data.widgets || {};
+}
 
-        updateStatCard('total-patients', patientsStats.total_patients || 0);
-        updateStatCard('new-patients', patientsStats.new_patients_this_month || 0);
+function renderDashboardStats(widgets) {
+    const patientsStats = widgets.patients;
+    updateStatCard('total-patients', patientsStats ? patientsStats.total_patients || 0 : '-');
+    updateStatCard('new-patients', patientsStats ? patientsStats.new_patients_this_month || 0 : '-');
 
-        // Load appointments stats for today
-        const today = new Date().toISOString().split('T')[0];
-        
-        try {
-            // Use direct appointments API to get today's count
-            const appointmentsResponse = await axios.get(`/api/appointments/?appointment_date=${today}&page_size=1000`);
-            const todayAppointmentsCount = appointmentsResponse.data.count || appointmentsResponse.data.results?.length || 0;
-            updateStatCard('today-appointments', todayAppointmentsCount);
-            
-            console.log(`📅 Today (${today}): ${todayAppointmentsCount} appointments`);
-        } catch (error) {
-            console.warn('Direct appointments API failed, trying statistics:', error);
-            // Fallback to statistics API
-            try {
-                const appointmentsResponse = await axios.get(`/api/appointments/statistics/?date=${today}`);
-                const appointmentsStats = appointmentsResponse.data;
-                updateStatCard('today-appointments', appointmentsStats.total_appointments || 0);
-            } catch (statsError) {
-                console.error('Both appointments APIs failed:', statsError);
-                updateStatCard('today-appointments', '-');
-            }
-        }
-
-        // Load prescriptions stats
-        try {
-            const prescriptionsResponse = await axios.get('/api/prescriptions/statistics/');
-            const prescriptionsStats = prescriptionsResponse.data;
-            
-            // Calculate pending prescriptions (active but not fully dispensed)
-            const pendingPrescriptions = prescriptionsStats.active_prescriptions - prescriptionsStats.dispensed_prescriptions;
-            updateStatCard('pending-prescriptions', Math.max(0, pendingPrescriptions));
-        } catch (error) {
-            console.warn('Prescriptions API not available:', error);
-            updateStatCard('pending-prescriptions', '-');
-        }
+    const todayAppointments = widgets.today_appointments;
+    updateStatCard('today-appointments', todayAppointments ? todayAppointments.total_appointments || 0 : '-');
 
-    } catch (error) {
-        console.error('❌ Error loading dashboard stats:', error);
-        handleApiError(error, 'thống kê dashboard');
-    }
+    // Pending prescriptions (active but not fully dispensed)
+    const prescriptionsStats = widgets.prescriptions;
+    updateStatCard('pending-prescriptions', prescriptionsStats ? prescriptionsStats.pending_prescriptions || 0 : '-');
 }
 
 function updateStatCard(elementId, value) {
@@ -108,158 +74,69 @@ function updateStatCard(elementId, value) {
     }
 }
 
-async function loadRecentPatients() {
-    try {
-        const response = await axios.get('/api/patients/?page_size=5&ordering=-created_at');
-        const patients = response.data.results;
-
-        const tbody = document.getElementById('recent-patients-tbody');
-        tbody.innerHTML = '';
-
-        if (patients.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="5" class="text-center text-muted py-4">Chưa có bệnh nhân nào</td></tr>';
-            return;
-        }
-
-        patients.forEach(patient => {
-            const row = document.createElement('tr');
-            row.innerHTML = `
-                <td><strong>${patient.patient_code}</strong></td>
-                <td>${patient.full_name}</td>
-                <td>${patient.phone_number || '-'}</td>
-                <td>${formatDate(patient.created_at)}</td>
-                <td>
-                    <span class="badge ${patient.is_active ? 'bg-success' : 'bg-secondary'}">
-                        ${patient.is_active ? 'Hoạt động' : 'Không hoạt động'}
-                    </span>
-                </td>
-            `;
-            tbody.appendChild(row);
-        });
-
-    } catch (error) {
-        console.error('❌ Error loading recent patients:', error);
-        handleApiError(error, 'danh sách bệnh nhân gần đây');
+function renderRecentPatients(patients) {
+    const tbody = document.getElementById('recent-patients-tbody');
+    if (!tbody) {
+        return;
     }
-}
+    tbody.innerHTML = '';
 
-async function loadRecentActivities() {
-    try {
-        // Generate sample activities based on recent data
-        const activities = await generateRecentActivities();
-        
-        const container = document.getElementById('recent-activities');
-        container.innerHTML = '';
+    if (!patients || patients.length === 0) {
+        tbody.innerHTML = '<tr><td colspan="5" class="text-center text-muted py-4">Chưa có bệnh nhân nào</td></tr>';
+        return;
+    }
 
-        if (activities.length === 0) {
-            container.innerHTML = '<div class="text-center text-muted py-4">Chưa có hoạt động nào</div>';
-            return;
-        }
+    patients.forEach(patient => {
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td><strong>${patient.patient_code}</strong></td>
+            <td>${patient.full_name}</td>
+            <td>${patient.phone_number || '-'}</td>
+            <td>${formatDate(patient.created_at)}</td>
+            <td>
+                <span class="badge ${patient.is_active ? 'bg-success' : 'bg-secondary'}">
+                    ${patient.is_active ? 'Hoạt động' : 'Không hoạt động'}
+                </span>
+            </td>
+        `;
+        tbody.appendChild(row);
+    });
+}
 
-        activities.forEach(activity => {
-            const activityElement = document.createElement('div');
-            activityElement.className = `activity-item ${activity.isRecent ? 'recent' : ''}`;
-            activityElement.innerHTML = `
-                <div class="d-flex align-items-start">
-                    <i class="${activity.icon} me-3 mt-1" style="color: ${activity.color};"></i>
-                    <div class="flex-grow-1">
-                        <div class="activity-description">${activity.description}</div>
-                        <div class="activity-time">${activity.time}</div>
-                    </div>
-                </div>
-            `;
-            container.appendChild(activityElement);
-        });
+const ACTIVITY_STYLES = {
+    patient: { icon: 'fas fa-user-plus', color: '#43e97b' },
+    appointment: { icon: 'fas fa-calendar-check', color: '#4facfe' },
+    prescription: { icon: 'fas fa-prescription-bottle', color: '#fcb69f' }
+};
 
-    } catch (error) {
-        console.error('❌ Error loading recent activities:', error);
-        document.getElementById('recent-activities').innerHTML = 
-            '<div class="text-center text-danger py-4">Lỗi khi tải hoạt động</div>';
+function renderRecentActivities(items) {
+    const container = document.getElementById('recent-activities');
+    if (!container) {
+        return;
     }
-}
+    container.innerHTML = '';
 
-async function generateRecentActivities() {
-    const activities = [];
-    
-    try {
-        // Get recent patients
-        const patientsResponse = await axios.get('/api/patients/?page_size=2&ordering=-created_at');
-        const recentPatients = patientsResponse.data.results;
-        
-        recentPatients.forEach((patient, index) => {
-            const timeAgo = calculateTimeAgo(patient.created_at);
-            activities.push({
-                description: `Bệnh nhân mới: ${patient.full_name} (${patient.patient_code})`,
-                time: timeAgo,
-                icon: 'fas fa-user-plus',
-                color: '#43e97b',
-                isRecent: index === 0
-            });
-        });
-        
-        // Get recent appointments
-        try {
-            const today = new Date().toISOString().split('T')[0];
-            const appointmentsResponse = await axios.get(`/api/appointments/?page_size=2&ordering=-created_at&appointment_date=${today}`);
-            const recentAppointments = appointmentsResponse.data.results;
-            
-            recentAppointments.forEach((appointment, index) => {
-                const timeAgo = calculateTimeAgo(appointment.created_at);
-                activities.push({
-                    description: `Lịch hẹn mới: ${appointment.patient_name} - ${appointment.doctor_name}`,
-                    time: timeAgo,
-                    icon: 'fas fa-calendar-check',
-                    color: '#4facfe',
-                    isRecent: index === 0
-                });
-            });
-        } catch (error) {
-            console.warn('Appointments API error:', error);
-        }
-        
-        // Get recent prescriptions
-        try {
-            const prescriptionsResponse = await axios.get('/api/prescriptions/?page_size=2&ordering=-created_at');
-            const recentPrescriptions = prescriptionsResponse.data.results;
-            
-            recentPrescriptions.forEach((prescription, index) => {
-                const timeAgo = calculateTimeAgo(prescription.created_at);
-                activities.push({
-                    description: `Đơn thuốc mới: ${prescription.patient_name} (${prescription.prescription_number})`,
-                    time: timeAgo,
-                    icon: 'fas fa-prescription-bottle',
-                    color: '#fcb69f',
-                    isRecent: index === 0
-                });
-            });
-        } catch (error) {
-            console.warn('Prescriptions API error:', error);
-        }
-        
-        // Sort by most recent first
-        activities.sort((a, b) => {
-            // Simple sort by isRecent flag and then by time
-            if (a.isRecent && !b.isRecent) return -1;
-            if (!a.isRecent && b.isRecent) return 1;
-            return 0;
-        });
-        
-        // Keep only the 4 most recent activities
-        return activities.slice(0, 4);
-        
-    } catch (error) {
-        console.error('Error generating activities:', error);
-        // Fallback to sample activities
-        return [
-            {
-                description: 'Hệ thống đang tải dữ liệu...',
-                time: 'Vừa xong',
-                icon: 'fas fa-spinner',
-                color: '#718096',
-                isRecent: true
-            }
-        ];
+    if (!items || items.length === 0) {
+        container.innerHTML = '<div class="text-center text-muted py-4">Chưa có hoạt động nào</div>';
+        return;
     }
+
+    // Already sorted newest first by the server
+    items.forEach((item, index) => {
+        const style = ACTIVITY_STYLES[item.type] || ACTIVITY_STYLES.patient;
+        const activityElement = document.createElement('div');
+        activityElement.className = `activity-item ${index === 0 ? 'recent' : ''}`;
+        activityElement.innerHTML = `
+            <div class="d-flex align-items-start">
+                <i class="${style.icon} me-3 mt-1" style="color: ${style.color};"></i>
+                <div class="flex-grow-1">
+                    <div class="activity-description">${item.description}</div>
+                    <div class="activity-time">${calculateTimeAgo(item.created_at)}</div>
+                </div>
+            </div>
+        `;
+        container.appendChild(activityElement);
+    });
 }
 
 function calculateTimeAgo(dateString) {
@@ -285,24 +162,21 @@ function calculateTimeAgo(dateString) {
     }
 }
 
-async function loadChartsData() {
-    try {
-        await Promise.all([
-            createAppointmentsChart(),
-            createAppointmentStatusChart(),
-            createPrescriptionsChart()
-        ]);
-    } catch (error) {
-        console.error('❌ Error loading charts data:', error);
-    }
+function renderCharts(widgets) {
+    createAppointmentsChart(widgets.monthly_appointments);
+    createAppointmentStatusChart(widgets.today_appointments);
+    createPrescriptionsChart(widgets.prescriptions);
 }
 
-async function createAppointmentsChart() {
+function createAppointmentsChart(chartData) {
     try {
         showChartLoading('appointments-chart-loading');
         
-        // Get appointments data from start of month to current date
-        const chartData = await getAppointmentsWeeklyData();
+        // Appointments per day of the current month
+        if (!chartData) {
+            showChartEmpty('appointments-chart-loading', 'Không có dữ liệu lịch hẹn');
+            return;
+        }
         
         const ctx = document.getElementById('appointmentsChart').getContext('2d');
         
@@ -379,41 +253,12 @@ async function createAppointmentsChart() {
     }
 }
 
-async function createAppointmentStatusChart() {
+function createAppointmentStatusChart(todayStats) {
     try {
         showChartLoading('appointment-status-chart-loading');
         
-        const today = new Date().toISOString().split('T')[0];
-        
-        let statusData = {};
-        
-        try {
-            // Use direct appointments API to get real data
-            const response = await axios.get(`/api/appointments/?appointment_date=${today}&page_size=1000`);
-            const appointments = response.data.results || [];
-            
-            // Count appointments by status
-            const statusCounts = {};
-            appointments.forEach(appointment => {
-                const status = appointment.status_display || appointment.status;
-                statusCounts[status] = (statusCounts[status] || 0) + 1;
-            });
-            
-            statusData = statusCounts;
-            console.log(`📊 Today's appointment status data:`, statusData);
-            
-        } catch (error) {
-            console.warn('Direct appointments API failed, trying statistics:', error);
-            // Fallback to statistics API
-            try {
-                const response = await axios.get(`/api/appointments/statistics/?date=${today}`);
-                const stats = response.data;
-                statusData = stats.by_status || {};
-            } catch (statsError) {
-                console.warn('Stats API also failed:', statsError);
-                statusData = {};
-            }
-        }
+        // Today's appointments by status
+        const statusData = (todayStats && todayStats.by_status) || {};
         
         const ctx = document.getElementById('appointmentStatusChart').getContext('2d');
         
@@ -482,32 +327,21 @@ async function createAppointmentStatusChart() {
     }
 }
 
-async function createPrescriptionsChart() {
+function createPrescriptionsChart(stats) {
     try {
         showChartLoading('prescriptions-chart-loading');
         
-        let statusData = {};
-        
-        try {
-            const response = await axios.get('/api/prescriptions/statistics/');
-            const stats = response.data;
-            
-            // Map the API response to chart data
-            statusData = {
-                'Có hiệu lực': stats.active_prescriptions || 0,
-                'Đã cấp thuốc': stats.dispensed_prescriptions || 0,
-                'Hết hạn': stats.expired_prescriptions || 0
-            };
-        } catch (error) {
-            console.warn('Prescriptions API not available:', error);
-            // Mock data if prescriptions API is not available
-            statusData = {
-                'Có hiệu lực': 5,
-                'Đã cấp thuốc': 12,
-                'Hết hạn': 2
-            };
+        if (!stats) {
+            showChartEmpty('prescriptions-chart-loading', 'Không có dữ liệu đơn thuốc');
+            return;
         }
         
+        const statusData = {
+            'Có hiệu lực': stats.active_prescriptions || 0,
+            'Đã cấp thuốc': stats.dispensed_prescriptions || 0,
+            'Hết hạn': stats.expired_prescriptions || 0
+        };
+        
         const ctx = document.getElementById('prescriptionsChart').getContext('2d');
         
         if (charts.prescriptionsChart) {
@@ -636,7 +470,7 @@ async function refreshCharts() {
             }
         });
         
-        await loadChartsData();
+        renderCharts(await loadDashboardSummary());
         showAlert('Biểu đồ đã được cập nhật', 'success');
     } catch (error) {
         console.error('❌ Error refreshing charts:', error);
@@ -649,46 +483,6 @@ async function refreshCharts() {
     }
 }
 
-async function getAppointmentsWeeklyData() {
-    // Generate data for all days in current month
-    const days = [];
-    const data = [];
-    
-    const today = new Date();
-    const currentMonth = today.getMonth();
-    const currentYear = today.getFullYear();
-    
-    // Get last day of current month
-    const lastDayOfMonth = new Date(currentYear, currentMonth + 1, 0).getDate();
-    
-    console.log(`📅 Getting appointments for all days in month ${currentMonth + 1}/${currentYear} (1-${lastDayOfMonth})`);
-    
-    // Loop through all days in current month
-    for (let day = 1; day <= lastDayOfMonth; day++) {
-        const currentDate = new Date(currentYear, currentMonth, day);
-        const dateStr = currentDate.toISOString().split('T')[0];
-        
-        days.push(day);
-        
-        try {
-            // Use direct appointments API
-            const response = await axios.get(`/api/appointments/?appointment_date=${dateStr}&page_size=1000`);
-            const appointmentsCount = response.data.count || response.data.results?.length || 0;
-            data.push(appointmentsCount);
-            
-            if (appointmentsCount > 0) {
-                console.log(`📅 ${dateStr} (Ngày ${day}): ${appointmentsCount} lịch hẹn`);
-            }
-        } catch (error) {
-            console.warn(`Error fetching appointments for ${dateStr}:`, error);
-            data.push(0);
-        }
-    }
-    
-    console.log('📊 Monthly appointments data:', { labels: days, data: data });
-    return { labels: days, data: data };
-}
-
 function handleApiError(error, context) {
     if (error.response?.status === 401) {
         redirectToLogin();
@@ -239,13 +239,54 @@ async function loadPatients() {
     }
 }
 
+const DRUG_CATALOG_KEY = 'drugCatalog';
+
+/**
+ * Sync the local drug catalog: full snapshot once, then only changes (?since=version)
+ */
+async function syncDrugCatalog() {
+    let cached = null;
+    try {
+        cached = JSON.parse(localStorage.getItem(DRUG_CATALOG_KEY) || 'null');
+    } catch (e) {
+        cached = null;
+    }
+
+    if (cached && typeof cached.version === 'number') {
+        const { data } = await axios.get(`/api/drugs/catalog/?since=${cached.version}`);
+        if (!data.reset) {
+            ['categories', 'drugs', 'interactions'].forEach(section => {
+                const rows = new Map((cached[section] || []).map(row => [String(row.id), row]));
+                (data[section] || []).forEach(row => rows.set(String(row.id), row));
+                ((data.deleted || {})[section] || []).forEach(id => rows.delete(String(id)));
+                cached[section] = Array.from(rows.values());
+            });
+            cached.version = data.version;
+            saveDrugCatalog(cached);
+            return cached;
+        }
+    }
+
+    const { data } = await axios.get('/api/drugs/catalog/');
+    saveDrugCatalog(data);
+    return data;
+}
+
+function saveDrugCatalog(catalog) {
+    try {
+        localStorage.setItem(DRUG_CATALOG_KEY, JSON.stringify(catalog));
+    } catch (e) {
+        // Quota exceeded: keep working from memory
+    }
+}
+
 async function loadDrugs() {
     try {
-        // Prefer active drugs from API
-        const response = await axios.get('/api/drugs/?is_active=true');
-        const raw = response.data.results || response.data || [];
-        // Keep only drugs with valid id and in-stock if stock info available
-        drugs = (raw || []).filter(d => d && d.id && (typeof d.current_stock !== 'number' || d.current_stock > 0));
+        const catalog = await syncDrugCatalog();
+        // Keep only active drugs with valid id and in stock
+        drugs = (catalog.drugs || [])
+            .filter(d => d && d.id && d.is_active && d.current_stock > 0)
+            .sort((a, b) => a.name.localeCompare(b.name, 'vi'));
     } catch (error) {
         console.error('❌ Error loading drugs:', error);
         drugs = [];
@@ -590,7 +631,7 @@ async function handleAddPrescription(event) {
         }
         
         const url = '/api/prescriptions/';
-        const response = await axios.post(url, prescriptionData, {
+        const response = await window.HospitalApp.idempotentPost(url, prescriptionData, {
             headers: {
                 'Content-Type': 'application/json'
             }
@@ -304,6 +304,40 @@ function calculateAge(birthDate) {
     return age;
 }
 
+// Gộp nhiều request API vào một lần gọi /api/batch/.
+// Trả về { id: { status, body } } theo id của từng request.
+async function batchRequests(requests, { parallel = true } = {}) {
+    const response = await axios.post('/api/batch/', { parallel, requests });
+    const results = {};
+    (response.data.results || []).forEach(result => { results[result.id] = result; });
+    return results;
+}
+
+// POST tạo mới kèm Idempotency-Key: gửi lại cùng nội dung sau timeout/lỗi mạng (hoặc bấm
+// hai lần) dùng lại khóa cũ, server trả lại kết quả lần đầu thay vì tạo bản ghi trùng.
+// Khóa được bỏ khi đã nhận được phản hồi cuối cùng.
+const idempotencyKeys = {};
+async function idempotentPost(url, payload, config = {}) {
+    const slot = url + ':' + JSON.stringify(payload || {});
+    if (!idempotencyKeys[slot]) {
+        idempotencyKeys[slot] = (window.crypto && crypto.randomUUID)
+            ? crypto.randomUUID()
+            : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+    }
+    const headers = { ...(config.headers || {}), 'Idempotency-Key': idempotencyKeys[slot] };
+    try {
+        const response = await axios.post(url, payload, { ...config, headers });
+        delete idempotencyKeys[slot];
+        return response;
+    } catch (error) {
+        const status = error.response?.status;
+        if (status && status < 500 && status !== 409) {
+            delete idempotencyKeys[slot];
+        }
+        throw error;
+    }
+}
+
 // Export để các script khác có thể sử dụng
 window.HospitalApp = {
     // Trạng thái interceptor hiện tại
@@ -325,7 +359,9 @@ window.HospitalApp = {
     },
     getToken: () => localStorage.getItem('access_token'),
     logout,
-    showAlert
+    showAlert,
+    batch: batchRequests,
+    idempotentPost
 };
 
 // ===== Role-based restrictions (Reception) =====